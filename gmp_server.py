@@ -4,14 +4,17 @@ Lightweight Flask server for the GMP document builder with
 Ollama LLM integration and Word document generation.
 """
 
-from flask import Flask, jsonify, send_file
+from flask import Flask, jsonify
 from flask_cors import CORS
 import os
 import logging
 
-from ml_model.gmp.routes import gmp_bp
+from ml_model.gmp.routes import (
+    gmp_bp, get_generator, get_job_queue, get_retention_service,
+)
 from ml_model.gmp.account_routes import account_bp
 from ml_model.gmp.database import init_db
+from ml_model.gmp.file_serving import SENDFILE_MODE, send_generated_file
 
 logging.basicConfig(level=logging.INFO)
 
@@ -30,19 +33,37 @@ os.makedirs(GENERATED_DOCS_DIR, exist_ok=True)
 OLLAMA_HOST = os.environ.get('OLLAMA_HOST', 'http://localhost:11434')
 app.config['OLLAMA_HOST'] = OLLAMA_HOST
 
+# Let Apache/lighttpd stream downloads (GMP_SENDFILE_MODE=x-sendfile)
+app.config['USE_X_SENDFILE'] = SENDFILE_MODE == 'x-sendfile'
+
 # Initialize SQLite database
 init_db(app)
 
 app.register_blueprint(gmp_bp)
 app.register_blueprint(account_bp)
 
+# Load all templates (from the precompiled bundle when fresh), start the
+# generation job workers and resume jobs a previous run left behind,
+# and the background sweeps that prune old generated files. Every gunicorn
+# worker runs this: a resumed job is executed only by the process that
+# claims it, and retention sweeps are serialized through a lock file.
+get_generator().template_loader.warm()
+with app.app_context():
+    get_job_queue()
+    get_retention_service()
+
 
 @app.route('/api/download/<filename>')
 def download_file(filename):
-    filepath = os.path.join(GENERATED_DOCS_DIR, filename)
-    if os.path.exists(filepath):
-        return send_file(filepath, as_attachment=True)
-    return jsonify({"error": "File not found"}), 404
+    # Batch zips and files shared through the dedup store are never rewritten
+    doc_store = get_generator().doc_store
+    immutable = filename.endswith('.zip') or (
+        doc_store is not None and doc_store.contains_file(filename)
+    )
+    response = send_generated_file(GENERATED_DOCS_DIR, filename, immutable=immutable)
+    if response is None:
+        return jsonify({"error": "File not found"}), 404
+    return response
 
 
 @app.route('/health')
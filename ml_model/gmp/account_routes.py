@@ -45,6 +45,7 @@ def create_account():
         terminology_json=json.dumps(data.get("terminology", {})),
         style_notes=data.get("style_notes", ""),
         reference_sops_json=json.dumps(data.get("reference_sops", [])),
+        llm_cache_enabled=bool(data.get("llm_cache_enabled", True)),
     )
     db.session.add(account)
     db.session.commit()
@@ -78,6 +79,8 @@ def update_account(account_id):
         account.style_notes = data["style_notes"]
     if "reference_sops" in data:
         account.reference_sops_json = json.dumps(data["reference_sops"])
+    if "llm_cache_enabled" in data:
+        account.llm_cache_enabled = bool(data["llm_cache_enabled"])
 
     db.session.commit()
     return jsonify({"success": True, "account": account.to_dict()})
@@ -0,0 +1,289 @@
+"""Render benchmark for GMPWordEngine.
+
+Synthesizes documents of increasing size from every JSON template (step
+rows, materials, equipment, table rows and flowchart nodes) and records
+wall time, peak RSS and DOCX size per template and size tier. Each case
+runs in a fresh worker process so peak RSS is not polluted by earlier
+cases. Results are written as JSON and can be compared against a previous
+run to spot regressions between commits.
+
+Usage:
+    python -m ml_model.gmp.benchmark --output bench.json
+    python -m ml_model.gmp.benchmark --tiers small large --templates batch_record
+    python -m ml_model.gmp.benchmark --compare bench.json --output bench_new.json
+"""
+
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+from typing import Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .template_loader import TemplateLoader
+from .template_schema import DocumentTemplate, SectionType
+
+# Size tiers: step rows per procedure section, materials, flowchart nodes.
+# Equipment and generic table rows scale with the step count.
+TIERS = {
+    "small": {"steps": 10, "materials": 50, "flowchart_nodes": 10},
+    "medium": {"steps": 100, "materials": 200, "flowchart_nodes": 50},
+    "large": {"steps": 1000, "materials": 500, "flowchart_nodes": 200},
+}
+
+# Regressions beyond this ratio are flagged by --compare
+REGRESSION_THRESHOLD = 1.10
+
+
+def synthesize_steps(count: int) -> list[dict]:
+    """Procedure steps with sub-instructions, a BSC step and verifications."""
+    steps = []
+    for i in range(1, count + 1):
+        steps.append({
+            "number": f"{i}.",
+            "title": f"Process step {i}",
+            "instructions": [
+                f"Transfer the contents of vessel {i} to the labelled tube.",
+                {"text": "Perform the transfer inside the biosafety cabinet.",
+                 "bsc": i % 3 == 0},
+                {"text": "Verify the seal is intact.", "type": "verification",
+                 "options": ["Yes", "No"]},
+            ],
+            "variables": ["Volume", {"name": "Time"}],
+            "results": [{"unit": "mL"}, {"unit": "hh:mm"}],
+        })
+    return steps
+
+
+def synthesize_materials(count: int) -> list[dict]:
+    return [
+        {"part_number": f"CPF-{i:05d}", "description": f"Sterile material {i}",
+         "quantity": (i % 12) + 1}
+        for i in range(1, count + 1)
+    ]
+
+
+def synthesize_flowchart(count: int) -> list[dict]:
+    """A main path with a decision every fifth node looping back one step."""
+    if count < 2:
+        count = 2
+    steps = []
+    for i in range(count):
+        step_id = f"n{i}"
+        if i == 0:
+            step_type = "start"
+        elif i == count - 1:
+            step_type = "end"
+        elif i % 5 == 0:
+            step_type = "decision"
+        else:
+            step_type = "action"
+
+        nxt = [] if i == count - 1 else [{"target_id": f"n{i + 1}", "label": "Yes" if step_type == "decision" else ""}]
+        if step_type == "decision":
+            nxt.append({"target_id": f"n{i - 1}", "label": "No"})
+        steps.append({"id": step_id, "label": f"Step {i}", "type": step_type, "next": nxt})
+    return steps
+
+
+def synthesize_data(template: DocumentTemplate, tier: dict) -> dict:
+    """Build a data dict filling every section of the template for one tier."""
+    steps = synthesize_steps(tier["steps"])
+    data = {
+        "doc_number": "BENCH-001",
+        "doc_title": f"{template.name} (benchmark)",
+        "effective_date": "01JAN2025",
+        "revision": "01",
+    }
+    for section in template.sections:
+        if section.type == SectionType.STEP_PROCEDURE:
+            section_data = {"steps": steps}
+        elif section.type == SectionType.MATERIALS_LIST:
+            section_data = {"materials": synthesize_materials(tier["materials"])}
+        elif section.type == SectionType.EQUIPMENT_LIST:
+            section_data = {"equipment": [f"Equipment item {i}" for i in range(tier["steps"])]}
+        elif section.type == SectionType.FLOWCHART:
+            section_data = {"flowchart": {"steps": synthesize_flowchart(tier["flowchart_nodes"])}}
+        elif section.type == SectionType.TABLE and section.columns:
+            section_data = {"rows": [
+                {col.id: f"{col.title} {i}" for col in section.columns}
+                for i in range(tier["steps"])
+            ]}
+        elif section.type in (SectionType.CHECKLIST, SectionType.REVIEW):
+            section_data = {"checklist_items": [f"Check item {i}" for i in range(20)]}
+        elif section.type == SectionType.GENERAL_INSTRUCTIONS:
+            section_data = {"instructions": [f"Instruction {i}" for i in range(20)]}
+        elif section.type == SectionType.REFERENCES:
+            section_data = {"references": [
+                {"doc_number": f"SOP-{i:03d}", "title": f"Reference {i}"} for i in range(20)
+            ]}
+        elif section.type == SectionType.ATTACHMENTS:
+            section_data = {"attachments": [
+                {"doc_number": f"FRM-{i:03d}", "title": f"Attachment {i}", "quantity": 1}
+                for i in range(10)
+            ]}
+        elif section.type == SectionType.FREE_TEXT:
+            section_data = {"text": "Benchmark paragraph. " * 200}
+        else:
+            section_data = section.default_data or {}
+        data[section.id] = section_data
+    return data
+
+
+def _peak_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss if sys.platform == "darwin" else rss * 1024
+
+
+def run_case(template_id: str, tier_name: str, repeat: int,
+             templates_dir: Optional[str] = None) -> dict:
+    """Render one template at one size tier and return its measurements."""
+    from .word_engine import GMPWordEngine
+
+    template = TemplateLoader(templates_dir).load_template(template_id)
+    tier = TIERS[tier_name]
+    data = synthesize_data(template, tier)
+    engine = GMPWordEngine()
+    baseline_rss = _peak_rss_bytes()
+
+    timings = []
+    output = b""
+    for _ in range(repeat):
+        started = time.perf_counter()
+        output = engine.generate(template, data)
+        timings.append(time.perf_counter() - started)
+
+    return {
+        "template": template_id,
+        "tier": tier_name,
+        **tier,
+        "repeat": repeat,
+        "wall_seconds_min": round(min(timings), 4),
+        "wall_seconds_mean": round(sum(timings) / len(timings), 4),
+        "peak_rss_bytes": _peak_rss_bytes(),
+        "baseline_rss_bytes": baseline_rss,
+        "output_bytes": len(output),
+    }
+
+
+def run_benchmarks(template_ids: list[str], tier_names: list[str], repeat: int = 3,
+                   templates_dir: Optional[str] = None) -> list[dict]:
+    """Run every template/tier combination, each in a fresh worker process."""
+    results = []
+    for template_id in template_ids:
+        for tier_name in tier_names:
+            with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+                result = pool.submit(run_case, template_id, tier_name, repeat,
+                                     templates_dir).result()
+            results.append(result)
+            print(_format_row(result), flush=True)
+    return results
+
+
+def compare(current: list[dict], baseline: list[dict],
+            threshold: float = REGRESSION_THRESHOLD) -> list[dict]:
+    """Pair cases with a previous run and flag wall-time regressions."""
+    previous = {(r["template"], r["tier"]): r for r in baseline}
+    rows = []
+    for result in current:
+        old = previous.get((result["template"], result["tier"]))
+        if not old or not old["wall_seconds_min"]:
+            continue
+        ratio = result["wall_seconds_min"] / old["wall_seconds_min"]
+        rows.append({
+            "template": result["template"],
+            "tier": result["tier"],
+            "baseline_seconds": old["wall_seconds_min"],
+            "current_seconds": result["wall_seconds_min"],
+            "ratio": round(ratio, 3),
+            "regression": ratio > threshold,
+        })
+    return rows
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _format_row(result: dict) -> str:
+    rss = result["peak_rss_bytes"]
+    rss_mb = f"{rss / 1048576:8.1f}" if rss else "     n/a"
+    return (
+        f"{result['template']:<28} {result['tier']:<7} "
+        f"{result['wall_seconds_min']:8.3f}s {rss_mb} MB "
+        f"{result['output_bytes'] / 1024:9.1f} KB"
+    )
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark GMPWordEngine rendering")
+    parser.add_argument("--templates", nargs="*",
+                        help="Template IDs to benchmark (default: all)")
+    parser.add_argument("--tiers", nargs="*", choices=list(TIERS), default=list(TIERS),
+                        help="Size tiers to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3,
+                        help="Renders per case; the minimum is reported")
+    parser.add_argument("--templates-dir", help="Alternate templates directory")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Previous results JSON to compare against")
+    args = parser.parse_args(argv)
+
+    template_ids = args.templates or [
+        t["id"] for t in TemplateLoader(args.templates_dir).list_templates()
+    ]
+
+    print(f"{'template':<28} {'tier':<7} {'time':>9} {'peak RSS':>11} {'output':>12}")
+    results = run_benchmarks(template_ids, args.tiers, max(1, args.repeat),
+                             args.templates_dir)
+
+    report = {
+        "generated_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "tiers": {name: TIERS[name] for name in args.tiers},
+        "results": results,
+    }
+
+    exit_code = 0
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        report["baseline_commit"] = baseline.get("commit")
+        report["comparison"] = compare(results, baseline.get("results", []))
+        print(f"\nCompared with {args.compare} ({baseline.get('commit') or 'unknown commit'}):")
+        for row in report["comparison"]:
+            flag = "  REGRESSION" if row["regression"] else ""
+            print(f"{row['template']:<28} {row['tier']:<7} "
+                  f"{row['baseline_seconds']:8.3f}s -> {row['current_seconds']:8.3f}s "
+                  f"x{row['ratio']:.2f}{flag}")
+        if any(row["regression"] for row in report["comparison"]):
+            exit_code = 1
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.output}")
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -46,6 +46,28 @@ class DataCollector:
             logger.error(f"Failed to record document: {e}")
             return None
 
+    def get_document(self, document_id: int) -> Optional[Document]:
+        return Document.query.get(document_id)
+
+    def update_document(self, doc: Document, user_input: dict,
+                        result: dict) -> Optional[Document]:
+        """Store the inputs of a re-rendered document on its existing record."""
+        try:
+            for field in ("title", "product_name", "process_type",
+                          "description", "doc_number", "revision"):
+                if field in user_input:
+                    setattr(doc, field, user_input[field])
+            doc.sections_json = json.dumps(user_input.get("sections", {}))
+            doc.filename = result.get("filename", doc.filename)
+            doc.file_path = result.get("file_path", doc.file_path)
+            db.session.commit()
+            logger.info(f"Updated document {doc.id}")
+            return doc
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Failed to update document {doc.id}: {e}")
+            return None
+
     # ── Training data capture ──
 
     def record_section_generation(self, account_id: int, section_type: str,
@@ -197,5 +219,6 @@ class DataCollector:
             "terminology": json.loads(account.terminology_json or "{}"),
             "style_notes": account.style_notes,
             "reference_sops": json.loads(account.reference_sops_json or "[]"),
+            "llm_cache_enabled": account.llm_cache_enabled is not False,
             "few_shot_examples": few_shot_examples,
         }
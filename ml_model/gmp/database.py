@@ -1,8 +1,10 @@
 """SQLite database models for account-scoped GMP document storage and training data."""
 
+import json
 import os
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, text
 
 db = SQLAlchemy()
 
@@ -18,6 +20,31 @@ def init_db(app):
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        _add_missing_columns()
+
+
+def _add_missing_columns():
+    """Add columns introduced after a table was first created.
+
+    create_all() never alters existing tables, so new nullable/defaulted
+    columns are added with a plain ALTER TABLE ... ADD COLUMN.
+    """
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            col_type = column.type.compile(dialect=db.engine.dialect)
+            ddl = f'ALTER TABLE {table.name} ADD COLUMN "{column.name}" {col_type}'
+            default = column.default.arg if column.default is not None else None
+            if isinstance(default, (bool, int, float, str)):
+                literal = int(default) if isinstance(default, bool) else default
+                ddl += f" DEFAULT {literal!r}"
+            with db.engine.begin() as conn:
+                conn.execute(text(ddl))
 
 
 class Account(db.Model):
@@ -37,6 +64,7 @@ class Account(db.Model):
     terminology_json = db.Column(db.Text, default="{}")  # custom terms & abbreviations
     style_notes = db.Column(db.Text, default="")  # free-text style instructions for AI
     reference_sops_json = db.Column(db.Text, default="[]")  # org's standard SOP list
+    llm_cache_enabled = db.Column(db.Boolean, default=True)  # reuse cached LLM output
 
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -56,6 +84,7 @@ class Account(db.Model):
             "terminology": self.terminology_json,
             "style_notes": self.style_notes,
             "reference_sops": self.reference_sops_json,
+            "llm_cache_enabled": self.llm_cache_enabled is not False,
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "document_count": self.documents.count(),
             "training_example_count": self.training_examples.count(),
@@ -99,6 +128,7 @@ class Document(db.Model):
             "doc_number": self.doc_number,
             "revision": self.revision,
             "filename": self.filename,
+            "has_file": bool(self.file_path),
             "status": self.status,
             "created_at": self.created_at.isoformat() if self.created_at else None,
         }
@@ -158,3 +188,53 @@ class TrainingExample(db.Model):
         messages.append({"role": "user", "content": self.user_prompt})
         messages.append({"role": "assistant", "content": self.completion})
         return {"messages": messages}
+
+
+class GenerationJob(db.Model):
+    """A queued or running asynchronous document generation.
+
+    Persisted so that a server restart can pick up jobs that were still
+    queued (or whose worker died mid-run) instead of silently losing them.
+    """
+
+    __tablename__ = "generation_jobs"
+
+    id = db.Column(db.String(32), primary_key=True)
+    account_id = db.Column(db.Integer, db.ForeignKey("accounts.id"), nullable=True)
+    doc_type = db.Column(db.String(100), nullable=False)
+
+    status = db.Column(db.String(20), default="queued")  # queued, running, completed, failed
+    attempts = db.Column(db.Integer, default=0)
+
+    # Process executing the job ("host:pid") and when it last reported in
+    owner = db.Column(db.String(300), nullable=True)
+    heartbeat_at = db.Column(db.DateTime, nullable=True)
+
+    # The generate_document() payload, per-section progress, and final result
+    input_json = db.Column(db.Text, default="{}")
+    progress_json = db.Column(db.Text, default="{}")
+    result_json = db.Column(db.Text, default="{}")
+    error = db.Column(db.Text, default="")
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+
+    def to_dict(self):
+        result = json.loads(self.result_json or "{}")
+        return {
+            "job_id": self.id,
+            "account_id": self.account_id,
+            "doc_type": self.doc_type,
+            "status": self.status,
+            "attempts": self.attempts,
+            "progress": json.loads(self.progress_json or "{}"),
+            "filename": result.get("filename"),
+            "download_url": result.get("download_url"),
+            "result": result,
+            "error": self.error or None,
+            "created_at": self.created_at.isoformat() if self.created_at else None,
+            "started_at": self.started_at.isoformat() if self.started_at else None,
+            "finished_at": self.finished_at.isoformat() if self.finished_at else None,
+        }
@@ -0,0 +1,168 @@
+"""Content-addressed index of rendered DOCX files.
+
+Rendering is deterministic given the template and the resolved section
+data, so a repeat generation with identical inputs would only write a
+byte-identical copy under a new timestamped name. DocumentStore maps a
+SHA-256 of (template fingerprint, normalized render data) to the file that
+was already rendered for it, letting generate_document() hand back that
+file instead of rendering and storing another one.
+
+Like the LLM response cache, the index lives in a standalone SQLite file
+so it can be used from worker threads without a Flask app context. Entries
+whose file has since been deleted are dropped on lookup.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+from .template_schema import DocumentTemplate
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STORE_PATH = os.environ.get(
+    "DOC_STORE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "doc_store.db"),
+)
+DEDUP_ENABLED = os.environ.get("GMP_DOC_DEDUP", "1") != "0"
+
+# Bump when GMPWordEngine output changes for the same input, so files
+# rendered by older code are not handed out again. Flowchart layout and
+# connector routing changes count as output changes.
+RENDER_FORMAT_VERSION = 4
+
+# Render data fields that never reach the DOCX
+_UNRENDERED_FIELDS = ("doc_id",)
+
+
+def template_fingerprint(template: DocumentTemplate) -> str:
+    """Hash the full template definition; any edit yields a new version."""
+    return hashlib.sha256(template.model_dump_json().encode("utf-8")).hexdigest()
+
+
+def document_key(template: DocumentTemplate, content_data: dict,
+                 generated_doc_number: bool = False,
+                 flowchart_layout: Optional[str] = None) -> str:
+    """Hash everything that determines the rendered DOCX.
+
+    Args:
+        template: Template the document is rendered from
+        content_data: Resolved render data (metadata plus per-section data)
+        generated_doc_number: The doc_number was generated rather than
+            supplied, so it is left out and any earlier file's number is reused
+        flowchart_layout: Default flowchart layout algorithm the render uses
+    """
+    data = {k: v for k, v in content_data.items() if k not in _UNRENDERED_FIELDS}
+    if generated_doc_number:
+        data.pop("doc_number", None)
+    material = {
+        "format": RENDER_FORMAT_VERSION,
+        "template": template_fingerprint(template),
+        "flowchart_layout": flowchart_layout,
+        "data": data,
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class DocumentStore:
+    """SQLite index from document content hash to a rendered file."""
+
+    def __init__(self, docs_dir: Path, path: Optional[str] = None):
+        self.docs_dir = Path(docs_dir)
+        self.path = os.path.abspath(path or DEFAULT_STORE_PATH)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5,
+                                     check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS doc_store ("
+                " key TEXT PRIMARY KEY,"
+                " filename TEXT NOT NULL,"
+                " doc_id TEXT NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_doc_store_filename"
+                " ON doc_store (filename)"
+            )
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return {filename, file_path, doc_id} for key if its file still exists.
+
+        The file's mtime is bumped, so retention's age policies count from
+        the last time it was handed out rather than from when it was rendered.
+        """
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT filename, doc_id FROM doc_store WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                filename, doc_id = row
+                file_path = self.docs_dir / filename
+                try:
+                    os.utime(file_path)
+                except OSError:
+                    # Deleted by retention (or by hand) since it was stored
+                    self._conn.execute("DELETE FROM doc_store WHERE key = ?", (key,))
+                    return None
+                self._conn.execute(
+                    "UPDATE doc_store SET last_used = ?, hits = hits + 1"
+                    " WHERE key = ?", (time.time(), key),
+                )
+                return {"filename": filename, "file_path": file_path, "doc_id": doc_id}
+        except sqlite3.Error as e:
+            logger.warning(f"Document store read failed: {e}")
+            return None
+
+    def put(self, key: str, file_path: Path, doc_id: str):
+        """Record that file_path (inside docs_dir) holds the document for key."""
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO doc_store"
+                    " (key, filename, doc_id, created_at, last_used, hits)"
+                    " VALUES (?, ?, ?, ?, ?, 0)",
+                    (key, Path(file_path).name, doc_id, now, now),
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Document store write failed: {e}")
+
+    def contains_file(self, filename: str) -> bool:
+        """Whether filename may be handed out again for a repeat generation."""
+        try:
+            with self._lock:
+                row = self._conn.execute(
+                    "SELECT 1 FROM doc_store WHERE filename = ? LIMIT 1", (filename,)
+                ).fetchone()
+            return row is not None
+        except sqlite3.Error as e:
+            logger.warning(f"Document store read failed: {e}")
+            return False
+
+    def discard_file(self, filename: str):
+        """Forget every entry pointing at filename (deleted or rewritten)."""
+        try:
+            with self._lock, self._conn:
+                self._conn.execute("DELETE FROM doc_store WHERE filename = ?", (filename,))
+        except sqlite3.Error as e:
+            logger.warning(f"Document store write failed: {e}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM doc_store"
+            ).fetchone()
+        return {"entries": count, "hits": hits}
@@ -8,14 +8,20 @@ import json
 import logging
 import os
 import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Callable, Iterator, Optional
 
 from .template_schema import DocumentTemplate, SectionType
 from .template_loader import TemplateLoader
-from .word_engine import GMPWordEngine
-from .ollama_service import OllamaService
+from .render_pool import RenderPool
+from .doc_store import DocumentStore, DEDUP_ENABLED, document_key
+from .flowchart_layout import DEFAULT_LAYOUT
+from .ollama_service import OllamaService, DEFAULT_POOL_SIZE
+from .llm_cache import LLMResponseCache, DEFAULT_MAX_BYTES as LLM_CACHE_MAX_BYTES
+from .llm_scheduler import LLMQueueFull, Priority
 from .paper_scraper import PaperScraper, Paper, PaperMethods
 from .data_collector import DataCollector
 
@@ -23,20 +29,31 @@ logger = logging.getLogger(__name__)
 
 GENERATED_DOCS_DIR = Path(__file__).parent.parent.parent / "generated_docs"
 
+# Max concurrent LLM section fills; match Ollama's OLLAMA_NUM_PARALLEL so
+# requests beyond what the server can decode at once don't just queue there.
+DEFAULT_LLM_CONCURRENCY = int(os.environ.get("OLLAMA_NUM_PARALLEL", "4"))
+
 
 class GMPDocumentGenerator:
     """Orchestrates GMP document generation from user input + LLM assistance."""
 
     def __init__(self, ollama_url: str = "http://localhost:11434",
                  ollama_model: str = "llama3",
-                 templates_dir: Optional[str] = None):
+                 templates_dir: Optional[str] = None,
+                 llm_concurrency: Optional[int] = None):
         self.template_loader = TemplateLoader(templates_dir)
-        self.word_engine = GMPWordEngine()
-        self.ollama = OllamaService(base_url=ollama_url, model=ollama_model)
+        self.render_pool = RenderPool(templates_dir)
+        self.llm_concurrency = max(1, llm_concurrency or DEFAULT_LLM_CONCURRENCY)
+        self.ollama = OllamaService(
+            base_url=ollama_url, model=ollama_model,
+            pool_size=max(DEFAULT_POOL_SIZE, self.llm_concurrency),
+            cache=LLMResponseCache() if LLM_CACHE_MAX_BYTES > 0 else None,
+        )
         self.paper_scraper = PaperScraper()
         self.data_collector = DataCollector()
         self.generated_docs_dir = GENERATED_DOCS_DIR
         self.generated_docs_dir.mkdir(parents=True, exist_ok=True)
+        self.doc_store = DocumentStore(self.generated_docs_dir) if DEDUP_ENABLED else None
 
     # ── Paper Scraping ──
 
@@ -82,7 +99,11 @@ class GMPDocumentGenerator:
         )
 
         try:
-            structured = self.ollama.generate_json(prompt, temperature=0.2)
+            structured = self.ollama.generate_json(
+                prompt, temperature=0.2, priority=Priority.AUTOFILL,
+            )
+        except LLMQueueFull:
+            raise
         except Exception as e:
             logger.error(f"LLM extraction failed for {pmcid}: {e}")
             raise RuntimeError(f"Failed to extract GMP data: {e}")
@@ -134,7 +155,8 @@ class GMPDocumentGenerator:
             "notes": extracted.get("notes", ""),
         }
 
-    def generate_document(self, doc_type: str, user_input: dict) -> dict:
+    def generate_document(self, doc_type: str, user_input: dict,
+                          progress_callback: Optional[Callable[[str, str], None]] = None) -> dict:
         """Generate a complete GMP document.
 
         Args:
@@ -146,6 +168,9 @@ class GMPDocumentGenerator:
                 - description: Process description
                 - doc_number: Optional document number
                 - sections: Optional dict of pre-filled section data
+            progress_callback: Optional ``callback(section_id, state)`` invoked
+                on the calling thread as each section moves to 'generating'
+                (LLM fill started) or 'done'
 
         Returns:
             Dict with:
@@ -155,10 +180,246 @@ class GMPDocumentGenerator:
                 - download_url: URL path for download
                 - preview_sections: List of section summaries
                 - content_data: The full structured data used
+                - deduplicated: True if an identical earlier file was reused
         """
         # Load template
         template = self.template_loader.load_template(doc_type)
+        prepared = self._prepare_document(template, doc_type, user_input,
+                                          progress_callback=progress_callback)
+
+        # Identical template + data: hand back the file rendered last time
+        store_key = self._store_key(template, user_input, prepared)
+        stored = self._reuse_stored(store_key, user_input, prepared)
+        if stored:
+            return self._record_result(doc_type, user_input, prepared, stored)
+
+        # Render the DOCX straight to disk (off the request thread, in the render pool)
+        file_path = self._output_path(user_input, prepared)
+        self.render_pool.render_to_file(doc_type, prepared["content_data"], str(file_path))
+        if store_key:
+            self.doc_store.put(store_key, file_path, prepared["doc_id"])
+        return self._record_result(doc_type, user_input, prepared, file_path)
+
+    def generate_batch(self, doc_type: str, inputs: list[dict],
+                       as_zip: bool = False) -> dict:
+        """Generate many documents from one template.
+
+        The template and per-account context are loaded once for the whole
+        batch, and DOCX rendering (CPU-bound) runs in the render pool.
+
+        Args:
+            doc_type: Template ID shared by every document
+            inputs: List of generate_document() user_input dicts
+            as_zip: Also bundle all generated files into one zip
+
+        Returns:
+            Dict with batch_id, a per-input ``documents`` manifest (each
+            entry has doc_id/filename/download_url or an error), and
+            zip_filename/zip_download_url when as_zip is set
+        """
+        template = self.template_loader.load_template(doc_type)
+        batch_id = str(uuid.uuid4())[:8].upper()
+
+        # Build section data for every input, sharing account lookups
+        account_contexts = {}
+        prepared = []
+        for user_input in inputs:
+            account_id = user_input.get("account_id")
+            account_ctx = None
+            if account_id and user_input.get("auto_fill_llm"):
+                if account_id not in account_contexts:
+                    account_contexts[account_id] = \
+                        self.data_collector.get_account_context(account_id)
+                account_ctx = account_contexts[account_id]
+            try:
+                prepared.append(self._prepare_document(
+                    template, doc_type, user_input, account_ctx=account_ctx,
+                ))
+            except Exception as e:
+                logger.error(f"Batch {batch_id}: failed to prepare document: {e}")
+                prepared.append(e)
+
+        # Render all documents to disk in parallel in the render pool,
+        # skipping any already rendered with identical data
+        paths = {}
+        futures = {}
+        store_keys = {}
+        duplicate_of = {}
+        for i, p in enumerate(prepared):
+            if isinstance(p, Exception):
+                continue
+            key = self._store_key(template, inputs[i], p)
+            stored = self._reuse_stored(key, inputs[i], p)
+            if stored:
+                paths[i] = stored
+                continue
+            first = next((j for j, k in store_keys.items() if key and k == key), None)
+            if first is not None:
+                # Identical to an earlier document in this batch
+                duplicate_of[i] = first
+                paths[i] = paths[first]
+                self._adopt_stored(inputs[i], p, prepared[first]["doc_id"])
+                continue
+            store_keys[i] = key
+            paths[i] = self._output_path(inputs[i], p, taken=paths.values())
+            futures[i] = self.render_pool.submit_to_file(
+                doc_type, p["content_data"], str(paths[i]),
+            )
+        renders = {}
+        for i, future in futures.items():
+            try:
+                # Through the pool, so a hung worker times out and is replaced
+                self.render_pool.wait(future)
+                if store_keys[i]:
+                    self.doc_store.put(store_keys[i], paths[i], prepared[i]["doc_id"])
+            except Exception as e:
+                logger.error(f"Batch {batch_id}: render {i} failed: {e}")
+                renders[i] = e
+
+        documents = []
+        for i, user_input in enumerate(inputs):
+            outcome = renders.get(duplicate_of.get(i, i), prepared[i])
+            if isinstance(outcome, Exception):
+                documents.append({"index": i, "success": False, "error": str(outcome)})
+                continue
+            result = self._record_result(doc_type, user_input, prepared[i], paths[i])
+            documents.append({
+                "index": i,
+                "success": True,
+                "doc_id": result["doc_id"],
+                "filename": result["filename"],
+                "download_url": result["download_url"],
+                "file_path": result["file_path"],
+                "document_record_id": result.get("document_record_id"),
+            })
+
+        logger.info(
+            f"Batch {batch_id}: generated "
+            f"{sum(1 for d in documents if d['success'])}/{len(inputs)} {doc_type} documents"
+        )
+
+        batch = {"batch_id": batch_id, "doc_type": doc_type, "documents": documents}
+        if as_zip:
+            zip_name = f"{doc_type}_batch_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{batch_id}.zip"
+            # DOCX files are already deflated, so store them uncompressed
+            with zipfile.ZipFile(self.generated_docs_dir / zip_name, "w",
+                                 compression=zipfile.ZIP_STORED) as zf:
+                written = set()
+                for doc in documents:
+                    if doc["success"] and doc["filename"] not in written:
+                        zf.write(doc["file_path"], arcname=doc["filename"])
+                        written.add(doc["filename"])
+            batch["zip_filename"] = zip_name
+            batch["zip_download_url"] = f"/api/download/{zip_name}"
+        return batch
+
+    def regenerate_document(self, document_id: int, user_input: dict) -> dict:
+        """Re-render a recorded document after its section data was edited.
+
+        Only sections whose data differs from the stored record are rebuilt
+        inside the existing DOCX; the rest of the file is left untouched. A
+        full render is done instead when header fields change, LLM auto-fill
+        is requested, or the existing file predates section bookmarks.
+
+        Args:
+            document_id: Database ID of the Document record
+            user_input: Same shape as generate_document(); omitted fields
+                keep their recorded values
+
+        Returns:
+            Dict with document_record_id, filename, download_url,
+            preview_sections, rerendered_sections and incremental
+
+        Raises:
+            ValueError: If the document record does not exist
+        """
+        record = self.data_collector.get_document(document_id)
+        if record is None:
+            raise ValueError(f"Document {document_id} not found")
+
+        old_sections = json.loads(record.sections_json or "{}")
+        merged = {
+            "title": record.title,
+            "product_name": record.product_name,
+            "process_type": record.process_type,
+            "description": record.description,
+            "doc_number": record.doc_number,
+            "revision": record.revision,
+            "sections": old_sections,
+            **user_input,
+        }
+        merged = {k: v for k, v in merged.items() if v is not None}
+        new_sections = merged.get("sections", {})
+
+        template = self.template_loader.load_template(record.doc_type)
+        prepared = self._prepare_document(template, record.doc_type, merged)
+        changed = [
+            s.id for s in template.sections
+            if old_sections.get(s.id) != new_sections.get(s.id)
+        ]
+
+        file_path = Path(record.file_path) if record.file_path else None
+        header_changed = any(
+            merged.get(field) != getattr(record, field)
+            for field in ("title", "doc_number", "revision")
+        )
+        incremental = (
+            file_path is not None and file_path.exists()
+            and not header_changed and not merged.get("auto_fill_llm")
+        )
+        # A file handed out for repeat generations may back other records,
+        # so edits go to a new file instead of rewriting it
+        target = file_path
+        if file_path is None or (
+            (changed or not incremental) and self.doc_store is not None
+            and self.doc_store.contains_file(file_path.name)
+        ):
+            target = self._output_path(merged, prepared)
+        if incremental and changed:
+            try:
+                self.render_pool.rerender_to_file(
+                    record.doc_type, prepared["content_data"],
+                    str(file_path), changed, str(target),
+                )
+            except ValueError as e:
+                logger.info(f"Document {document_id}: incremental render not possible ({e})")
+                incremental = False
+        if not incremental:
+            self.render_pool.render_to_file(
+                record.doc_type, prepared["content_data"], str(target),
+            )
+            changed = [s.id for s in template.sections]
+        file_path = target
+
+        result = {
+            "document_record_id": record.id,
+            "file_path": str(file_path),
+            "filename": file_path.name,
+            "download_url": f"/api/download/{file_path.name}",
+            "preview_sections": prepared["preview_sections"],
+            "rerendered_sections": changed,
+            "incremental": incremental,
+        }
+        self.data_collector.update_document(record, merged, result)
+        logger.info(
+            f"Regenerated document {document_id}: "
+            f"{len(changed)} section(s) {'incrementally' if incremental else 'in full'}"
+        )
+        return result
+
+    def _prepare_document(self, template: DocumentTemplate, doc_type: str,
+                          user_input: dict,
+                          progress_callback: Optional[Callable[[str, str], None]] = None,
+                          account_ctx: Optional[dict] = None) -> dict:
+        """Resolve metadata and section data for one document.
+
+        Args:
+            account_ctx: Pre-fetched account context; looked up on demand
+                when omitted and an LLM fill needs it
 
+        Returns:
+            Dict with doc_id, timestamp, content_data and preview_sections
+        """
         # Generate document metadata
         doc_id = str(uuid.uuid4())[:8].upper()
         doc_number = user_input.get("doc_number", f"BR-{doc_id}")
@@ -181,6 +442,7 @@ class GMPDocumentGenerator:
             "process_type": user_input.get("process_type", "Cell Processing"),
             "description": user_input.get("description", ""),
             "doc_type": doc_type,
+            "_priority": Priority.BULK,
         }
 
         # Pre-filled section data from user
@@ -193,23 +455,41 @@ class GMPDocumentGenerator:
         # /api/gmp/preview endpoint for parallel pre-generation.
         auto_fill_llm = user_input.get("auto_fill_llm", False)
 
+        # Optional: auto-fill missing LLM sections (slow, opt-in only).
+        # All missing sections are fanned out at once, bounded by
+        # llm_concurrency, and merged back in template order below.
+        llm_sections = {}
+        if auto_fill_llm:
+            account_id = user_input.get("account_id")
+            if account_id:
+                if account_ctx is None:
+                    account_ctx = self.data_collector.get_account_context(account_id)
+                llm_context["_llm_cache"] = account_ctx.get("llm_cache_enabled", True)
+            missing = [
+                s for s in template.sections
+                if s.llm_prompt and not user_sections.get(s.id)
+            ]
+            llm_sections = self._fill_sections_with_llm(
+                missing, llm_context, progress_callback=progress_callback,
+            )
+
         # Build content for each section (no LLM calls unless explicitly requested)
         preview_sections = []
         for section_def in template.sections:
             section_id = section_def.id
             section_data = user_sections.get(section_id, {})
 
-            # Optional: auto-fill missing LLM sections (slow, opt-in only)
-            if auto_fill_llm and section_def.llm_prompt and not section_data:
-                section_data = self._generate_section_with_llm(
-                    section_def, llm_context
-                )
+            if not section_data and section_id in llm_sections:
+                section_data = llm_sections[section_id]
 
             # Use default data from template if nothing else
             if not section_data and section_def.default_data:
                 section_data = section_def.default_data
 
             data[section_id] = section_data
+            # LLM-filled sections were reported done as each fill finished
+            if progress_callback and section_id not in llm_sections:
+                progress_callback(section_id, "done")
             preview_sections.append({
                 "id": section_id,
                 "title": section_def.title,
@@ -217,29 +497,75 @@ class GMPDocumentGenerator:
                 "has_content": bool(section_data),
             })
 
-        # Generate DOCX
-        docx_bytes = self.word_engine.generate(template, data)
+        return {
+            "doc_id": doc_id,
+            "timestamp": timestamp,
+            "content_data": data,
+            "preview_sections": preview_sections,
+        }
+
+    def _store_key(self, template: DocumentTemplate, user_input: dict,
+                   prepared: dict) -> Optional[str]:
+        """Content hash of a prepared document, or None when dedup is off."""
+        if self.doc_store is None:
+            return None
+        return document_key(template, prepared["content_data"],
+                            generated_doc_number="doc_number" not in user_input,
+                            flowchart_layout=DEFAULT_LAYOUT)
+
+    def _reuse_stored(self, key: Optional[str], user_input: dict,
+                      prepared: dict) -> Optional[Path]:
+        """Return the existing file for key, adopting its doc_id, if any."""
+        if not key:
+            return None
+        stored = self.doc_store.get(key)
+        if stored is None:
+            return None
+        logger.info(f"Reusing identical document {stored['filename']}")
+        self._adopt_stored(user_input, prepared, stored["doc_id"])
+        return stored["file_path"]
+
+    def _adopt_stored(self, user_input: dict, prepared: dict, doc_id: str):
+        # Report the identifiers printed in the reused file, not fresh ones
+        prepared["doc_id"] = doc_id
+        prepared["deduplicated"] = True
+        if "doc_number" not in user_input:
+            prepared["content_data"]["doc_number"] = f"BR-{doc_id}"
+        prepared["content_data"]["doc_id"] = doc_id
 
-        # Save to disk
+    def _output_path(self, user_input: dict, prepared: dict, taken=()) -> Path:
+        """Pick the file path a document will be rendered to.
+
+        Args:
+            taken: Paths already assigned but not yet written (batch runs)
+        """
+        timestamp = prepared["timestamp"]
         safe_title = "".join(
             c if c.isalnum() or c in "-_ " else ""
             for c in user_input.get("title", "document")
         ).strip().replace(" ", "_")
         filename = f"{safe_title}_{timestamp.strftime('%Y%m%d_%H%M%S')}.docx"
         file_path = self.generated_docs_dir / filename
-
-        with open(file_path, "wb") as f:
-            f.write(docx_bytes)
-
+        if file_path.exists() or file_path in taken:
+            # Same title within the same second (e.g. batch runs)
+            filename = f"{safe_title}_{timestamp.strftime('%Y%m%d_%H%M%S')}_{prepared['doc_id']}.docx"
+            file_path = self.generated_docs_dir / filename
+        return file_path
+
+    def _record_result(self, doc_type: str, user_input: dict,
+                       prepared: dict, file_path: Path) -> dict:
+        """Build the result for a rendered DOCX and record it for the account."""
+        filename = file_path.name
         logger.info(f"Generated GMP document: {filename} ({doc_type})")
 
         result = {
-            "doc_id": doc_id,
+            "doc_id": prepared["doc_id"],
             "file_path": str(file_path),
             "filename": filename,
             "download_url": f"/api/download/{filename}",
-            "preview_sections": preview_sections,
-            "content_data": data,
+            "preview_sections": prepared["preview_sections"],
+            "content_data": prepared["content_data"],
+            "deduplicated": prepared.get("deduplicated", False),
         }
 
         # Record document in database if account is provided
@@ -268,16 +594,65 @@ class GMPDocumentGenerator:
         Returns:
             Dict with generated section data
         """
+        section_def = self._find_section(doc_type, section_id)
+        enriched_context = self._enrich_context(context)
+
+        result = self._generate_section_with_llm(section_def, enriched_context)
+        self._record_preview(section_def, context, enriched_context, result)
+        return result
+
+    def stream_section_preview(self, doc_type: str, section_id: str,
+                               context: dict) -> Iterator[tuple[str, object]]:
+        """Stream a single-section preview token by token.
+
+        Validation (unknown section, Ollama down) happens before the
+        iterator is returned so callers can still map it to an HTTP status.
+
+        Returns:
+            Iterator of ("token", str) events followed by one
+            ("done", dict) event carrying the parsed section data
+        """
+        section_def = self._find_section(doc_type, section_id)
+        enriched_context = self._enrich_context(context)
+
+        request = self._section_llm_request(section_def, enriched_context)
+        if request is None:
+            raise ValueError(f"Cannot build an AI prompt for section '{section_id}'")
+        if not self.ollama.check_health():
+            raise RuntimeError("Ollama not available for section preview")
+        llm_kwargs, structured = request
+        self.ollama.scheduler.check_capacity(llm_kwargs["priority"])
+
+        def events():
+            chunks = []
+            for token in self.ollama.generate_stream(**llm_kwargs):
+                chunks.append(token)
+                yield "token", token
+            result = self._parse_section_output("".join(chunks), structured)
+            self._record_preview(section_def, context, enriched_context, result)
+            yield "done", result
+
+        return events()
+
+    def _find_section(self, doc_type: str, section_id: str):
+        """Look up a section definition, raising ValueError if it is unknown."""
         template = self.template_loader.load_template(doc_type)
         section_def = next(
             (s for s in template.sections if s.id == section_id), None
         )
         if not section_def:
             raise ValueError(f"Section '{section_id}' not found in template '{doc_type}'")
+        return section_def
+
+    def _enrich_context(self, context: dict) -> dict:
+        """Inject account context if account_id is provided.
 
-        # Inject account context if account_id is provided
+        Underscore keys (_priority, _llm_cache, _style_notes, ...) steer the
+        LLM call and are only ever set server-side, so any the client sent
+        are dropped.
+        """
         account_id = context.get("account_id")
-        enriched_context = dict(context)
+        enriched_context = {k: v for k, v in context.items() if not k.startswith("_")}
         if account_id:
             acct_ctx = self.data_collector.get_account_context(account_id)
             if acct_ctx.get("facility_name"):
@@ -288,10 +663,13 @@ class GMPDocumentGenerator:
                 enriched_context["_reference_sops"] = acct_ctx["reference_sops"]
             if acct_ctx.get("terminology"):
                 enriched_context["_terminology"] = acct_ctx["terminology"]
+            enriched_context["_llm_cache"] = acct_ctx.get("llm_cache_enabled", True)
+        return enriched_context
 
-        result = self._generate_section_with_llm(section_def, enriched_context)
-
-        # Capture training data
+    def _record_preview(self, section_def, context: dict,
+                        enriched_context: dict, result: dict):
+        """Capture a section preview as training data."""
+        account_id = context.get("account_id")
         if account_id and result:
             prompt = section_def.llm_prompt or section_def.type.value
             self.data_collector.record_section_generation(
@@ -303,7 +681,37 @@ class GMPDocumentGenerator:
                 source="ai",
             )
 
-        return result
+    def _fill_sections_with_llm(self, section_defs: list, context: dict,
+                                progress_callback: Optional[Callable[[str, str], None]] = None) -> dict:
+        """Generate several sections concurrently using the LLM.
+
+        Runs at most ``self.llm_concurrency`` generations at a time. The
+        optional progress_callback is always invoked on the calling thread.
+
+        Returns:
+            Dict mapping section_id to generated section data
+        """
+        if not section_defs:
+            return {}
+
+        if progress_callback:
+            for section_def in section_defs:
+                progress_callback(section_def.id, "generating")
+
+        results = {}
+        workers = min(self.llm_concurrency, len(section_defs))
+        with ThreadPoolExecutor(max_workers=workers,
+                                thread_name_prefix="llm-fill") as pool:
+            futures = {
+                pool.submit(self._generate_section_with_llm, s, context): s.id
+                for s in section_defs
+            }
+            for future in as_completed(futures):
+                section_id = futures[future]
+                results[section_id] = future.result()
+                if progress_callback:
+                    progress_callback(section_id, "done")
+        return results
 
     def _generate_section_with_llm(self, section_def, context: dict) -> dict:
         """Generate section content using the LLM.
@@ -313,11 +721,36 @@ class GMPDocumentGenerator:
         _reference_sops), they are appended to the system prompt so the LLM
         produces account-tailored output.
         """
+        request = self._section_llm_request(section_def, context)
+        if request is None:
+            return {}
+        llm_kwargs, structured = request
+
         # Check if Ollama is available
         if not self.ollama.check_health():
             logger.warning("Ollama not available, returning empty section data")
             return {}
 
+        try:
+            raw = self.ollama.generate(**llm_kwargs)
+        except LLMQueueFull:
+            raise
+        except Exception as e:
+            logger.error(f"LLM generation failed for {section_def.id}: {e}")
+            return {}
+        return self._parse_section_output(raw, structured)
+
+    def _section_llm_request(self, section_def,
+                             context: dict) -> Optional[tuple[dict, bool]]:
+        """Build the OllamaService.generate() arguments for a section.
+
+        Returns:
+            (generate kwargs, whether the output should be parsed as JSON),
+            or None if the section has no way to be AI-generated
+        """
+        from .ollama_service import SECTION_SYSTEM_PROMPT
+        from .prompts import get_section_prompt
+
         # Build account-aware system prompt supplement
         system_supplement = self._build_account_supplement(context)
         # Strip private keys before formatting prompt templates
@@ -338,33 +771,40 @@ class GMPDocumentGenerator:
         prompt_type = section_type_to_prompt.get(section_def.type)
         if not prompt_type:
             # Use custom LLM prompt from template if available
-            if section_def.llm_prompt:
-                try:
-                    raw = self.ollama.generate(
-                        section_def.llm_prompt.format(**clean_ctx),
-                        system_prompt=system_supplement or None,
-                        temperature=0.3,
-                    )
-                    return {"text": raw}
-                except Exception as e:
-                    logger.error(f"LLM generation failed for {section_def.id}: {e}")
-                    return {}
-            return {}
+            if not section_def.llm_prompt:
+                return None
+            try:
+                prompt = section_def.llm_prompt.format(**clean_ctx)
+            except (KeyError, IndexError) as e:
+                logger.error(f"Cannot format LLM prompt for {section_def.id}: {e}")
+                return None
+            return {
+                "prompt": prompt,
+                "system_prompt": system_supplement or None,
+                "temperature": 0.3,
+                "use_cache": context.get("_llm_cache", True),
+                "priority": context.get("_priority", Priority.INTERACTIVE),
+            }, False
 
-        try:
-            raw = self.ollama.generate_section_content(
-                prompt_type, clean_ctx, custom_prompt=None,
-            )
+        return {
+            "prompt": get_section_prompt(prompt_type, clean_ctx),
+            "system_prompt": SECTION_SYSTEM_PROMPT,
+            "temperature": 0.3,
+            "use_cache": context.get("_llm_cache", True),
+            "priority": context.get("_priority", Priority.INTERACTIVE),
+        }, True
+
+    @staticmethod
+    def _parse_section_output(raw: str, structured: bool) -> dict:
+        """Turn raw LLM output into section data."""
+        if structured:
             # Try to parse as JSON for structured sections
             try:
-                parsed = json.loads(raw)
-                return parsed
+                return json.loads(raw)
             except json.JSONDecodeError:
-                # Return as text if not JSON
-                return {"text": raw}
-        except Exception as e:
-            logger.error(f"LLM generation failed for {section_def.id}: {e}")
-            return {}
+                pass
+        # Return as text if not JSON
+        return {"text": raw}
 
     @staticmethod
     def _build_account_supplement(context: dict) -> str:
@@ -392,6 +832,8 @@ class GMPDocumentGenerator:
             "available": healthy,
             "model": self.ollama.model,
             "models": [m.get("name", "") for m in models],
+            "health": self.ollama.health.snapshot(),
+            "scheduler": self.ollama.scheduler.stats(),
         }
 
     def list_templates(self) -> list[dict]:
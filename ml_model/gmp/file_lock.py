@@ -0,0 +1,49 @@
+"""Advisory cross-process file locks.
+
+Gunicorn runs several worker processes, each importing the app and starting
+its own background services. Work that must happen once per deployment
+rather than once per process (retention sweeps, rewriting the template
+bundle) takes an exclusive ``flock`` on a shared lock file first.
+
+On platforms without fcntl (Windows) the lock is a no-op; those run a
+single development server process anyway.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+@contextmanager
+def file_lock(path: Path, blocking: bool = True) -> Iterator[Optional[IO[str]]]:
+    """Hold an exclusive lock on path for the duration of the block.
+
+    Args:
+        path: Lock file; created if missing and never deleted
+        blocking: Wait for the lock instead of giving up when it is held
+
+    Yields:
+        The open lock file (read/write, usable for small shared state), or
+        None if blocking is False and another process holds the lock
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    with os.fdopen(fd, "r+") as f:
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+            except BlockingIOError:
+                yield None
+                return
+        try:
+            yield f
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
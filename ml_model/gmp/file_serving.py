@@ -0,0 +1,109 @@
+"""Conditional, cacheable delivery of generated files.
+
+Downloads carry a strong ETag derived from the file's SHA-256, so a client
+that already has the file gets a 304 and resumed or parallel downloads can
+use Range requests. Digests are cached per (path, size, mtime), so each
+file is hashed once rather than on every request.
+
+Files that can never change once written are served with a long,
+immutable cache lifetime. These are batch zips and DOCX files shared
+through the content-hash store. Other documents can be rewritten in place
+by a regeneration, so clients must revalidate them, which costs one 304.
+
+Behind nginx or Apache, set GMP_SENDFILE_MODE so the web server streams
+the file itself (X-Accel-Redirect / X-Sendfile) and the gunicorn worker is
+freed as soon as the headers are written.
+"""
+
+import hashlib
+import mimetypes
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import quote
+
+from flask import Response, request, send_file
+from werkzeug.security import safe_join
+
+# "", "x-accel" (nginx) or "x-sendfile" (Apache mod_xsendfile, lighttpd)
+SENDFILE_MODE = os.environ.get("GMP_SENDFILE_MODE", "").strip().lower()
+# nginx ``internal`` location aliased to the generated_docs directory
+ACCEL_PREFIX = os.environ.get("GMP_ACCEL_REDIRECT_PREFIX", "/protected-docs").rstrip("/")
+
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+_DIGEST_CACHE_SIZE = 1024
+_HASH_CHUNK = 1024 * 1024
+
+_digests: "OrderedDict[tuple, str]" = OrderedDict()
+_digests_lock = threading.Lock()
+
+
+def file_etag(path: str) -> str:
+    """SHA-256 of the file contents, cached until its size or mtime changes."""
+    st = os.stat(path)
+    key = (path, st.st_size, st.st_mtime_ns)
+    with _digests_lock:
+        digest = _digests.get(key)
+        if digest is not None:
+            _digests.move_to_end(key)
+            return digest
+
+    sha = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK), b""):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _digests_lock:
+        _digests[key] = digest
+        while len(_digests) > _DIGEST_CACHE_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def send_generated_file(directory: str, filename: str,
+                        immutable: bool = False) -> Optional[Response]:
+    """Serve filename from directory as a conditional attachment.
+
+    Args:
+        directory: Directory the file must live in
+        filename: Requested file name; path traversal is rejected
+        immutable: The file is never rewritten, so clients may cache it
+            without revalidating
+
+    Returns:
+        The response, or None if the file does not exist
+    """
+    filepath = safe_join(directory, filename)
+    if filepath is None or not os.path.isfile(filepath):
+        return None
+
+    etag = file_etag(filepath)
+    cache_control = (
+        f"public, max-age={IMMUTABLE_MAX_AGE}, immutable" if immutable
+        else "no-cache"
+    )
+
+    if SENDFILE_MODE == "x-accel":
+        # nginx serves the body (and Range requests) from the internal location
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(
+                mimetype=mimetypes.guess_type(filename)[0] or "application/octet-stream",
+            )
+            response.headers["Content-Disposition"] = (
+                f"attachment; filename*=UTF-8''{quote(filename)}"
+            )
+            response.headers["X-Accel-Redirect"] = f"{ACCEL_PREFIX}/{quote(filename)}"
+        response.set_etag(etag)
+    else:
+        # With USE_X_SENDFILE set (see gmp_server) send_file emits an
+        # X-Sendfile header instead of the body
+        response = send_file(filepath, as_attachment=True, etag=etag,
+                             conditional=True)
+
+    response.headers["Cache-Control"] = cache_control
+    return response
@@ -19,6 +19,9 @@ class FlowchartConnector:
     from_node: str
     to_node: str
     label: str = ""
+    # Routed path in EMU, from the source attachment point to the target's;
+    # empty until the connector has been routed
+    points: list[tuple[int, int]] = field(default_factory=list)
 
 
 @dataclass
@@ -2,11 +2,38 @@
 
 Takes a list of process steps with connections and computes
 node positions in EMU for OOXML embedding.
+
+Two algorithms are available:
+
+- ``layered`` (default): a Sugiyama-style layered layout. Cycles are broken
+  by reversing DFS back edges, nodes are assigned to layers by longest
+  path, edges spanning several layers get dummy nodes that reserve a lane,
+  crossings are reduced with alternating barycenter sweeps, and x
+  coordinates are pulled towards neighbours while keeping each layer's
+  order and spacing. Every phase is linear or O(E log V) per sweep, so
+  charts with hundreds of steps lay out in milliseconds.
+- ``simple``: the original layout that follows the first ``next`` edge
+  down one column and puts decision branches in a second column.
+
+Finished layouts are memoized per process in an LRU cache keyed by a hash
+of the steps (ids, labels, types, edges) and the algorithm, so regenerating
+or previewing an unchanged flowchart skips layout and routing entirely.
 """
 
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
 from .flowchart import Flowchart, FlowchartNode, FlowchartConnector
+from .flowchart_routing import route_connectors
 from .ooxml_helpers import EMU_PER_INCH
 
+logger = logging.getLogger(__name__)
+
 # Layout constants (in EMU)
 NODE_WIDTH = int(2.0 * EMU_PER_INCH)       # 2 inches
 NODE_HEIGHT = int(0.6 * EMU_PER_INCH)      # 0.6 inches
@@ -18,11 +45,51 @@ V_GAP = int(0.5 * EMU_PER_INCH)            # Vertical gap between nodes
 H_GAP = int(1.5 * EMU_PER_INCH)            # Horizontal gap for branches
 PADDING = int(0.3 * EMU_PER_INCH)          # Canvas padding
 
+# Layered layout
+NODE_SEP = int(0.4 * EMU_PER_INCH)         # Horizontal gap between nodes in a layer
+DUMMY_WIDTH = int(0.2 * EMU_PER_INCH)      # Lane reserved for an edge passing a layer
+CROSSING_SWEEPS = 12                       # Max down+up barycenter sweep pairs
+POSITION_SWEEPS = 4                        # Coordinate refinement sweep pairs
+
+LAYOUTS = ("layered", "simple")
+DEFAULT_LAYOUT = os.environ.get("GMP_FLOWCHART_LAYOUT", "layered").strip().lower()
+if DEFAULT_LAYOUT not in LAYOUTS:
+    # A typo in the env var must not break every flowchart render
+    logger.warning(f"Unknown GMP_FLOWCHART_LAYOUT '{DEFAULT_LAYOUT}', using 'layered'")
+    DEFAULT_LAYOUT = "layered"
+
+# Laid-out flowcharts kept per process; 0 disables the cache
+LAYOUT_CACHE_SIZE = int(os.environ.get("GMP_FLOWCHART_CACHE_SIZE", "256"))
+
+
+def layout_key(steps: list[dict], algorithm: str) -> str:
+    """Canonical hash of everything in the steps that affects the layout."""
+    material = [algorithm]
+    for step in steps:
+        material.append([
+            step.get("id"), step.get("label"), step.get("type"),
+            [[n.get("target_id"), n.get("label", "")] for n in step.get("next", [])],
+        ])
+    encoded = json.dumps(material, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
 
 class FlowchartLayoutEngine:
     """Computes positions for flowchart nodes using a top-down layout."""
 
-    def layout(self, steps: list[dict]) -> Flowchart:
+    # Finished layouts as plain tuples, shared by all engines in the process.
+    # Every hit builds fresh Flowchart objects, so callers may mutate them.
+    _cache: "OrderedDict[str, tuple]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    _cache_hits = 0
+    _cache_misses = 0
+
+    def __init__(self, algorithm: Optional[str] = None):
+        self.algorithm = algorithm or DEFAULT_LAYOUT
+        if self.algorithm not in LAYOUTS:
+            raise ValueError(f"Unknown flowchart layout '{self.algorithm}'")
+
+    def layout(self, steps: list[dict], algorithm: Optional[str] = None) -> Flowchart:
         """Compute layout from LLM-generated step definitions.
 
         Args:
@@ -31,13 +98,82 @@ class FlowchartLayoutEngine:
                 - label: str
                 - type: 'start' | 'action' | 'decision' | 'end'
                 - next: list of {target_id, label?}
+            algorithm: 'layered' or 'simple'; defaults to the engine's
 
         Returns:
-            Flowchart with positioned nodes and connectors
+            Flowchart with positioned nodes and orthogonally routed connectors
+
+        Raises:
+            ValueError: If algorithm is not a known layout
         """
+        algorithm = algorithm or self.algorithm
+        if algorithm not in LAYOUTS:
+            raise ValueError(f"Unknown flowchart layout '{algorithm}'")
         if not steps:
             return Flowchart()
+        if LAYOUT_CACHE_SIZE <= 0:
+            return self._layout(steps, algorithm)
+
+        key = layout_key(steps, algorithm)
+        cls = FlowchartLayoutEngine
+        with cls._cache_lock:
+            frozen = cls._cache.get(key)
+            if frozen is not None:
+                cls._cache.move_to_end(key)
+                cls._cache_hits += 1
+            else:
+                cls._cache_misses += 1
+        if frozen is not None:
+            return self._thaw(frozen)
+
+        flowchart = self._layout(steps, algorithm)
+        with cls._cache_lock:
+            cls._cache[key] = self._freeze(flowchart)
+            while len(cls._cache) > LAYOUT_CACHE_SIZE:
+                cls._cache.popitem(last=False)
+        return flowchart
 
+    @classmethod
+    def cache_info(cls) -> dict:
+        with cls._cache_lock:
+            return {
+                "entries": len(cls._cache),
+                "max_entries": LAYOUT_CACHE_SIZE,
+                "hits": cls._cache_hits,
+                "misses": cls._cache_misses,
+            }
+
+    @classmethod
+    def clear_cache(cls):
+        with cls._cache_lock:
+            cls._cache.clear()
+
+    @staticmethod
+    def _freeze(flowchart: Flowchart) -> tuple:
+        return (
+            tuple((n.id, n.label, n.shape, n.x, n.y, n.width, n.height)
+                  for n in flowchart.nodes),
+            tuple((c.from_node, c.to_node, c.label, tuple(c.points))
+                  for c in flowchart.connectors),
+            flowchart.total_width,
+            flowchart.total_height,
+        )
+
+    @staticmethod
+    def _thaw(frozen: tuple) -> Flowchart:
+        nodes, connectors, total_width, total_height = frozen
+        return Flowchart(
+            nodes=[FlowchartNode(*n) for n in nodes],
+            connectors=[
+                FlowchartConnector(from_node, to_node, label, list(points))
+                for from_node, to_node, label, points in connectors
+            ],
+            total_width=total_width,
+            total_height=total_height,
+        )
+
+    def _layout(self, steps: list[dict], algorithm: str) -> Flowchart:
+        """Lay out and route steps without consulting the cache."""
         # Build step lookup
         step_map = {s["id"]: s for s in steps}
 
@@ -55,6 +191,36 @@ class FlowchartLayoutEngine:
 
         node_map = {n.id: n for n in nodes}
 
+        if algorithm == "layered":
+            self._place_layered(steps, node_map)
+        else:
+            self._place_simple(steps, step_map, node_map)
+
+        # Build connectors
+        connectors = []
+        for step in steps:
+            for next_info in step.get("next", []):
+                target_id = next_info.get("target_id")
+                if target_id and target_id in node_map:
+                    connectors.append(FlowchartConnector(
+                        from_node=step["id"],
+                        to_node=target_id,
+                        label=next_info.get("label", ""),
+                    ))
+
+        # Calculate total canvas size
+        max_x = max((n.x + n.width for n in nodes if n.x > 0), default=NODE_WIDTH)
+        max_y = max((n.y + n.height for n in nodes if n.y > 0), default=NODE_HEIGHT)
+
+        return route_connectors(Flowchart(
+            nodes=nodes,
+            connectors=connectors,
+            total_width=max_x + PADDING,
+            total_height=max_y + PADDING,
+        ))
+
+    def _place_simple(self, steps: list[dict], step_map: dict, node_map: dict):
+        """Place the first-edge main path in one column, branches to its right."""
         # Simple top-down layout with branch detection
         # Main column is centered; decision branches go to the right
         visited = set()
@@ -91,28 +257,238 @@ class FlowchartLayoutEngine:
                 node.y = branch_y + V_GAP
                 visited.add(branch_id)
 
-        # Build connectors
-        connectors = []
+    # ── Layered (Sugiyama) layout ──
+
+    def _place_layered(self, steps: list[dict], node_map: dict):
+        """Assign x/y to every node with the layered layout."""
+        ids = list(node_map)
+        index = {node_id: i for i, node_id in enumerate(ids)}
+        succ = [[] for _ in ids]
         for step in steps:
+            u = index[step["id"]]
             for next_info in step.get("next", []):
-                target_id = next_info.get("target_id")
-                if target_id and target_id in node_map:
-                    connectors.append(FlowchartConnector(
-                        from_node=step["id"],
-                        to_node=target_id,
-                        label=next_info.get("label", ""),
-                    ))
+                v = index.get(next_info.get("target_id"))
+                if v is not None and v != u and v not in succ[u]:
+                    succ[u].append(v)
 
-        # Calculate total canvas size
-        max_x = max((n.x + n.width for n in nodes if n.x > 0), default=NODE_WIDTH)
-        max_y = max((n.y + n.height for n in nodes if n.y > 0), default=NODE_HEIGHT)
+        dag = self._remove_cycles(succ)
+        layer = self._assign_layers(dag)
+        down, up, layer_of = self._insert_dummies(dag, layer)
+        layers = self._order_layers(down, up, layer_of, len(ids))
 
-        return Flowchart(
-            nodes=nodes,
-            connectors=connectors,
-            total_width=max_x + PADDING,
-            total_height=max_y + PADDING,
-        )
+        widths = [node_map[node_id].width for node_id in ids]
+        widths += [DUMMY_WIDTH] * (len(layer_of) - len(ids))
+        centers = self._assign_x(layers, down, up, widths)
+
+        # Layers are as tall as their tallest node; nodes centre within them
+        y = PADDING
+        for members in layers:
+            real = [node_map[ids[v]] for v in members if v < len(ids)]
+            band = max(n.height for n in real)
+            for node in real:
+                node.y = y + (band - node.height) // 2
+            y += band + V_GAP
+
+        left = min(centers[v] - widths[v] / 2 for members in layers for v in members)
+        for i, node_id in enumerate(ids):
+            node_map[node_id].x = int(round(centers[i] - widths[i] / 2 - left)) + PADDING
+
+    def _remove_cycles(self, succ: list[list[int]]) -> list[list[int]]:
+        """Make the graph acyclic by reversing the back edges of a DFS.
+
+        The DFS starts from nodes without predecessors (in step order) so the
+        edges that get reversed are the ones looping back up the process.
+        """
+        n = len(succ)
+        has_pred = [False] * n
+        for targets in succ:
+            for v in targets:
+                has_pred[v] = True
+        roots = [u for u in range(n) if not has_pred[u]] + list(range(n))
+
+        dag = [[] for _ in range(n)]
+        state = [0] * n  # 0 unvisited, 1 on the DFS stack, 2 finished
+        for root in roots:
+            if state[root]:
+                continue
+            state[root] = 1
+            stack = [(root, iter(succ[root]))]
+            while stack:
+                u, targets = stack[-1]
+                for v in targets:
+                    if state[v] == 1:
+                        if u not in dag[v]:
+                            dag[v].append(u)
+                        continue
+                    if v not in dag[u]:
+                        dag[u].append(v)
+                    if state[v] == 0:
+                        state[v] = 1
+                        stack.append((v, iter(succ[v])))
+                        break
+                else:
+                    state[u] = 2
+                    stack.pop()
+        return dag
+
+    def _assign_layers(self, dag: list[list[int]]) -> list[int]:
+        """Longest-path layering: each node sits one below its lowest predecessor."""
+        indegree = [0] * len(dag)
+        for targets in dag:
+            for v in targets:
+                indegree[v] += 1
+        layer = [0] * len(dag)
+        queue = [u for u in range(len(dag)) if indegree[u] == 0]
+        for u in queue:
+            for v in dag[u]:
+                layer[v] = max(layer[v], layer[u] + 1)
+                indegree[v] -= 1
+                if indegree[v] == 0:
+                    queue.append(v)
+        return layer
+
+    def _insert_dummies(self, dag: list[list[int]], layer: list[int]):
+        """Split edges spanning several layers into chains of dummy vertices.
+
+        Returns:
+            (down, up, layer_of): adjacency between consecutive layers for
+            real vertices (0..n-1) followed by dummies, and each vertex's layer
+        """
+        layer_of = list(layer)
+        down = [[] for _ in layer]
+        for u, targets in enumerate(dag):
+            for v in targets:
+                prev = u
+                for k in range(layer[u] + 1, layer[v]):
+                    dummy = len(layer_of)
+                    layer_of.append(k)
+                    down.append([])
+                    down[prev].append(dummy)
+                    prev = dummy
+                down[prev].append(v)
+
+        up = [[] for _ in layer_of]
+        for u, targets in enumerate(down):
+            for v in targets:
+                up[v].append(u)
+        return down, up, layer_of
+
+    def _order_layers(self, down, up, layer_of: list[int], real_count: int) -> list[list[int]]:
+        """Order vertices within layers, reducing crossings by barycenter sweeps."""
+        # Initial order: DFS discovery order from the real vertices in step order
+        layers = [[] for _ in range(max(layer_of) + 1)]
+        seen = [False] * len(layer_of)
+        for root in range(real_count):
+            if seen[root]:
+                continue
+            seen[root] = True
+            stack = [root]
+            while stack:
+                u = stack.pop()
+                layers[layer_of[u]].append(u)
+                for v in reversed(down[u]):
+                    if not seen[v]:
+                        seen[v] = True
+                        stack.append(v)
+
+        pos = [0] * len(layer_of)
+        for members in layers:
+            for i, v in enumerate(members):
+                pos[v] = i
+
+        best = [list(members) for members in layers]
+        best_crossings = self._count_crossings(layers, down, pos)
+        stale = 0
+        for _ in range(CROSSING_SWEEPS):
+            if best_crossings == 0 or stale >= 2:
+                break
+            for k in range(1, len(layers)):
+                self._barycenter_sort(layers[k], up, pos)
+            for k in range(len(layers) - 2, -1, -1):
+                self._barycenter_sort(layers[k], down, pos)
+            crossings = self._count_crossings(layers, down, pos)
+            if crossings < best_crossings:
+                best_crossings = crossings
+                best = [list(members) for members in layers]
+                stale = 0
+            else:
+                stale += 1
+        return best
+
+    @staticmethod
+    def _barycenter_sort(members: list[int], neighbours, pos: list[int]):
+        def barycenter(v):
+            adjacent = neighbours[v]
+            if not adjacent:
+                return pos[v]
+            return sum(pos[w] for w in adjacent) / len(adjacent)
+
+        members.sort(key=lambda v: (barycenter(v), pos[v]))
+        for i, v in enumerate(members):
+            pos[v] = i
+
+    @staticmethod
+    def _count_crossings(layers: list[list[int]], down, pos: list[int]) -> int:
+        """Count edge crossings between consecutive layers (Fenwick tree)."""
+        total = 0
+        for k in range(len(layers) - 1):
+            below = len(layers[k + 1])
+            tree = [0] * (below + 1)
+            seen = 0
+            for u in layers[k]:
+                for target in sorted(pos[v] for v in down[u]):
+                    # Edges already inserted that end to the right of target
+                    i, not_greater = target + 1, 0
+                    while i > 0:
+                        not_greater += tree[i]
+                        i -= i & -i
+                    total += seen - not_greater
+                    i = target + 1
+                    while i <= below:
+                        tree[i] += 1
+                        i += i & -i
+                    seen += 1
+        return total
+
+    @staticmethod
+    def _assign_x(layers: list[list[int]], down, up, widths: list[int]) -> list[float]:
+        """Centre x per vertex: pulled towards neighbours, order and spacing kept."""
+        centers = [0.0] * len(widths)
+        for members in layers:
+            x = 0.0
+            for i, v in enumerate(members):
+                if i:
+                    x += (widths[members[i - 1]] + widths[v]) / 2 + NODE_SEP
+                centers[v] = x
+
+        def place(members, neighbours):
+            desired = []
+            for v in members:
+                adjacent = neighbours[v]
+                desired.append(
+                    sum(centers[w] for w in adjacent) / len(adjacent) if adjacent
+                    else centers[v]
+                )
+            gaps = [
+                (widths[members[i]] + widths[members[i + 1]]) / 2 + NODE_SEP
+                for i in range(len(members) - 1)
+            ]
+            # Closest order-preserving placement from each side, then average
+            left = list(desired)
+            for i in range(1, len(members)):
+                left[i] = max(left[i], left[i - 1] + gaps[i - 1])
+            right = list(desired)
+            for i in range(len(members) - 2, -1, -1):
+                right[i] = min(right[i], right[i + 1] - gaps[i])
+            for i, v in enumerate(members):
+                centers[v] = (left[i] + right[i]) / 2
+
+        for _ in range(POSITION_SWEEPS):
+            for k in range(1, len(layers)):
+                place(layers[k], up)
+            for k in range(len(layers) - 2, -1, -1):
+                place(layers[k], down)
+        return centers
 
     def _get_shape_params(self, node_type: str) -> tuple[str, int, int]:
         """Get shape name and dimensions for a node type."""
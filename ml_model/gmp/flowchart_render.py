@@ -0,0 +1,334 @@
+"""SVG and PNG rendering of laid-out flowcharts for quick previews.
+
+Draws a positioned Flowchart with the same shapes and colours as the OOXML
+drawing in the Word document: blue process boxes, orange decision diamonds,
+green start/end ovals and routed arrow connectors with their labels. This
+lets the UI check a process diagram without rendering a DOCX.
+
+SVG output is plain text. PNG output comes from a small pure-Python
+rasterizer (scanline fills, a built-in 5x7 bitmap font and zlib for PNG
+encoding), so it needs no Cairo, Pillow or other native library. Text in
+PNGs is therefore pixel-font text, meant for previews rather than print.
+"""
+
+import struct
+import zlib
+from functools import lru_cache
+from xml.sax.saxutils import escape
+
+from .flowchart import Flowchart, FlowchartNode
+from .ooxml_helpers import EMU_PER_INCH
+
+# Shape colours, matching build_shape_rect/diamond/oval
+SHAPE_COLORS = {
+    "rectangle": ("4472C4", "2F5597"),
+    "diamond": ("ED7D31", "C55A11"),
+    "oval": ("70AD47", "548235"),
+}
+LINE_COLOR = "404040"
+TEXT_COLOR = "FFFFFF"
+LABEL_COLOR = "404040"
+FONT_PT = {"rectangle": 9, "diamond": 8, "oval": 9}
+
+DEFAULT_DPI = 96
+# PNGs larger than this are rendered at a lower resolution instead
+MAX_PNG_PIXELS = 8_000_000
+# zlib level; flat-colour diagrams compress well even at the fastest setting
+PNG_COMPRESSION = 1
+
+
+def _hex_rgb(color: str) -> tuple[int, int, int]:
+    return int(color[0:2], 16), int(color[2:4], 16), int(color[4:6], 16)
+
+
+def _wrap(text: str, max_chars: int) -> list[str]:
+    """Greedy word wrap; words longer than a line are split."""
+    max_chars = max(1, max_chars)
+    lines, line = [], ""
+    for word in text.split():
+        while len(word) > max_chars:
+            if line:
+                lines.append(line)
+                line = ""
+            lines.append(word[:max_chars])
+            word = word[max_chars:]
+        if not line:
+            line = word
+        elif len(line) + 1 + len(word) <= max_chars:
+            line += " " + word
+        else:
+            lines.append(line)
+            line = word
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _text_width(node: FlowchartNode) -> int:
+    """Usable text width in EMU (a diamond's middle is narrower)."""
+    return int(node.width * (0.6 if node.shape == "diamond" else 0.9))
+
+
+# ── SVG ──
+
+def render_svg(flowchart: Flowchart, dpi: int = DEFAULT_DPI) -> str:
+    """Render a positioned flowchart as an SVG document.
+
+    Args:
+        flowchart: Flowchart with node positions and routed connectors
+        dpi: Pixels per inch for the SVG's width/height
+
+    Returns:
+        SVG markup
+    """
+    px = dpi / EMU_PER_INCH
+    width = max(1, round(flowchart.total_width * px))
+    height = max(1, round(flowchart.total_height * px))
+
+    out = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}" font-family="Calibri, Arial, sans-serif">',
+        "<defs><marker id=\"arrow\" viewBox=\"0 0 10 10\" refX=\"10\" refY=\"5\" "
+        "markerWidth=\"7\" markerHeight=\"7\" orient=\"auto-start-reverse\">"
+        f"<path d=\"M0,0 L10,5 L0,10 z\" fill=\"#{LINE_COLOR}\"/></marker></defs>",
+        f'<rect width="{width}" height="{height}" fill="#FFFFFF"/>',
+    ]
+
+    for node in flowchart.nodes:
+        fill, line = SHAPE_COLORS.get(node.shape, SHAPE_COLORS["rectangle"])
+        x, y = node.x * px, node.y * px
+        w, h = node.width * px, node.height * px
+        style = f'fill="#{fill}" stroke="#{line}" stroke-width="1.33"'
+        if node.shape == "diamond":
+            points = f"{x + w / 2:.1f},{y:.1f} {x + w:.1f},{y + h / 2:.1f} " \
+                     f"{x + w / 2:.1f},{y + h:.1f} {x:.1f},{y + h / 2:.1f}"
+            out.append(f'<polygon points="{points}" {style}/>')
+        elif node.shape in ("oval", "ellipse"):
+            out.append(f'<ellipse cx="{x + w / 2:.1f}" cy="{y + h / 2:.1f}" '
+                       f'rx="{w / 2:.1f}" ry="{h / 2:.1f}" {style}/>')
+        else:
+            out.append(f'<rect x="{x:.1f}" y="{y:.1f}" width="{w:.1f}" '
+                       f'height="{h:.1f}" {style}/>')
+
+        font_px = FONT_PT.get(node.shape, 9) * dpi / 72
+        lines = _wrap(node.label, int(_text_width(node) * px / (font_px * 0.5)))
+        first_dy = -(len(lines) - 1) / 2 * 1.15
+        spans = "".join(
+            f'<tspan x="{x + w / 2:.1f}" dy="{first_dy if i == 0 else 1.15:.2f}em">'
+            f"{escape(line)}</tspan>"
+            for i, line in enumerate(lines)
+        )
+        out.append(f'<text x="{x + w / 2:.1f}" y="{y + h / 2:.1f}" font-size="{font_px:.1f}" '
+                   f'fill="#{TEXT_COLOR}" text-anchor="middle" dominant-baseline="central">'
+                   f"{spans}</text>")
+
+    label_px = 8 * dpi / 72
+    for conn in flowchart.connectors:
+        if len(conn.points) < 2:
+            continue
+        points = " ".join(f"{x * px:.1f},{y * px:.1f}" for x, y in conn.points)
+        out.append(f'<polyline points="{points}" fill="none" stroke="#{LINE_COLOR}" '
+                   f'stroke-width="1.33" marker-end="url(#arrow)"/>')
+        if conn.label:
+            lx, ly = _label_anchor(conn.points)
+            out.append(f'<text x="{lx * px + 3:.1f}" y="{ly * px - 3:.1f}" '
+                       f'font-size="{label_px:.1f}" fill="#{LABEL_COLOR}">'
+                       f"{escape(conn.label)}</text>")
+
+    out.append("</svg>")
+    return "\n".join(out)
+
+
+def _label_anchor(points: list[tuple[int, int]]) -> tuple[int, int]:
+    """Place an edge label just past the connector's first bend."""
+    (x1, y1), (x2, y2) = points[0], points[1]
+    return (x1 + x2) // 2, (y1 + y2) // 2
+
+
+# ── PNG ──
+
+def render_png(flowchart: Flowchart, dpi: int = DEFAULT_DPI) -> bytes:
+    """Rasterize a positioned flowchart to PNG bytes in pure Python.
+
+    The resolution is lowered if the image would exceed MAX_PNG_PIXELS.
+    """
+    px = dpi / EMU_PER_INCH
+    pixels = flowchart.total_width * px * flowchart.total_height * px
+    if pixels > MAX_PNG_PIXELS:
+        px *= (MAX_PNG_PIXELS / pixels) ** 0.5
+    canvas = _Canvas(max(1, round(flowchart.total_width * px)),
+                     max(1, round(flowchart.total_height * px)))
+    glyph_scale = max(1, round(px * EMU_PER_INCH / 48))
+    line_width = max(1, round(px * EMU_PER_INCH / 72))
+
+    for node in flowchart.nodes:
+        fill, line = SHAPE_COLORS.get(node.shape, SHAPE_COLORS["rectangle"])
+        x0, y0 = round(node.x * px), round(node.y * px)
+        x1, y1 = round((node.x + node.width) * px), round((node.y + node.height) * px)
+        # Outline colour first, then the fill inset by the line width
+        for color, inset in ((line, 0), (fill, line_width)):
+            rgb = _hex_rgb(color)
+            if node.shape == "diamond":
+                inset = inset * 3 // 2
+                cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+                canvas.fill_polygon([(cx, y0 + inset), (x1 - inset, cy),
+                                     (cx, y1 - inset), (x0 + inset, cy)], rgb)
+            elif node.shape in ("oval", "ellipse"):
+                canvas.fill_ellipse(x0 + inset, y0 + inset, x1 - inset, y1 - inset, rgb)
+            else:
+                canvas.fill_rect(x0 + inset, y0 + inset, x1 - inset, y1 - inset, rgb)
+
+        # Shrink the pixel font until the wrapped label fits inside the shape
+        scale = glyph_scale
+        while True:
+            lines = _wrap(node.label, int(_text_width(node) * px) // (6 * scale))
+            if scale == 1 or len(lines) * 9 * scale <= (y1 - y0) - 2 * line_width:
+                break
+            scale -= 1
+        ty = (y0 + y1) // 2 - len(lines) * 9 * scale // 2 + scale
+        for text in lines:
+            tx = (x0 + x1) // 2 - (len(text) * 6 * scale) // 2
+            canvas.draw_text(tx, ty, text, _hex_rgb(TEXT_COLOR), scale)
+            ty += 9 * scale
+
+    line_rgb = _hex_rgb(LINE_COLOR)
+    arrow = 4 * line_width + 2
+    for conn in flowchart.connectors:
+        if len(conn.points) < 2:
+            continue
+        pts = [(round(x * px), round(y * px)) for x, y in conn.points]
+        for (ax, ay), (bx, by) in zip(pts, pts[1:]):
+            canvas.draw_line(ax, ay, bx, by, line_rgb, line_width)
+        (ax, ay), (bx, by) = pts[-2], pts[-1]
+        length = max(1.0, ((bx - ax) ** 2 + (by - ay) ** 2) ** 0.5)
+        ux, uy = (bx - ax) / length, (by - ay) / length
+        canvas.fill_polygon([
+            (bx, by),
+            (bx - ux * arrow * 2 - uy * arrow, by - uy * arrow * 2 + ux * arrow),
+            (bx - ux * arrow * 2 + uy * arrow, by - uy * arrow * 2 - ux * arrow),
+        ], line_rgb)
+        if conn.label:
+            lx, ly = _label_anchor(conn.points)
+            canvas.draw_text(round(lx * px) + 3, round(ly * px) - 9 * glyph_scale,
+                             conn.label, _hex_rgb(LABEL_COLOR), glyph_scale)
+
+    return canvas.to_png()
+
+
+class _Canvas:
+    """Minimal RGB raster with span-based fills."""
+
+    def __init__(self, width: int, height: int):
+        self.width = width
+        self.height = height
+        self.rows = [bytearray(b"\xff" * (width * 3)) for _ in range(height)]
+
+    def _span(self, y: int, x0: int, x1: int, rgb: tuple):
+        if not 0 <= y < self.height:
+            return
+        x0, x1 = max(0, x0), min(self.width, x1)
+        if x1 > x0:
+            self.rows[y][x0 * 3:x1 * 3] = bytes(rgb) * (x1 - x0)
+
+    def fill_rect(self, x0: int, y0: int, x1: int, y1: int, rgb: tuple):
+        for y in range(max(0, y0), min(self.height, y1)):
+            self._span(y, x0, x1, rgb)
+
+    def fill_ellipse(self, x0: int, y0: int, x1: int, y1: int, rgb: tuple):
+        cx, cy = (x0 + x1) / 2, (y0 + y1) / 2
+        rx, ry = (x1 - x0) / 2, (y1 - y0) / 2
+        if rx <= 0 or ry <= 0:
+            return
+        for y in range(max(0, y0), min(self.height, y1)):
+            dy = (y + 0.5 - cy) / ry
+            if abs(dy) < 1:
+                half = rx * (1 - dy * dy) ** 0.5
+                self._span(y, round(cx - half), round(cx + half), rgb)
+
+    def fill_polygon(self, points: list[tuple[float, float]], rgb: tuple):
+        """Even-odd scanline fill."""
+        ys = [p[1] for p in points]
+        edges = list(zip(points, points[1:] + points[:1]))
+        for y in range(max(0, int(min(ys))), min(self.height, int(max(ys)) + 1)):
+            sy = y + 0.5
+            xs = sorted(
+                x1 + (sy - y1) * (x2 - x1) / (y2 - y1)
+                for (x1, y1), (x2, y2) in edges
+                if (y1 <= sy < y2) or (y2 <= sy < y1)
+            )
+            for a, b in zip(xs[0::2], xs[1::2]):
+                self._span(y, round(a), round(b), rgb)
+
+    def draw_line(self, x0: int, y0: int, x1: int, y1: int, rgb: tuple, width: int):
+        half = width // 2
+        if x0 == x1 or y0 == y1:
+            self.fill_rect(min(x0, x1) - half, min(y0, y1) - half,
+                           max(x0, x1) - half + width, max(y0, y1) - half + width, rgb)
+            return
+        steps = max(abs(x1 - x0), abs(y1 - y0))
+        for i in range(steps + 1):
+            x = round(x0 + (x1 - x0) * i / steps)
+            y = round(y0 + (y1 - y0) * i / steps)
+            self.fill_rect(x - half, y - half, x - half + width, y - half + width, rgb)
+
+    def draw_text(self, x: int, y: int, text: str, rgb: tuple, scale: int = 1):
+        for ch in text:
+            for row, runs in enumerate(_glyph_runs(ch)):
+                for dy in range(scale):
+                    for start, length in runs:
+                        self._span(y + row * scale + dy, x + start * scale,
+                                   x + (start + length) * scale, rgb)
+            x += 6 * scale
+
+    def to_png(self) -> bytes:
+        raw = b"".join(b"\x00" + bytes(row) for row in self.rows)
+
+        def chunk(tag: bytes, data: bytes) -> bytes:
+            return (struct.pack(">I", len(data)) + tag + data
+                    + struct.pack(">I", zlib.crc32(tag + data) & 0xFFFFFFFF))
+
+        return b"".join([
+            b"\x89PNG\r\n\x1a\n",
+            chunk(b"IHDR", struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)),
+            chunk(b"IDAT", zlib.compress(raw, PNG_COMPRESSION)),
+            chunk(b"IEND", b""),
+        ])
+
+
+# Classic 5x7 LCD font: five column bitmaps per character, bit 0 at the top
+_FONT_DATA = (
+    "0000000000 00005F0000 0007000700 147F147F14 242A7F2A12 2313086462 3649552250 0005030000"
+    " 001C224100 0041221C00 142A1C2A14 08083E0808 0050300000 0808080808 0060600000 2010080402"
+    " 3E5149453E 00427F4000 4261514946 2141454B31 1814127F10 2745454539 3C4A494930 0171090503"
+    " 3649494936 064949291E 0036360000 0056360000 0814224100 1414141414 0041221408 0201510906"
+    " 324979413E 7E1111117E 7F49494936 3E41414122 7F4141221C 7F49494941 7F09090101 3E41415132"
+    " 7F0808087F 00417F4100 2040413F01 7F08142241 7F40404040 7F0204027F 7F0408107F 3E4141413E"
+    " 7F09090906 3E4151215E 7F09192946 4649494931 01017F0101 3F4040403F 1F2040201F 7F2018207F"
+    " 6314081463 0304780403 6151494543 00007F4141 0204081020 41417F0000 0402010204 4040404040"
+    " 0001020400 2054545478 7F48444438 3844444420 384444487F 3854545418 087E090102 081454543C"
+    " 7F08040478 00447D4000 2040443D00 007F102844 00417F4000 7C04180478 7C08040478 3844444438"
+    " 7C14141408 081414187C 7C08040408 4854545420 043F444020 3C4040207C 1C2040201C 3C4030403C"
+    " 4428102844 0C5050503C 4464544C44 0008364100 00007F0000 0041360800 0201020402"
+)
+_FONT = {
+    chr(32 + i): tuple(bytes.fromhex(glyph))
+    for i, glyph in enumerate(_FONT_DATA.split())
+}
+
+
+@lru_cache(maxsize=None)
+def _glyph_runs(ch: str) -> tuple:
+    """Horizontal (start, length) pixel runs for each of a glyph's 7 rows."""
+    columns = _FONT.get(ch, _FONT["?"])
+    rows = []
+    for row in range(7):
+        runs, start = [], None
+        for col in range(6):
+            on = col < 5 and columns[col] >> row & 1
+            if on and start is None:
+                start = col
+            elif not on and start is not None:
+                runs.append((start, col - start))
+                start = None
+        rows.append(tuple(runs))
+    return tuple(rows)
@@ -0,0 +1,209 @@
+"""Orthogonal connector routing for laid-out flowcharts.
+
+Connectors are drawn as axis-aligned polylines that leave and enter nodes
+on the side facing the other end:
+
+- Downward edges leave the bottom of the source and enter the top of the
+  target. They bend in the gaps between rows and drop through the nearest
+  free vertical channel when a node is in the way. Secondary branches of a
+  decision leave from the diamond's side vertex.
+- Upward (loop-back) edges leave the source's right side, climb a lane to
+  the right of the chart, and enter the target from the right. When another
+  node sits to the right in the same row, the edge jogs into the gap below
+  or above that row first. Loops whose vertical spans do not overlap share
+  a lane.
+- Edges between nodes in the same row join facing sides.
+
+Obstacle checks only look at nodes whose vertical extent overlaps the
+segment (bisect over nodes sorted by y), so routing stays fast for charts
+with hundreds of nodes.
+"""
+
+import bisect
+
+from .flowchart import Flowchart, FlowchartNode
+from .ooxml_helpers import EMU_PER_INCH
+
+CLEARANCE = int(0.15 * EMU_PER_INCH)   # Gap kept between a channel and node boxes
+LANE_SEP = int(0.15 * EMU_PER_INCH)    # Spacing between parallel loop-back lanes
+SELF_LOOP = int(0.25 * EMU_PER_INCH)   # How far a self-loop sticks out
+PADDING = int(0.3 * EMU_PER_INCH)      # Canvas padding around routed lines
+
+
+def _right(n: FlowchartNode) -> int:
+    return n.x + n.width
+
+
+def _bottom(n: FlowchartNode) -> int:
+    return n.y + n.height
+
+
+def _cx(n: FlowchartNode) -> int:
+    return n.x + n.width // 2
+
+
+def _cy(n: FlowchartNode) -> int:
+    return n.y + n.height // 2
+
+
+class ConnectorRouter:
+    """Routes every connector of a positioned Flowchart in place."""
+
+    def __init__(self, flowchart: Flowchart):
+        self.flowchart = flowchart
+        self._by_id = {n.id: n for n in flowchart.nodes}
+        self._boxes = sorted(flowchart.nodes, key=lambda n: n.y)
+        self._tops = [n.y for n in self._boxes]
+        self._max_height = max((n.height for n in self._boxes), default=0)
+        # Occupied (y_min, y_max) spans per loop-back lane, left to right
+        self._lanes: list[list[tuple[int, int]]] = []
+        self._lane_base = max((_right(n) for n in self._boxes), default=0) + CLEARANCE
+
+    def route(self) -> Flowchart:
+        """Fill in points for every connector and grow the canvas to fit."""
+        fc = self.flowchart
+        outgoing: dict[str, int] = {}
+        for conn in fc.connectors:
+            src = self._by_id.get(conn.from_node)
+            tgt = self._by_id.get(conn.to_node)
+            if src is None or tgt is None:
+                continue
+            rank = outgoing.get(src.id, 0)
+            outgoing[src.id] = rank + 1
+            if src is tgt:
+                conn.points = self._self_loop(src)
+            elif tgt.y >= _bottom(src):
+                branch = src.shape == "diamond" and rank > 0
+                conn.points = self._route_down(src, tgt, branch)
+            elif _bottom(tgt) <= src.y:
+                conn.points = self._route_up(src, tgt)
+            else:
+                conn.points = self._route_across(src, tgt)
+
+        routed = [p for conn in fc.connectors for p in conn.points]
+        if routed:
+            fc.total_width = max(fc.total_width, max(x for x, _ in routed) + PADDING)
+            fc.total_height = max(fc.total_height, max(y for _, y in routed) + PADDING)
+        return fc
+
+    # ── Edge shapes ──
+
+    def _route_down(self, src, tgt, branch: bool) -> list[tuple[int, int]]:
+        sx, tx = _cx(src), _cx(tgt)
+        start, end = (sx, _bottom(src)), (tx, tgt.y)
+
+        # Decision side branch: out of the diamond's side vertex, then down
+        if branch and (tx >= _right(src) or tx <= src.x):
+            side_x = _right(src) if tx > sx else src.x
+            sy = _cy(src)
+            if not self._blocked(side_x, sy, tx, sy, src, tgt) and \
+                    not self._blocked(tx, sy, tx, tgt.y, src, tgt):
+                return [(side_x, sy), (tx, sy), end]
+
+        if sx == tx and not self._blocked(sx, start[1], tx, tgt.y, src, tgt):
+            return [start, end]
+
+        # One bend in the gap under the source
+        gap = tgt.y - _bottom(src)
+        y1 = _bottom(src) + min(gap // 2, CLEARANCE * 2)
+        if not self._blocked(sx, y1, tx, y1, src, tgt) and \
+                not self._blocked(tx, y1, tx, tgt.y, src, tgt):
+            return [start, (sx, y1), (tx, y1), end]
+
+        # Drop through a free channel, then jog over in the gap above the target
+        y2 = tgt.y - min(gap // 2, CLEARANCE * 2)
+        channel = self._free_channel(y1, y2, (sx + tx) // 2, src, tgt)
+        return [start, (sx, y1), (channel, y1), (channel, y2), (tx, y2), end]
+
+    def _route_up(self, src, tgt) -> list[tuple[int, int]]:
+        leave = self._lane_leg(src, tgt)
+        enter = self._lane_leg(tgt, src)
+        y1, y2 = leave[-1][1], enter[-1][1]
+        lane_x = self._lane(min(y1, y2), max(y1, y2))
+        return leave + [(lane_x, y1), (lane_x, y2)] + enter[::-1]
+
+    def _lane_leg(self, node, other) -> list[tuple[int, int]]:
+        """Points from node's right side to the y at which it runs to the lanes.
+
+        Goes straight right when the row is clear. Otherwise it steps out
+        and jogs into the gap below or above the row, past any node to its
+        right.
+        """
+        x, y = _right(node), _cy(node)
+        if not self._blocked(x, y, self._lane_base, y, node, other):
+            return [(x, y)]
+        row = [n for n in self._overlapping(node.y, _bottom(node)) if n.x >= x]
+        if not row:
+            return [(x, y)]
+        stub = x + CLEARANCE
+        for gap_y in (max(_bottom(n) for n in row) + CLEARANCE,
+                      min(n.y for n in row) - CLEARANCE):
+            if not self._blocked(stub, y, stub, gap_y, node, other) and \
+                    not self._blocked(stub, gap_y, self._lane_base, gap_y, node, other):
+                return [(x, y), (stub, y), (stub, gap_y)]
+        return [(x, y)]
+
+    def _route_across(self, src, tgt) -> list[tuple[int, int]]:
+        if _cx(tgt) >= _cx(src):
+            x1, x2 = _right(src), tgt.x
+        else:
+            x1, x2 = src.x, _right(tgt)
+        sy, ty = _cy(src), _cy(tgt)
+        if sy == ty:
+            return [(x1, sy), (x2, ty)]
+        mid = (x1 + x2) // 2
+        return [(x1, sy), (mid, sy), (mid, ty), (x2, ty)]
+
+    def _self_loop(self, node) -> list[tuple[int, int]]:
+        x = _right(node)
+        quarter = node.height // 4
+        return [(x, _cy(node) - quarter), (x + SELF_LOOP, _cy(node) - quarter),
+                (x + SELF_LOOP, _cy(node) + quarter), (x, _cy(node) + quarter)]
+
+    # ── Obstacles ──
+
+    def _overlapping(self, y_min: int, y_max: int):
+        """Nodes whose vertical extent overlaps [y_min, y_max]."""
+        start = bisect.bisect_left(self._tops, y_min - self._max_height)
+        stop = bisect.bisect_right(self._tops, y_max)
+        for node in self._boxes[start:stop]:
+            if node.y <= y_max and _bottom(node) >= y_min:
+                yield node
+
+    def _blocked(self, x1: int, y1: int, x2: int, y2: int, *ends) -> bool:
+        """Whether an axis-aligned segment passes through a node box."""
+        x_min, x_max = min(x1, x2), max(x1, x2)
+        y_min, y_max = min(y1, y2), max(y1, y2)
+        for node in self._overlapping(y_min, y_max):
+            if any(node is end for end in ends):
+                continue
+            if node.x <= x_max and _right(node) >= x_min:
+                return True
+        return False
+
+    def _free_channel(self, y1: int, y2: int, prefer: int, *ends) -> int:
+        """Closest x to prefer where a vertical segment from y1 to y2 is clear."""
+        span = [n for n in self._overlapping(y1, y2)
+                if not any(n is end for end in ends)]
+        candidates = [prefer]
+        for node in span:
+            candidates.append(node.x - CLEARANCE)
+            candidates.append(_right(node) + CLEARANCE)
+        for x in sorted(candidates, key=lambda c: abs(c - prefer)):
+            if not self._blocked(x, y1, x, y2, *ends):
+                return x
+        return max((_right(n) for n in span), default=prefer) + CLEARANCE
+
+    def _lane(self, y_min: int, y_max: int) -> int:
+        """Leftmost loop-back lane whose existing spans do not overlap."""
+        for i, spans in enumerate(self._lanes):
+            if all(y_max < lo or y_min > hi for lo, hi in spans):
+                spans.append((y_min, y_max))
+                return self._lane_base + i * LANE_SEP
+        self._lanes.append([(y_min, y_max)])
+        return self._lane_base + (len(self._lanes) - 1) * LANE_SEP
+
+
+def route_connectors(flowchart: Flowchart) -> Flowchart:
+    """Route all connectors of a positioned flowchart orthogonally."""
+    return ConnectorRouter(flowchart).route()
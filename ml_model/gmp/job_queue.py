@@ -0,0 +1,286 @@
+"""Background job queue for asynchronous GMP document generation.
+
+A generation with LLM auto-fill can take minutes, far longer than a browser
+will wait on a single request. Jobs are written to the ``generation_jobs``
+table, executed by a small thread pool, and polled for per-section progress.
+Because every server process may resume the same persisted jobs, a job is
+only executed by the process that wins a conditional ``queued -> running``
+status update. The winner records itself as the job's owner and keeps a
+heartbeat on the row while the job runs. Every process periodically
+re-queues running jobs whose owner has died or whose heartbeat has lapsed,
+so a crashed gunicorn worker's jobs are picked up without a restart.
+"""
+
+import json
+import logging
+import os
+import socket
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Optional
+
+from .database import db, GenerationJob
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOB_WORKERS = int(os.environ.get("GMP_JOB_WORKERS", "2"))
+
+# Seconds between heartbeats of running jobs, and between checks for jobs
+# abandoned by other processes; 0 disables the background thread
+HEARTBEAT_SECONDS = float(os.environ.get("GMP_JOB_HEARTBEAT_SECONDS", "15"))
+
+# A running job whose heartbeat is older than this is assumed to belong to a
+# dead process and is re-queued
+STALE_JOB_SECONDS = float(os.environ.get("GMP_JOB_STALE_SECONDS", "60"))
+
+
+class GenerationJobQueue:
+    """Executes generate_document() calls off the request thread."""
+
+    def __init__(self, app, generator, max_workers: Optional[int] = None,
+                 stale_after: float = STALE_JOB_SECONDS,
+                 heartbeat: float = HEARTBEAT_SECONDS):
+        self.app = app
+        self.generator = generator
+        self.stale_after = stale_after
+        self.heartbeat = heartbeat
+        self.host = socket.gethostname()
+        self.owner = f"{self.host}:{os.getpid()}"
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or DEFAULT_JOB_WORKERS,
+            thread_name_prefix="gmp-job",
+        )
+
+        # IDs of the jobs this process is executing
+        self._active: set[str] = set()
+        self._active_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the heartbeat thread (no-op if heartbeat is 0)."""
+        if self.heartbeat <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="gmp-job-heartbeat",
+                                        daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def submit(self, doc_type: str, user_input: dict) -> GenerationJob:
+        """Persist a new job and schedule it.
+
+        Raises:
+            FileNotFoundError: If the template does not exist
+        """
+        template = self.generator.template_loader.load_template(doc_type)
+        progress = {
+            "stage": "queued",
+            "completed": 0,
+            "total": len(template.sections),
+            "sections": [
+                {"id": s.id, "title": s.title, "status": "pending"}
+                for s in template.sections
+            ],
+        }
+
+        job = GenerationJob(
+            id=uuid.uuid4().hex,
+            account_id=user_input.get("account_id"),
+            doc_type=doc_type,
+            input_json=json.dumps(user_input),
+            progress_json=json.dumps(progress),
+        )
+        db.session.add(job)
+        db.session.commit()
+
+        self._executor.submit(self._run, job.id)
+        logger.info(f"Queued generation job {job.id} ({doc_type})")
+        return job
+
+    def get(self, job_id: str) -> Optional[GenerationJob]:
+        """Look up a job by ID."""
+        return GenerationJob.query.get(job_id)
+
+    def resume_pending(self) -> int:
+        """Re-schedule every queued job and every running job that was abandoned.
+
+        Called once at startup, when jobs queued by the previous run have
+        nobody else to pick them up.
+
+        Returns:
+            Number of jobs scheduled
+        """
+        return self.reclaim(all_queued=True)
+
+    def reclaim(self, all_queued: bool = False) -> int:
+        """Re-queue running jobs whose owner died or stopped heartbeating.
+
+        Args:
+            all_queued: Also schedule queued jobs submitted recently; by
+                default only queued jobs older than ``stale_after`` are
+                scheduled, as their submitting process may have died
+
+        Returns:
+            Number of jobs scheduled
+        """
+        with self.app.app_context():
+            try:
+                cutoff = datetime.utcnow() - timedelta(seconds=self.stale_after)
+                job_ids = []
+                for row in GenerationJob.query.filter_by(status="running").with_entities(
+                    GenerationJob.id, GenerationJob.owner,
+                    GenerationJob.heartbeat_at, GenerationJob.updated_at,
+                ):
+                    last_seen = row.heartbeat_at or row.updated_at
+                    if not self._owner_dead(row.owner) and \
+                            (last_seen is None or last_seen >= cutoff):
+                        continue
+                    # Only the process whose update matches the row it saw
+                    # re-queues the job
+                    reclaimed = GenerationJob.query.filter(
+                        GenerationJob.id == row.id,
+                        GenerationJob.status == "running",
+                        GenerationJob.owner == row.owner,
+                        GenerationJob.heartbeat_at == row.heartbeat_at,
+                    ).update({"status": "queued", "owner": None},
+                             synchronize_session=False)
+                    db.session.commit()
+                    if reclaimed == 1:
+                        logger.warning(f"Re-queued generation job {row.id} "
+                                       f"abandoned by {row.owner}")
+                        job_ids.append(row.id)
+
+                queued = GenerationJob.query.filter_by(status="queued")
+                if not all_queued:
+                    queued = queued.filter(GenerationJob.updated_at < cutoff)
+                job_ids += [row.id for row in queued.with_entities(GenerationJob.id)
+                            if row.id not in job_ids]
+            finally:
+                db.session.remove()
+
+        for job_id in job_ids:
+            self._executor.submit(self._run, job_id)
+        if job_ids:
+            logger.info(f"Resumed {len(job_ids)} pending generation jobs")
+        return len(job_ids)
+
+    def _owner_dead(self, owner: Optional[str]) -> bool:
+        """Whether owner is a process on this host that no longer exists."""
+        host, _, pid = (owner or "").rpartition(":")
+        if host != self.host or not pid.isdigit() or owner == self.owner:
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return True
+        except OSError:
+            pass  # exists, owned by another user
+        return False
+
+    def _loop(self):
+        while not self._stop.wait(self.heartbeat):
+            try:
+                self._beat()
+                self.reclaim()
+            except Exception as e:
+                logger.error(f"Job heartbeat failed: {e}", exc_info=True)
+
+    def _beat(self):
+        """Refresh the heartbeat of every job this process is running."""
+        with self._active_lock:
+            job_ids = list(self._active)
+        if not job_ids:
+            return
+        with self.app.app_context():
+            try:
+                GenerationJob.query.filter(
+                    GenerationJob.id.in_(job_ids),
+                    GenerationJob.owner == self.owner,
+                ).update({"heartbeat_at": datetime.utcnow()},
+                         synchronize_session=False)
+                db.session.commit()
+            finally:
+                db.session.remove()
+
+    def _claim(self, job_id: str) -> bool:
+        """Atomically move a job from queued to running, owned by this process."""
+        now = datetime.utcnow()
+        claimed = GenerationJob.query.filter_by(
+            id=job_id, status="queued"
+        ).update({
+            "status": "running",
+            "attempts": GenerationJob.attempts + 1,
+            "owner": self.owner,
+            "heartbeat_at": now,
+            "started_at": now,
+            "updated_at": now,
+        }, synchronize_session=False)
+        db.session.commit()
+        return claimed == 1
+
+    def _run(self, job_id: str):
+        with self.app.app_context():
+            try:
+                if not self._claim(job_id):
+                    return
+                with self._active_lock:
+                    self._active.add(job_id)
+                self._execute(GenerationJob.query.get(job_id))
+            except Exception as e:
+                logger.error(f"Generation job {job_id} crashed: {e}", exc_info=True)
+                db.session.rollback()
+            finally:
+                with self._active_lock:
+                    self._active.discard(job_id)
+                db.session.remove()
+
+    def _execute(self, job: GenerationJob):
+        user_input = json.loads(job.input_json or "{}")
+        progress = json.loads(job.progress_json or "{}")
+        progress["stage"] = "sections"
+        by_id = {s["id"]: s for s in progress.get("sections", [])}
+
+        def on_progress(section_id: str, state: str):
+            entry = by_id.get(section_id)
+            if entry is None or entry["status"] == state:
+                return
+            entry["status"] = state
+            progress["completed"] = sum(
+                1 for s in by_id.values() if s["status"] == "done"
+            )
+            if progress["completed"] == progress.get("total"):
+                progress["stage"] = "rendering"
+            job.progress_json = json.dumps(progress)
+            db.session.commit()
+
+        job.progress_json = json.dumps(progress)
+        db.session.commit()
+
+        try:
+            result = self.generator.generate_document(
+                job.doc_type, user_input, progress_callback=on_progress,
+            )
+        except Exception as e:
+            logger.error(f"Generation job {job.id} failed: {e}", exc_info=True)
+            db.session.rollback()
+            job.status = "failed"
+            job.error = str(e)
+        else:
+            job.status = "completed"
+            job.result_json = json.dumps({
+                "doc_id": result["doc_id"],
+                "filename": result["filename"],
+                "download_url": result["download_url"],
+                "preview_sections": result["preview_sections"],
+                "document_record_id": result.get("document_record_id"),
+            })
+
+        progress["stage"] = job.status
+        job.progress_json = json.dumps(progress)
+        job.finished_at = datetime.utcnow()
+        db.session.commit()
+        logger.info(f"Generation job {job.id} {job.status}")
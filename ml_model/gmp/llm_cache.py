@@ -0,0 +1,144 @@
+"""Persistent content-addressed cache for Ollama responses.
+
+Entries are keyed by a SHA-256 of everything that determines a completion
+(model, system prompt, prompt, temperature, num_predict, format) and kept in
+a standalone SQLite file rather than the Flask-SQLAlchemy database, so it
+can be used from LLM worker threads that have no app context. The least
+recently used entries are evicted once the cache exceeds its size budget.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_PATH = os.environ.get(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(__file__), "..", "..", "llm_cache.db"),
+)
+DEFAULT_MAX_BYTES = int(float(os.environ.get("LLM_CACHE_MAX_MB", "64")) * 1024 * 1024)
+DEFAULT_MAX_ENTRIES = 5000
+
+
+def cache_key(payload: dict) -> str:
+    """Hash the parts of an /api/generate payload that affect the output."""
+    options = payload.get("options", {})
+    material = {
+        "model": payload.get("model"),
+        "system": payload.get("system"),
+        "prompt": payload.get("prompt"),
+        "temperature": options.get("temperature"),
+        "num_predict": options.get("num_predict"),
+        "format": payload.get("format"),
+    }
+    encoded = json.dumps(material, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """SQLite-backed LRU cache of LLM completions, safe to share across threads."""
+
+    def __init__(self, path: Optional[str] = None,
+                 max_bytes: int = DEFAULT_MAX_BYTES,
+                 max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = os.path.abspath(path or DEFAULT_CACHE_PATH)
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=5,
+                                     check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " response TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created_at REAL NOT NULL,"
+                " last_used REAL NOT NULL,"
+                " hits INTEGER NOT NULL DEFAULT 0)"
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS ix_llm_cache_last_used"
+                " ON llm_cache (last_used)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached response for key, or None on a miss."""
+        try:
+            with self._lock, self._conn:
+                row = self._conn.execute(
+                    "SELECT response FROM llm_cache WHERE key = ?", (key,)
+                ).fetchone()
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE llm_cache SET last_used = ?, hits = hits + 1"
+                    " WHERE key = ?", (time.time(), key),
+                )
+                return row[0]
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    def set(self, key: str, response: str):
+        """Store a response and evict least recently used entries if over budget."""
+        size = len(response.encode("utf-8"))
+        if not response or size > self.max_bytes:
+            return
+        now = time.time()
+        try:
+            with self._lock, self._conn:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO llm_cache"
+                    " (key, response, size, created_at, last_used, hits)"
+                    " VALUES (?, ?, ?, ?, ?, 0)",
+                    (key, response, size, now, now),
+                )
+                self._evict()
+        except sqlite3.Error as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def _evict(self):
+        count, total = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+        ).fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+
+        # Walk from least recently used until both budgets are satisfied
+        doomed = []
+        for key, size in self._conn.execute(
+            "SELECT key, size FROM llm_cache ORDER BY last_used"
+        ):
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            doomed.append((key,))
+            count -= 1
+            total -= size
+        self._conn.executemany("DELETE FROM llm_cache WHERE key = ?", doomed)
+        logger.info(f"Evicted {len(doomed)} LLM cache entries")
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> dict:
+        with self._lock:
+            count, total, hits = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(hits), 0)"
+                " FROM llm_cache"
+            ).fetchone()
+        return {
+            "entries": count,
+            "bytes": total,
+            "hits": hits,
+            "max_bytes": self.max_bytes,
+            "max_entries": self.max_entries,
+        }
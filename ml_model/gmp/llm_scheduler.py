@@ -0,0 +1,196 @@
+"""Concurrency limiter and priority scheduler for Ollama calls.
+
+All LLM requests from a server process go through one LLMScheduler, which
+caps how many run against Ollama at once and hands free slots to waiting
+callers in priority order (interactive previews before paper autofill
+before bulk document generation). Every gunicorn worker has its own
+scheduler, so a caller that wins a local slot must also take one of
+``max_concurrent`` slot files under ``slot_dir`` with an exclusive flock;
+that keeps the cap deployment-wide rather than per process. Priority
+ordering only applies within a process. Interactive and autofill callers are
+rejected with LLMQueueFull once too many callers of the same or higher
+priority are already waiting, so a saturated GPU sheds load instead of
+piling up request threads. Bulk callers always queue: they run in
+background pools that are already bounded.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from enum import IntEnum
+from pathlib import Path
+from typing import Optional
+
+from .file_lock import file_lock
+
+DEFAULT_MAX_CONCURRENT = int(os.environ.get(
+    "LLM_MAX_CONCURRENT", os.environ.get("OLLAMA_NUM_PARALLEL", "4")
+))
+DEFAULT_MAX_QUEUE = int(os.environ.get("LLM_MAX_QUEUE", "32"))
+
+# Slot files shared by every server process on this host
+DEFAULT_SLOT_DIR = Path(os.environ.get(
+    "LLM_SLOT_DIR", Path(__file__).resolve().parents[2] / ".llm_slots"
+))
+
+# Seconds between attempts to take a shared slot while all are held
+_SLOT_POLL_SECONDS = 0.05
+
+# Smoothing factor for the moving average of slot hold times
+_EWMA_ALPHA = 0.2
+
+
+class Priority(IntEnum):
+    """LLM request classes; lower values are served first."""
+    INTERACTIVE = 0
+    AUTOFILL = 1
+    BULK = 2
+
+
+class LLMQueueFull(RuntimeError):
+    """Raised when the LLM wait queue is over its threshold."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(
+            f"LLM server is busy. Retry in about {retry_after} seconds."
+        )
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    __slots__ = ("priority", "event", "enqueued_at")
+
+    def __init__(self, priority: Priority):
+        self.priority = priority
+        self.event = threading.Event()
+        self.enqueued_at = time.monotonic()
+
+
+class LLMScheduler:
+    """Priority-ordered counting semaphore with queue-depth metrics."""
+
+    def __init__(self, max_concurrent: Optional[int] = None,
+                 max_queue: Optional[int] = None,
+                 slot_dir: Optional[Path] = None):
+        self.max_concurrent = max(1, max_concurrent or DEFAULT_MAX_CONCURRENT)
+        self.max_queue = max_queue if max_queue is not None else DEFAULT_MAX_QUEUE
+        self.slot_dir = Path(slot_dir) if slot_dir else DEFAULT_SLOT_DIR
+        self._lock = threading.Lock()
+        self._heap: list[tuple[int, int, _Waiter]] = []
+        self._seq = itertools.count()
+        self._active = 0
+
+        # Metrics
+        self._completed = 0
+        self._rejected = {p.name.lower(): 0 for p in Priority}
+        self._avg_wait = 0.0
+        self._avg_hold = 0.0
+
+    @contextmanager
+    def slot(self, priority: Priority = Priority.INTERACTIVE):
+        """Hold one LLM slot, local and shared, for the duration of the block."""
+        self.acquire(priority)
+        try:
+            shared = self._acquire_shared()
+        except BaseException:
+            self.release()
+            raise
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            shared.close()
+            self.release(time.monotonic() - started)
+
+    def acquire(self, priority: Priority = Priority.INTERACTIVE):
+        """Block until a slot is free, serving higher priorities first.
+
+        Raises:
+            LLMQueueFull: If too many same-or-higher priority callers are
+                waiting and the caller is not bulk work
+        """
+        with self._lock:
+            if self._active < self.max_concurrent and not self._heap:
+                self._active += 1
+                self._record_wait(0.0)
+                return
+            self._reject_if_full(priority)
+            waiter = _Waiter(priority)
+            heapq.heappush(self._heap, (priority, next(self._seq), waiter))
+        # release() hands the slot over directly, so _active is already counted
+        waiter.event.wait()
+
+    def release(self, held_seconds: float = 0.0):
+        """Return a slot, passing it to the highest-priority waiter if any."""
+        with self._lock:
+            self._completed += 1
+            self._avg_hold += _EWMA_ALPHA * (held_seconds - self._avg_hold)
+            if self._heap:
+                _, _, waiter = heapq.heappop(self._heap)
+                self._record_wait(time.monotonic() - waiter.enqueued_at)
+                waiter.event.set()
+            else:
+                self._active -= 1
+
+    def check_capacity(self, priority: Priority = Priority.INTERACTIVE):
+        """Raise LLMQueueFull now if acquire() would reject this priority."""
+        with self._lock:
+            if self._active >= self.max_concurrent:
+                self._reject_if_full(priority)
+
+    def stats(self) -> dict:
+        with self._lock:
+            queued = {p.name.lower(): 0 for p in Priority}
+            for priority, _, _ in self._heap:
+                queued[Priority(priority).name.lower()] += 1
+            return {
+                "active": self._active,
+                "max_concurrent": self.max_concurrent,
+                "queue_depth": len(self._heap),
+                "queued": queued,
+                "max_queue": self.max_queue,
+                "completed": self._completed,
+                "rejected": dict(self._rejected),
+                "avg_wait_seconds": round(self._avg_wait, 2),
+                "avg_hold_seconds": round(self._avg_hold, 2),
+            }
+
+    def _acquire_shared(self) -> ExitStack:
+        """Block until one of the slot files shared across processes is free.
+
+        Returns:
+            Stack holding the slot's lock; close it to release the slot
+        """
+        while True:
+            for i in range(self.max_concurrent):
+                stack = ExitStack()
+                held = stack.enter_context(
+                    file_lock(self.slot_dir / f"slot{i}.lock", blocking=False)
+                )
+                if held is not None:
+                    return stack
+                stack.close()
+            time.sleep(_SLOT_POLL_SECONDS)
+
+    def _reject_if_full(self, priority: Priority):
+        # Caller holds self._lock. Only waiters that would be served before
+        # this caller count, so a bulk backlog never blocks a preview.
+        if priority == Priority.BULK:
+            return
+        ahead = sum(1 for p, _, _ in self._heap if p <= priority)
+        if ahead < self.max_queue:
+            return
+        self._rejected[Priority(priority).name.lower()] += 1
+        raise LLMQueueFull(self._retry_after(ahead))
+
+    def _retry_after(self, ahead: int) -> int:
+        # Caller holds self._lock. Rough time for the waiters ahead to drain.
+        per_slot = self._avg_hold or 10.0
+        return max(1, math.ceil(per_slot * (ahead + 1) / self.max_concurrent))
+
+    def _record_wait(self, waited: float):
+        self._avg_wait += _EWMA_ALPHA * (waited - self._avg_wait)
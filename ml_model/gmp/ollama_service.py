@@ -2,33 +2,177 @@
 
 import json
 import logging
+import os
+import threading
+import time
+from concurrent.futures import Future
 import requests
-from typing import Optional
+from requests.adapters import HTTPAdapter
+from typing import Iterator, Optional
+
+from .llm_cache import LLMResponseCache, cache_key
+from .llm_scheduler import LLMQueueFull, LLMScheduler, Priority
 
 logger = logging.getLogger(__name__)
 
+# Keep-alive connections held open to Ollama. Should be at least the number
+# of LLM calls a process issues concurrently (section fan-out, previews, jobs).
+DEFAULT_POOL_SIZE = int(os.environ.get("OLLAMA_POOL_SIZE", "10"))
+
+SECTION_SYSTEM_PROMPT = (
+    "You are a GMP documentation specialist for pharmaceutical and "
+    "biotech manufacturing. Generate precise, regulatory-compliant "
+    "content for GMP documents. Use technical language appropriate for "
+    "cell therapy and biologics manufacturing. Be specific and detailed."
+)
+
+
+# Health cache / circuit breaker defaults
+HEALTH_TTL_SECONDS = 30
+CIRCUIT_FAILURE_THRESHOLD = 3
+CIRCUIT_COOLDOWN_SECONDS = 30
+
+
+class OllamaHealth:
+    """Thread-safe cached view of Ollama availability.
+
+    Updated both by explicit /api/tags probes and passively by the outcome
+    of real requests. After ``failure_threshold`` consecutive connection
+    failures or 5xx responses the circuit opens and callers fail fast for
+    ``cooldown`` seconds. Once the cooldown elapses calls go through again,
+    and a single further failure re-opens the circuit.
+    """
+
+    def __init__(self, ttl: float = HEALTH_TTL_SECONDS,
+                 failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 cooldown: float = CIRCUIT_COOLDOWN_SECONDS):
+        self.ttl = ttl
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._healthy: Optional[bool] = None
+        self._checked_at = 0.0
+        self._consecutive_failures = 0
+        self._open_until = 0.0
+
+    def cached(self) -> Optional[bool]:
+        """Return the cached state, or None if it is stale and needs a probe.
+
+        A healthy state is trusted for ``ttl`` seconds; an unhealthy one only
+        while the circuit is open, so recovery is noticed on the next call.
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._open_until:
+                return False
+            if self._healthy and now - self._checked_at < self.ttl:
+                return True
+            return None
+
+    def is_open(self) -> bool:
+        """True while the circuit breaker is rejecting calls."""
+        with self._lock:
+            return time.monotonic() < self._open_until
+
+    def record_success(self):
+        with self._lock:
+            self._healthy = True
+            self._checked_at = time.monotonic()
+            self._consecutive_failures = 0
+            self._open_until = 0.0
+
+    def record_failure(self):
+        with self._lock:
+            now = time.monotonic()
+            self._healthy = False
+            self._checked_at = now
+            self._consecutive_failures += 1
+            if self._consecutive_failures >= self.failure_threshold:
+                if now >= self._open_until:
+                    logger.warning(
+                        f"Ollama unreachable {self._consecutive_failures} times in a row; "
+                        f"failing fast for {self.cooldown}s"
+                    )
+                self._open_until = now + self.cooldown
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            now = time.monotonic()
+            return {
+                "healthy": self._healthy,
+                "checked_seconds_ago": round(now - self._checked_at, 1) if self._checked_at else None,
+                "consecutive_failures": self._consecutive_failures,
+                "circuit_open": now < self._open_until,
+                "retry_in_seconds": round(max(0.0, self._open_until - now), 1),
+            }
+
 
 class OllamaService:
     """Client for the Ollama local LLM API."""
 
     def __init__(self, base_url: str = "http://localhost:11434",
-                 model: str = "llama3"):
+                 model: str = "llama3",
+                 pool_size: Optional[int] = None,
+                 connect_timeout: float = 5,
+                 read_timeout: float = 120,
+                 cache: Optional[LLMResponseCache] = None,
+                 scheduler: Optional[LLMScheduler] = None):
         self.base_url = base_url.rstrip("/")
         self.model = model
-        self.timeout = 120  # seconds
+        self.cache = cache  # optional persistent response cache
+        # Caps and prioritizes concurrent calls to Ollama across server processes
+        self.scheduler = scheduler or LLMScheduler()
+        self.connect_timeout = connect_timeout  # seconds
+        self.read_timeout = read_timeout  # seconds, between bytes received
+
+        # One pooled keep-alive session shared by all threads, so concurrent
+        # section fills reuse TCP connections instead of opening new ones.
+        pool_size = pool_size or DEFAULT_POOL_SIZE
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+        self.health = OllamaHealth()
+
+        # Single-flight map of cache key -> Future for generations in progress
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+
+    @property
+    def timeout(self) -> tuple[float, float]:
+        """(connect, read) timeout tuple for generation requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def check_health(self, force: bool = False) -> bool:
+        """Check if Ollama is running and responsive.
+
+        Answers from the health cache when it is fresh (or the circuit is
+        open); only probes /api/tags when the cached state has expired or
+        ``force`` is set.
+        """
+        if not force:
+            cached = self.health.cached()
+            if cached is not None:
+                return cached
 
-    def check_health(self) -> bool:
-        """Check if Ollama is running and responsive."""
         try:
-            resp = requests.get(f"{self.base_url}/api/tags", timeout=5)
-            return resp.status_code == 200
-        except requests.ConnectionError:
+            resp = self.session.get(f"{self.base_url}/api/tags",
+                                    timeout=(self.connect_timeout, 5))
+        except (requests.ConnectionError, requests.Timeout):
+            self.health.record_failure()
+            return False
+        if resp.status_code != 200:
+            self.health.record_failure()
             return False
+        self.health.record_success()
+        return True
 
     def list_models(self) -> list[dict]:
         """List available models in Ollama."""
         try:
-            resp = requests.get(f"{self.base_url}/api/tags", timeout=10)
+            resp = self.session.get(f"{self.base_url}/api/tags",
+                                    timeout=(self.connect_timeout, 10))
             resp.raise_for_status()
             return resp.json().get("models", [])
         except Exception as e:
@@ -37,42 +181,78 @@ class OllamaService:
 
     def generate(self, prompt: str, system_prompt: Optional[str] = None,
                  temperature: float = 0.3, max_tokens: int = 8192,
-                 json_mode: bool = False) -> str:
+                 json_mode: bool = False, use_cache: bool = True,
+                 priority: Priority = Priority.INTERACTIVE) -> str:
         """Generate text using Ollama.
 
+        Concurrent calls with an identical request are coalesced: the first
+        caller performs the generation and the others wait for its result.
+
         Args:
             prompt: The user prompt
             system_prompt: Optional system-level instructions
             temperature: Sampling temperature (lower = more deterministic)
             max_tokens: Maximum tokens to generate
             json_mode: If True, use Ollama's native JSON format constraint
+            use_cache: If False, bypass the response cache (if configured)
+                and do not share an in-flight generation
+            priority: Scheduling class used when waiting for an LLM slot
 
         Returns:
             Generated text string
+
+        Raises:
+            LLMQueueFull: If the scheduler queue is over its threshold
         """
-        payload = {
-            "model": self.model,
-            "prompt": prompt,
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-                "num_predict": max_tokens,
-            }
-        }
-        if system_prompt:
-            payload["system"] = system_prompt
-        if json_mode:
-            payload["format"] = "json"
+        payload = self._build_payload(prompt, system_prompt, temperature,
+                                      max_tokens, json_mode, stream=False)
+        if not use_cache:
+            return self._post_generate(payload, priority)
+
+        key = cache_key(payload)
+        if self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        with self._inflight_lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+        if not leader:
+            logger.debug("Joining in-flight Ollama generation")
+            return future.result()
 
         try:
-            resp = requests.post(
-                f"{self.base_url}/api/generate",
-                json=payload,
-                timeout=self.timeout
-            )
-            resp.raise_for_status()
+            text = self._post_generate(payload, priority)
+            if self.cache:
+                self.cache.set(key, text)
+            future.set_result(text)
+            return text
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def _post_generate(self, payload: dict, priority: Priority) -> str:
+        """Send a non-streaming /api/generate request."""
+        self._fail_fast_if_open()
+
+        try:
+            with self.scheduler.slot(priority):
+                resp = self.session.post(
+                    f"{self.base_url}/api/generate",
+                    json=payload,
+                    timeout=self.timeout
+                )
+            self._record_status(resp)
             return resp.json().get("response", "")
         except requests.ConnectionError:
+            self.health.record_failure()
             logger.error("Cannot connect to Ollama. Is it running? (ollama serve)")
             raise RuntimeError(
                 "Ollama is not running. Start it with: ollama serve"
@@ -80,12 +260,108 @@ class OllamaService:
         except requests.Timeout:
             logger.error("Ollama request timed out")
             raise RuntimeError("LLM request timed out. Try a shorter prompt.")
+        except LLMQueueFull:
+            raise
         except Exception as e:
             logger.error(f"Ollama generation failed: {e}")
             raise
 
+    def generate_stream(self, prompt: str, system_prompt: Optional[str] = None,
+                        temperature: float = 0.3, max_tokens: int = 8192,
+                        json_mode: bool = False,
+                        use_cache: bool = True,
+                        priority: Priority = Priority.INTERACTIVE) -> Iterator[str]:
+        """Generate text using Ollama, yielding tokens as they arrive.
+
+        Consumes Ollama's NDJSON stream (one JSON object per line, the last
+        with ``"done": true``). Takes the same arguments as generate(); a
+        cache hit is yielded as a single fragment.
+
+        Yields:
+            Response text fragments in generation order
+        """
+        payload = self._build_payload(prompt, system_prompt, temperature,
+                                      max_tokens, json_mode, stream=True)
+
+        key = cache_key(payload) if self.cache and use_cache else None
+        if key:
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        self._fail_fast_if_open()
+        chunks = []
+
+        try:
+            with self.scheduler.slot(priority), self.session.post(
+                f"{self.base_url}/api/generate",
+                json=payload,
+                timeout=self.timeout,
+                stream=True,
+            ) as resp:
+                self._record_status(resp)
+                for line in resp.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("error"):
+                        raise RuntimeError(f"Ollama error: {chunk['error']}")
+                    if chunk.get("response"):
+                        chunks.append(chunk["response"])
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        if key:
+                            self.cache.set(key, "".join(chunks))
+                        break
+        except requests.ConnectionError:
+            self.health.record_failure()
+            logger.error("Cannot connect to Ollama. Is it running? (ollama serve)")
+            raise RuntimeError(
+                "Ollama is not running. Start it with: ollama serve"
+            )
+        except requests.Timeout:
+            logger.error("Ollama request timed out")
+            raise RuntimeError("LLM request timed out. Try a shorter prompt.")
+
+    def _record_status(self, resp: requests.Response):
+        """Raise for an error status, counting 5xx responses against the circuit."""
+        if resp.status_code >= 500:
+            self.health.record_failure()
+        resp.raise_for_status()
+        self.health.record_success()
+
+    def _fail_fast_if_open(self):
+        """Raise immediately instead of calling Ollama while the circuit is open."""
+        if self.health.is_open():
+            raise RuntimeError(
+                "Ollama is unavailable (repeated connection failures). "
+                "Retrying shortly."
+            )
+
+    def _build_payload(self, prompt: str, system_prompt: Optional[str],
+                       temperature: float, max_tokens: int,
+                       json_mode: bool, stream: bool) -> dict:
+        """Build the request body for Ollama's /api/generate."""
+        payload = {
+            "model": self.model,
+            "prompt": prompt,
+            "stream": stream,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens,
+            }
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+        if json_mode:
+            payload["format"] = "json"
+        return payload
+
     def generate_json(self, prompt: str, system_prompt: Optional[str] = None,
-                      temperature: float = 0.2, max_tokens: int = 8192) -> dict:
+                      temperature: float = 0.2, max_tokens: int = 8192,
+                      use_cache: bool = True,
+                      priority: Priority = Priority.INTERACTIVE) -> dict:
         """Generate and parse JSON output from the LLM.
 
         Uses Ollama's native JSON format constraint for reliable output.
@@ -96,6 +372,8 @@ class OllamaService:
             temperature=temperature,
             max_tokens=max_tokens,
             json_mode=True,
+            use_cache=use_cache,
+            priority=priority,
         )
 
         raw = raw.strip()
@@ -141,30 +419,31 @@ class OllamaService:
             )
 
     def generate_section_content(self, section_type: str, context: dict,
-                                 custom_prompt: Optional[str] = None) -> str:
+                                 custom_prompt: Optional[str] = None,
+                                 use_cache: bool = True,
+                                 priority: Priority = Priority.INTERACTIVE) -> str:
         """Generate content for a specific document section.
 
         Args:
             section_type: Type of section (e.g. 'procedure_steps', 'equipment_list')
             context: Dict with context info (product_name, process_type, etc.)
             custom_prompt: Optional override for the section-specific prompt
+            use_cache: Serve/store the response through the LLM cache
+            priority: Scheduling priority for the LLM call
 
         Returns:
             Generated content string
         """
         from .prompts import get_section_prompt
 
-        system = (
-            "You are a GMP documentation specialist for pharmaceutical and "
-            "biotech manufacturing. Generate precise, regulatory-compliant "
-            "content for GMP documents. Use technical language appropriate for "
-            "cell therapy and biologics manufacturing. Be specific and detailed."
-        )
-
         prompt = custom_prompt or get_section_prompt(section_type, context)
-        return self.generate(prompt, system_prompt=system, temperature=0.3)
+        return self.generate(prompt, system_prompt=SECTION_SYSTEM_PROMPT,
+                             temperature=0.3, use_cache=use_cache,
+                             priority=priority)
 
-    def generate_flowchart_steps(self, process_description: str) -> list[dict]:
+    def generate_flowchart_steps(self, process_description: str,
+                                 use_cache: bool = True,
+                                 priority: Priority = Priority.INTERACTIVE) -> list[dict]:
         """Generate structured flowchart steps from a process description.
 
         Returns:
@@ -182,5 +461,6 @@ class OllamaService:
             process_description=process_description
         )
 
-        result = self.generate_json(prompt, system_prompt=system)
+        result = self.generate_json(prompt, system_prompt=system,
+                                    use_cache=use_cache, priority=priority)
         return result.get("steps", [])
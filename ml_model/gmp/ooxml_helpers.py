@@ -4,6 +4,10 @@ Provides functions to set cell shading, table widths, page orientation,
 flowchart shapes, and other formatting that python-docx doesn't expose.
 """
 
+import copy
+import re
+from functools import lru_cache
+
 from lxml import etree
 from docx.oxml.ns import qn, nsdecls
 from docx.oxml import OxmlElement
@@ -211,6 +215,19 @@ def set_paragraph_spacing(paragraph, before: int = None, after: int = None,
     pPr = paragraph._p.get_or_add_pPr()
     for existing in pPr.findall(qn("w:spacing")):
         pPr.remove(existing)
+    pPr.append(copy.deepcopy(_spacing_template(before, after, line, line_rule)))
+
+
+# ── Property Templates ──
+#
+# Run and paragraph properties are drawn from a small set of combinations, so
+# each combination is built once and deep-copied (a single C-level tree copy)
+# instead of being rebuilt element by element for every run. The cached
+# templates are shared and must never be inserted into a document directly.
+
+@lru_cache(maxsize=None)
+def _spacing_template(before: int = None, after: int = None,
+                      line: int = None, line_rule: str = None) -> etree._Element:
     spacing = OxmlElement("w:spacing")
     if before is not None:
         spacing.set(qn("w:before"), str(before))
@@ -220,7 +237,56 @@ def set_paragraph_spacing(paragraph, before: int = None, after: int = None,
         spacing.set(qn("w:line"), str(line))
     if line_rule is not None:
         spacing.set(qn("w:lineRule"), line_rule)
-    pPr.append(spacing)
+    return spacing
+
+
+@lru_cache(maxsize=None)
+def _run_properties_template(style: str = None, bold: bool = False,
+                             size_half_pt: int = None,
+                             font: str = None) -> etree._Element:
+    rPr = OxmlElement("w:rPr")
+    if style:
+        etree.SubElement(rPr, qn("w:rStyle")).set(qn("w:val"), style)
+    if font:
+        rFonts = etree.SubElement(rPr, qn("w:rFonts"))
+        rFonts.set(qn("w:ascii"), font)
+        rFonts.set(qn("w:hAnsi"), font)
+    if bold:
+        etree.SubElement(rPr, qn("w:b"))
+    if size_half_pt:
+        etree.SubElement(rPr, qn("w:sz")).set(qn("w:val"), str(size_half_pt))
+    return rPr
+
+
+@lru_cache(maxsize=None)
+def _paragraph_properties_template(before: int = None,
+                                   after: int = None) -> etree._Element:
+    pPr = OxmlElement("w:pPr")
+    pPr.append(copy.deepcopy(_spacing_template(before, after)))
+    return pPr
+
+
+def clone_run_properties(style: str = None, bold: bool = False,
+                         size_half_pt: int = None,
+                         font: str = None) -> etree._Element:
+    """Return a fresh w:rPr for the given character style and direct formatting.
+
+    Args:
+        style: Character style ID (w:rStyle)
+        bold: Bold formatting
+        size_half_pt: Font size in half-points (20 = 10pt)
+        font: Font name for ASCII and high-ANSI text
+    """
+    return copy.deepcopy(_run_properties_template(style, bold, size_half_pt, font))
+
+
+def set_run_properties(run, style: str = None, bold: bool = False,
+                       size_half_pt: int = None, font: str = None):
+    """Replace a python-docx Run's properties with a cloned template."""
+    r = run._r
+    for existing in r.findall(qn("w:rPr")):
+        r.remove(existing)
+    r.insert(0, clone_run_properties(style, bold, size_half_pt, font))
 
 
 def set_row_height(row, height_dxa: int, rule: str = "exact"):
@@ -357,6 +423,156 @@ def set_cell_border(cell, side: str, val: str = "single", sz: int = 4,
     tcBorders.append(border)
 
 
+# ── Fast Table Emitter ──
+#
+# python-docx's table.add_row() and row.cells re-walk the whole table grid on
+# every access, so building a long procedure table cell by cell scales
+# super-linearly. The builders below emit w:tr / w:tc / w:p / w:r elements
+# directly, producing the same markup python-docx would.
+
+_RUN_SPECIAL_CHARS = re.compile(r"([\t\r\n])")
+
+
+def build_run(text: str = "", bold: bool = False, size_half_pt: int = None,
+              font: str = None, style: str = None) -> etree._Element:
+    """Build a w:r element.
+
+    Tabs become w:tab and newlines w:br, as with python-docx's run.text.
+
+    Args:
+        text: Run text
+        bold: Bold formatting
+        size_half_pt: Font size in half-points (20 = 10pt)
+        font: Font name for ASCII and high-ANSI text
+        style: Character style ID
+    """
+    r = OxmlElement("w:r")
+    if style or font or bold or size_half_pt:
+        r.append(clone_run_properties(style, bold, size_half_pt, font))
+
+    for chunk in _RUN_SPECIAL_CHARS.split(text or ""):
+        if not chunk:
+            continue
+        if chunk == "\t":
+            etree.SubElement(r, qn("w:tab"))
+        elif chunk in "\r\n":
+            etree.SubElement(r, qn("w:br"))
+        else:
+            t = etree.SubElement(r, qn("w:t"))
+            t.text = chunk
+            if chunk != chunk.strip():
+                t.set(qn("xml:space"), "preserve")
+    return r
+
+
+def build_paragraph(runs: list = (), before: int = None,
+                    after: int = None) -> etree._Element:
+    """Build a w:p element with optional spacing (twips) and runs."""
+    p = OxmlElement("w:p")
+    if before is not None or after is not None:
+        p.append(copy.deepcopy(_paragraph_properties_template(before, after)))
+    p.extend(runs)
+    return p
+
+
+def build_cell(paragraphs: list, width_dxa: int, fill: str = None,
+               valign: str = None, gridspan: int = 1,
+               vmerge: str = None) -> etree._Element:
+    """Build a w:tc element.
+
+    Args:
+        paragraphs: w:p elements; an empty paragraph is added if none
+        width_dxa: Cell width (sum of the spanned grid columns)
+        fill: Hex background fill color
+        valign: 'top', 'center', or 'bottom'
+        gridspan: Number of grid columns spanned
+        vmerge: 'restart' to start a vertical merge, 'continue' to extend one
+    """
+    tc = OxmlElement("w:tc")
+    tcPr = etree.SubElement(tc, qn("w:tcPr"))
+    tcW = etree.SubElement(tcPr, qn("w:tcW"))
+    tcW.set(qn("w:type"), "dxa")
+    tcW.set(qn("w:w"), str(width_dxa))
+    if gridspan > 1:
+        etree.SubElement(tcPr, qn("w:gridSpan")).set(qn("w:val"), str(gridspan))
+    if vmerge:
+        vMerge = etree.SubElement(tcPr, qn("w:vMerge"))
+        if vmerge == "restart":
+            vMerge.set(qn("w:val"), "restart")
+    if fill:
+        shd = etree.SubElement(tcPr, qn("w:shd"))
+        shd.set(qn("w:val"), "clear")
+        shd.set(qn("w:color"), "auto")
+        shd.set(qn("w:fill"), fill)
+    if valign:
+        etree.SubElement(tcPr, qn("w:vAlign")).set(qn("w:val"), valign)
+    tc.extend(paragraphs or [OxmlElement("w:p")])
+    return tc
+
+
+def build_row(cells: list, height_dxa: int = None,
+              height_rule: str = "exact") -> etree._Element:
+    """Build a w:tr element from w:tc elements."""
+    tr = OxmlElement("w:tr")
+    if height_dxa is not None:
+        trPr = etree.SubElement(tr, qn("w:trPr"))
+        trHeight = etree.SubElement(trPr, qn("w:trHeight"))
+        trHeight.set(qn("w:val"), str(height_dxa))
+        trHeight.set(qn("w:hRule"), height_rule)
+    tr.extend(cells)
+    return tr
+
+
+def build_span_row(paragraphs: list, col_widths: list[int], fill: str = None,
+                   valign: str = None) -> etree._Element:
+    """Build a row with a single cell spanning every grid column."""
+    return build_row([build_cell(
+        paragraphs, sum(col_widths), fill=fill, valign=valign,
+        gridspan=len(col_widths),
+    )])
+
+
+def append_rows(table, rows: list):
+    """Append prebuilt w:tr elements to a python-docx Table."""
+    table._tbl.extend(rows)
+
+
+# ── Bookmarks ──
+
+def build_bookmark(name: str, bookmark_id: int) -> tuple:
+    """Build a matching w:bookmarkStart / w:bookmarkEnd pair.
+
+    Names starting with an underscore are hidden bookmarks in Word.
+
+    Returns:
+        (bookmarkStart, bookmarkEnd) elements
+    """
+    start = OxmlElement("w:bookmarkStart")
+    start.set(qn("w:id"), str(bookmark_id))
+    start.set(qn("w:name"), name)
+    end = OxmlElement("w:bookmarkEnd")
+    end.set(qn("w:id"), str(bookmark_id))
+    return start, end
+
+
+def find_bookmark_range(parent, name: str):
+    """Find a bookmark among the direct children of parent (e.g. w:body).
+
+    Returns:
+        (bookmarkStart, bookmarkEnd) elements, both children of parent with
+        the end after the start, or None if not present
+    """
+    for start in parent.iterchildren(qn("w:bookmarkStart")):
+        if start.get(qn("w:name")) != name:
+            continue
+        bookmark_id = start.get(qn("w:id"))
+        for end in start.itersiblings(qn("w:bookmarkEnd")):
+            if end.get(qn("w:id")) == bookmark_id:
+                return start, end
+        return None
+    return None
+
+
 # ── Flowchart OOXML Drawing Shapes ──
 
 EMU_PER_INCH = 914400
@@ -486,6 +702,8 @@ def build_connector_shape(x1: int, y1: int, x2: int, y2: int,
 
     # Transform
     xfrm = etree.SubElement(spPr, f"{{{DML_NS}}}xfrm")
+    if x2 < x1:
+        xfrm.set("flipH", "1")
     if y2 < y1:
         xfrm.set("flipV", "1")
     off = etree.SubElement(xfrm, f"{{{DML_NS}}}off")
@@ -514,6 +732,75 @@ def build_connector_shape(x1: int, y1: int, x2: int, y2: int,
     return wsp
 
 
+def build_polyline_connector_shape(points: list[tuple[int, int]],
+                                  line_color: str = "404040") -> etree._Element:
+    """Build an arrow connector following a routed polyline.
+
+    Args:
+        points: Path in EMU from the source attachment point to the target's;
+            the arrowhead is drawn at the last point
+
+    Returns:
+        lxml Element representing wps:wsp with a custom line geometry
+    """
+    if len(points) == 2:
+        (x1, y1), (x2, y2) = points
+        return build_connector_shape(x1, y1, x2, y2, line_color)
+
+    nsmap = {
+        "wps": WPS_NS,
+        "a": DML_NS,
+    }
+    min_x = min(x for x, _ in points)
+    min_y = min(y for _, y in points)
+    width = max(x for x, _ in points) - min_x or 1
+    height = max(y for _, y in points) - min_y or 1
+
+    wsp = etree.Element(f"{{{WPS_NS}}}wsp", nsmap=nsmap)
+    etree.SubElement(wsp, f"{{{WPS_NS}}}cNvCnPr")
+    spPr = etree.SubElement(wsp, f"{{{WPS_NS}}}spPr")
+
+    xfrm = etree.SubElement(spPr, f"{{{DML_NS}}}xfrm")
+    off = etree.SubElement(xfrm, f"{{{DML_NS}}}off")
+    off.set("x", str(min_x))
+    off.set("y", str(min_y))
+    ext = etree.SubElement(xfrm, f"{{{DML_NS}}}ext")
+    ext.set("cx", str(width))
+    ext.set("cy", str(height))
+
+    # Custom geometry: one open path through all points
+    custGeom = etree.SubElement(spPr, f"{{{DML_NS}}}custGeom")
+    for tag in ("avLst", "gdLst", "ahLst", "cxnLst"):
+        etree.SubElement(custGeom, f"{{{DML_NS}}}{tag}")
+    rect = etree.SubElement(custGeom, f"{{{DML_NS}}}rect")
+    for side in ("l", "t", "r", "b"):
+        rect.set(side, "0")
+    pathLst = etree.SubElement(custGeom, f"{{{DML_NS}}}pathLst")
+    path = etree.SubElement(pathLst, f"{{{DML_NS}}}path")
+    path.set("w", str(width))
+    path.set("h", str(height))
+    path.set("fill", "none")
+    for i, (x, y) in enumerate(points):
+        step = etree.SubElement(path, f"{{{DML_NS}}}{'lnTo' if i else 'moveTo'}")
+        pt = etree.SubElement(step, f"{{{DML_NS}}}pt")
+        pt.set("x", str(x - min_x))
+        pt.set("y", str(y - min_y))
+
+    # Line style with arrow
+    ln = etree.SubElement(spPr, f"{{{DML_NS}}}ln")
+    ln.set("w", "12700")
+    solidFill = etree.SubElement(ln, f"{{{DML_NS}}}solidFill")
+    srgbClr = etree.SubElement(solidFill, f"{{{DML_NS}}}srgbClr")
+    srgbClr.set("val", line_color)
+    etree.SubElement(ln, f"{{{DML_NS}}}round")
+    tailEnd = etree.SubElement(ln, f"{{{DML_NS}}}tailEnd")
+    tailEnd.set("type", "triangle")
+    tailEnd.set("w", "med")
+    tailEnd.set("len", "med")
+
+    return wsp
+
+
 def build_flowchart_drawing(shapes: list, total_width_emu: int,
                             total_height_emu: int) -> etree._Element:
     """Wrap flowchart shapes in a complete wp:inline drawing element.
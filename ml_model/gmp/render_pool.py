@@ -0,0 +1,333 @@
+"""Warm process pool for DOCX rendering.
+
+GMPWordEngine.generate() is pure CPU work in python-docx/lxml and holds the
+GIL for its whole duration, so rendering a large batch record on a request
+thread stalls every other request in the same server process. RenderPool
+runs renders in worker processes that load every template once at startup
+and reuse one engine, so each call only ships the section data across the
+process boundary. Renders can either return the DOCX bytes or stream the
+document straight to a file path from inside the worker, which avoids
+holding and pickling the whole document.
+
+Each render is bounded by a timeout. Workers enforce it themselves with
+SIGALRM where available and report when they pick a task up, so time spent
+queued behind other renders never counts against it. If a worker still
+does not answer in time after starting (for example, stuck inside C code),
+only that render fails: the pool is replaced and every other render queued
+or running on it is resubmitted to the new pool.
+"""
+
+import logging
+import os
+import signal
+import threading
+import time
+from concurrent.futures import Future, InvalidStateError, ProcessPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+from itertools import count
+from multiprocessing import get_context
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# Every gunicorn worker (WEB_CONCURRENCY) owns its own render pool, so the
+# default CPU budget is split between them
+_SERVER_PROCESSES = max(1, int(os.environ.get("WEB_CONCURRENCY") or 1))
+
+# Worker processes per server process; 0 renders in the calling process instead
+DEFAULT_RENDER_WORKERS = int(os.environ.get(
+    "GMP_RENDER_WORKERS", str(max(1, min(4, os.cpu_count() or 1) // _SERVER_PROCESSES))
+))
+DEFAULT_RENDER_TIMEOUT = int(os.environ.get("GMP_RENDER_TIMEOUT", "120"))
+
+# Extra time the parent waits beyond the worker-side timeout, counted from
+# when the worker started the render, before it gives up on the worker
+_TIMEOUT_GRACE_SECONDS = 5
+
+# How often a waiting caller checks whether its render has overrun
+_WATCHDOG_INTERVAL = 1.0
+
+
+class RenderTimeout(RuntimeError):
+    """Raised when a render exceeds its time budget."""
+
+
+# Per-worker state, populated by _init_worker()
+_worker_loader = None
+_worker_engine = None
+_worker_started = None
+
+
+def _init_worker(templates_dir: Optional[str], started=None):
+    global _worker_loader, _worker_engine, _worker_started
+    from .template_loader import TemplateLoader
+    from .word_engine import GMPWordEngine
+
+    _worker_started = started
+    _worker_loader = TemplateLoader(templates_dir)
+    _worker_loader.warm(rebuild=False)
+    _worker_engine = GMPWordEngine()
+
+
+def _on_alarm(signum, frame):
+    raise RenderTimeout("Document rendering timed out")
+
+
+def _render_in_worker(task_id: int, template_id: str, data: dict, timeout: int,
+                      path: Optional[str] = None, source: Optional[str] = None,
+                      section_ids: Optional[list[str]] = None):
+    if _worker_started is not None:
+        # SimpleQueue writes synchronously, so the parent hears about the
+        # start even if the render then wedges the interpreter
+        _worker_started.put((task_id, time.time()))
+    template = _worker_loader.load_template(template_id)
+    use_alarm = timeout > 0 and hasattr(signal, "setitimer")
+    if use_alarm:
+        previous = signal.signal(signal.SIGALRM, _on_alarm)
+        signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return _render(template, data, path, source, section_ids, _worker_engine)
+    finally:
+        if use_alarm:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+
+
+def _render(template, data: dict, path: Optional[str], source: Optional[str],
+            section_ids: Optional[list[str]], engine=None):
+    from .word_engine import (
+        render_document, render_document_to_file, rerender_sections_to_file,
+    )
+
+    if source:
+        return rerender_sections_to_file(template, data, source, section_ids, path,
+                                         engine=engine)
+    if path:
+        return render_document_to_file(template, data, path, engine=engine)
+    if engine is not None:
+        return engine.generate(template, data)
+    return render_document(template, data)
+
+
+class _RenderFuture(Future):
+    """Future handed to callers; outlives the executor future running it."""
+
+    def __init__(self, task_id: int):
+        super().__init__()
+        self.task_id = task_id
+
+
+class _Task:
+    """A submitted render and where it is currently running."""
+
+    __slots__ = ("id", "args", "future", "executor", "inner", "started_at")
+
+    def __init__(self, task_id: int, args: tuple):
+        self.id = task_id
+        self.args = args
+        self.future = _RenderFuture(task_id)
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self.inner: Optional[Future] = None
+        self.started_at: Optional[float] = None
+
+
+class RenderPool:
+    """Renders documents by template ID in pre-warmed worker processes."""
+
+    def __init__(self, templates_dir: Optional[str] = None,
+                 max_workers: Optional[int] = None,
+                 timeout: Optional[int] = None):
+        self.templates_dir = str(templates_dir) if templates_dir else None
+        self.max_workers = DEFAULT_RENDER_WORKERS if max_workers is None else max_workers
+        self.timeout = DEFAULT_RENDER_TIMEOUT if timeout is None else timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._started = None
+        self._tasks: dict[int, _Task] = {}
+        self._ids = count()
+        self._lock = threading.RLock()
+        self._local_loader = None
+
+    def render(self, template_id: str, data: dict) -> bytes:
+        """Render one document and return the DOCX bytes.
+
+        Raises:
+            RenderTimeout: If rendering exceeds the configured timeout
+            FileNotFoundError: If the template does not exist
+        """
+        return self._wait(self.submit(template_id, data))
+
+    def render_to_file(self, template_id: str, data: dict, path: str) -> int:
+        """Render one document straight to path and return its size in bytes.
+
+        Raises:
+            RenderTimeout: If rendering exceeds the configured timeout
+            FileNotFoundError: If the template does not exist
+        """
+        return self._wait(self.submit_to_file(template_id, data, path))
+
+    def rerender_to_file(self, template_id: str, data: dict, source: str,
+                         section_ids: list[str], path: str) -> int:
+        """Rebuild only section_ids of the DOCX at source, writing it to path.
+
+        Raises:
+            RenderTimeout: If rendering exceeds the configured timeout
+            ValueError: If source has no bookmark for one of the sections
+        """
+        return self._wait(self._submit(template_id, data, str(path),
+                                       source=str(source), section_ids=list(section_ids)))
+
+    def submit(self, template_id: str, data: dict) -> Future:
+        """Schedule a render and return a Future resolving to DOCX bytes."""
+        return self._submit(template_id, data)
+
+    def submit_to_file(self, template_id: str, data: dict, path: str) -> Future:
+        """Schedule a render to path and return a Future resolving to its size."""
+        return self._submit(template_id, data, str(path))
+
+    def wait(self, future: Future):
+        """Wait for a submitted render with the same timeout as render().
+
+        Raises:
+            RenderTimeout: If the worker is unresponsive after starting it
+        """
+        return self._wait(future)
+
+    def shutdown(self):
+        self._reset()
+
+    def _wait(self, future: Future):
+        task_id = getattr(future, "task_id", None)
+        if task_id is None or self.timeout <= 0:
+            return future.result()
+
+        limit = self.timeout + _TIMEOUT_GRACE_SECONDS
+        while True:
+            try:
+                return future.result(timeout=_WATCHDOG_INTERVAL)
+            except FutureTimeout:
+                pass
+            started_at = self._started_at(task_id)
+            if started_at is not None and time.time() - started_at > limit:
+                logger.error(f"Render worker unresponsive {limit}s into a render, "
+                             f"replacing pool")
+                self._abandon(task_id)
+                raise RenderTimeout("Document rendering timed out")
+
+    def _submit(self, template_id: str, data: dict, path: Optional[str] = None,
+                source: Optional[str] = None,
+                section_ids: Optional[list[str]] = None) -> Future:
+        if self.max_workers <= 0:
+            future = Future()
+            try:
+                future.set_result(
+                    self._render_local(template_id, data, path, source, section_ids)
+                )
+            except Exception as e:
+                future.set_exception(e)
+            return future
+
+        task = _Task(next(self._ids), (template_id, data, self.timeout, path,
+                                       source, section_ids))
+        with self._lock:
+            self._tasks[task.id] = task
+            try:
+                self._dispatch(task)
+            except BrokenProcessPool:
+                # A worker died (OOM, signal); start a fresh pool and retry once
+                logger.warning("Render pool broken, restarting")
+                self._reset()
+                self._dispatch(task)
+        return task.future
+
+    def _dispatch(self, task: _Task):
+        """Send task to the current pool. Must be called with the lock held."""
+        executor = self._pool()
+        inner = executor.submit(_render_in_worker, task.id, *task.args)
+        task.executor, task.inner, task.started_at = executor, inner, None
+        inner.add_done_callback(lambda f, task=task: self._settle(task, f))
+
+    def _settle(self, task: _Task, inner: Future):
+        """Pass an executor result on to the caller's future."""
+        with self._lock:
+            if task.inner is not inner:
+                return  # resubmitted to a newer pool
+            self._tasks.pop(task.id, None)
+        try:
+            if inner.cancelled():
+                task.future.cancel()
+            elif inner.exception() is not None:
+                task.future.set_exception(inner.exception())
+            else:
+                task.future.set_result(inner.result())
+        except InvalidStateError:
+            pass  # already failed by _abandon()
+
+    def _started_at(self, task_id: int) -> Optional[float]:
+        """When a worker picked the task up, or None while it is still queued."""
+        with self._lock:
+            started = self._started
+            while started is not None and not started.empty():
+                started_id, at = started.get()
+                if started_id in self._tasks:
+                    self._tasks[started_id].started_at = at
+            task = self._tasks.get(task_id)
+            return task.started_at if task is not None else None
+
+    def _abandon(self, task_id: int):
+        """Fail a hung render and move every other render to a fresh pool.
+
+        ProcessPoolExecutor cannot replace a single worker, and killing one
+        breaks the pool for everyone, so the other tasks are resubmitted
+        before the old workers are terminated.
+        """
+        with self._lock:
+            hung = self._tasks.pop(task_id, None)
+            if hung is None:
+                return
+            executor = hung.executor
+            if executor is self._executor:
+                self._executor, self._started = None, None
+            moved = [t for t in self._tasks.values() if t.executor is executor]
+            for task in moved:
+                self._dispatch(task)
+        try:
+            hung.future.set_exception(RenderTimeout("Document rendering timed out"))
+        except InvalidStateError:
+            pass
+        if moved:
+            logger.warning(f"Resubmitted {len(moved)} renders to a fresh pool")
+
+        # There is no public API for killing a hung worker
+        for process in list(getattr(executor, "_processes", {}).values()):
+            process.kill()
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def _pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                context = get_context("spawn")
+                self._started = context.SimpleQueue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(self.templates_dir, self._started),
+                )
+                logger.info(f"Started DOCX render pool with {self.max_workers} workers")
+            return self._executor
+
+    def _reset(self):
+        with self._lock:
+            executor, self._executor, self._started = self._executor, None, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _render_local(self, template_id: str, data: dict, path: Optional[str],
+                      source: Optional[str], section_ids: Optional[list[str]]):
+        from .template_loader import TemplateLoader
+
+        if self._local_loader is None:
+            self._local_loader = TemplateLoader(self.templates_dir)
+        template = self._local_loader.load_template(template_id)
+        return _render(template, data, path, source, section_ids)
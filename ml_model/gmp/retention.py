@@ -0,0 +1,297 @@
+"""Retention and garbage collection for generated files.
+
+Every generation writes a DOCX into ``generated_docs`` and every training
+export a JSONL/JSON file into ``training_exports``; nothing else ever
+deletes them, and the volume they fill is usually the one holding the
+SQLite database. RetentionService periodically prunes both directories:
+
+1. Only the newest ``keep_latest`` Document records of each logical
+   document (same account, type and doc number or title) keep their file.
+2. Files no Document record points at (anonymous generations, batch zips,
+   training exports) are deleted after ``orphan_max_age``.
+3. Any file older than ``max_age`` is deleted.
+4. If the directories still exceed ``max_bytes``, the oldest files go
+   first, orphans before files that back a Document record.
+
+Files touched within the last ``min_age`` seconds are never deleted, so
+renders and downloads in flight are safe. Handing out a file again through
+the dedup store (see doc_store) refreshes its mtime, so age is counted from
+its last use. Every server process runs the
+service, so sweeps are serialized through a lock file that also records
+when the last sweep finished and the cumulative totals of all sweeps; a
+scheduled sweep is skipped when another process swept within the interval. Whenever a file backing a
+Document record is deleted (or found missing) the record's ``file_path`` is
+cleared; regenerating the document renders it again.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from .database import db, Document
+from .file_lock import file_lock
+
+logger = logging.getLogger(__name__)
+
+# 0 disables the corresponding policy
+DEFAULT_MAX_AGE_DAYS = float(os.environ.get("GMP_RETENTION_MAX_AGE_DAYS", "90"))
+DEFAULT_ORPHAN_MAX_AGE_HOURS = float(os.environ.get("GMP_RETENTION_ORPHAN_HOURS", "24"))
+DEFAULT_MAX_MB = float(os.environ.get("GMP_RETENTION_MAX_MB", "512"))
+DEFAULT_KEEP_LATEST = int(os.environ.get("GMP_RETENTION_KEEP_LATEST", "5"))
+# Seconds between background sweeps; 0 disables the background thread
+DEFAULT_INTERVAL = int(os.environ.get("GMP_RETENTION_INTERVAL", "3600"))
+
+# Files younger than this are never deleted, whatever the policy
+DEFAULT_MIN_AGE_SECONDS = 600
+
+
+class RetentionService:
+    """Applies retention policies to generated_docs and training_exports."""
+
+    def __init__(self, app, docs_dir: Path, exports_dir: Optional[Path] = None,
+                 max_age_days: float = DEFAULT_MAX_AGE_DAYS,
+                 orphan_max_age_hours: float = DEFAULT_ORPHAN_MAX_AGE_HOURS,
+                 max_bytes: int = int(DEFAULT_MAX_MB * 1024 * 1024),
+                 keep_latest: int = DEFAULT_KEEP_LATEST,
+                 interval: int = DEFAULT_INTERVAL,
+                 min_age: int = DEFAULT_MIN_AGE_SECONDS,
+                 doc_store=None, lock_path: Optional[Path] = None):
+        self.app = app
+        self.docs_dir = Path(docs_dir)
+        self.exports_dir = Path(exports_dir) if exports_dir else None
+        self.max_age = max_age_days * 86400
+        self.orphan_max_age = orphan_max_age_hours * 3600
+        self.max_bytes = max_bytes
+        self.keep_latest = keep_latest
+        self.interval = interval
+        self.min_age = min_age
+        self.doc_store = doc_store
+        # Shared by every process serving the same docs_dir
+        self.lock_path = Path(lock_path) if lock_path else \
+            self.docs_dir.parent / ".retention.lock"
+
+        self._run_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Start the background sweep thread (no-op if interval is 0)."""
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(target=self._loop, name="gmp-retention",
+                                        daemon=True)
+        self._thread.start()
+        logger.info(f"Retention sweeps every {self.interval}s")
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self, scheduled: bool = False) -> dict:
+        """Apply every policy once and return what was reclaimed.
+
+        Args:
+            scheduled: Called by the background thread; skip the sweep if
+                another process is sweeping or swept within the interval
+
+        Returns:
+            Sweep report, or ``{"skipped": True, "reason": ...}``
+        """
+        with self._run_lock, file_lock(self.lock_path, blocking=not scheduled) as lock:
+            if lock is None:
+                return {"skipped": True, "reason": "another process is sweeping"}
+            state = self._read_state(lock)
+            if scheduled and time.time() - state.get("last_sweep_at", 0) < self.interval:
+                return {"skipped": True, "reason": "swept recently by another process"}
+            with self.app.app_context():
+                try:
+                    report = self._sweep()
+                finally:
+                    db.session.remove()
+            state = {
+                "last_sweep_at": time.time(),
+                "runs": state.get("runs", 0) + 1,
+                "deleted_files": state.get("deleted_files", 0) + report["deleted_files"],
+                "reclaimed_bytes": state.get("reclaimed_bytes", 0) + report["reclaimed_bytes"],
+                "last_run": report,
+            }
+            lock.seek(0)
+            lock.truncate()
+            lock.write(json.dumps(state))
+            lock.flush()
+
+        if report["deleted_files"] or report["cleared_records"]:
+            logger.info(
+                f"Retention: deleted {report['deleted_files']} files "
+                f"({report['reclaimed_bytes'] / 1048576:.1f} MB), "
+                f"cleared {report['cleared_records']} document records"
+            )
+        return report
+
+    def stats(self) -> dict:
+        """Current usage and the totals of every sweep by any process."""
+        usage = self._scan()
+        with file_lock(self.lock_path, blocking=False) as lock:
+            if lock is not None:
+                state = self._read_state(lock)
+            else:
+                # A sweep is running; it only rewrites the file as it finishes
+                with open(self.lock_path, "r") as f:
+                    state = self._read_state(f)
+        return {
+            "policies": {
+                "max_age_days": self.max_age / 86400,
+                "orphan_max_age_hours": self.orphan_max_age / 3600,
+                "max_bytes": self.max_bytes,
+                "keep_latest": self.keep_latest,
+                "interval_seconds": self.interval,
+            },
+            "files": len(usage),
+            "bytes": sum(f["size"] for f in usage.values()),
+            "runs": state.get("runs", 0),
+            "deleted_files": state.get("deleted_files", 0),
+            "reclaimed_bytes": state.get("reclaimed_bytes", 0),
+            "last_run": state.get("last_run"),
+        }
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once(scheduled=True)
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {e}", exc_info=True)
+
+    @staticmethod
+    def _read_state(f) -> dict:
+        """Last sweep time and cumulative totals shared through the lock file."""
+        f.seek(0)
+        try:
+            state = json.loads(f.read() or "{}")
+        except ValueError:
+            return {}
+        return state if isinstance(state, dict) else {}
+
+    def _sweep(self) -> dict:
+        started = time.monotonic()
+        now = time.time()
+        files = self._scan()
+        scanned = len(files)
+
+        # filename -> ids of the Document records that point at it
+        records = Document.query.filter(Document.file_path != "").with_entities(
+            Document.id, Document.account_id, Document.doc_type,
+            Document.doc_number, Document.title, Document.file_path,
+            Document.created_at,
+        ).all()
+        docs_dir = self.docs_dir.resolve()
+        records = [r for r in records if Path(r.file_path).parent.resolve() == docs_dir]
+        referenced: dict[str, set[int]] = {}
+        for r in records:
+            referenced.setdefault(Path(r.file_path).name, set()).add(r.id)
+        cleared = {
+            doc_id for name, ids in referenced.items()
+            if name not in files for doc_id in ids
+        }
+
+        doomed: dict[str, str] = {}
+
+        # 1. keep-latest-N per logical document
+        if self.keep_latest > 0:
+            groups: dict[tuple, list] = {}
+            for r in records:
+                key = (r.account_id, r.doc_type, r.doc_number or r.title)
+                groups.setdefault(key, []).append(r)
+            kept_files, expired_files = set(), set()
+            for group in groups.values():
+                group.sort(key=lambda r: (r.created_at or datetime.min, r.id), reverse=True)
+                kept_files.update(Path(r.file_path).name for r in group[:self.keep_latest])
+                expired_files.update(Path(r.file_path).name for r in group[self.keep_latest:])
+            for name in expired_files - kept_files:
+                if name in files:
+                    doomed[name] = "keep_latest"
+
+        # 2./3. age limits
+        for name, info in files.items():
+            age = now - info["mtime"]
+            if name not in referenced and self.orphan_max_age > 0 \
+                    and age > self.orphan_max_age:
+                doomed.setdefault(name, "orphan")
+            elif self.max_age > 0 and age > self.max_age:
+                doomed.setdefault(name, "max_age")
+
+        # 4. size budget, oldest first, orphans before referenced files
+        if self.max_bytes > 0:
+            total = sum(f["size"] for n, f in files.items() if n not in doomed)
+            if total > self.max_bytes:
+                candidates = sorted(
+                    (n for n in files if n not in doomed),
+                    key=lambda n: (n in referenced, files[n]["mtime"]),
+                )
+                for name in candidates:
+                    if total <= self.max_bytes:
+                        break
+                    doomed[name] = "max_bytes"
+                    total -= files[name]["size"]
+
+        by_reason: dict[str, int] = {}
+        deleted = reclaimed = 0
+        for name, reason in doomed.items():
+            info = files[name]
+            if now - info["mtime"] < self.min_age:
+                continue
+            try:
+                info["path"].unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Retention: could not delete {info['path']}: {e}")
+                continue
+            deleted += 1
+            reclaimed += info["size"]
+            by_reason[reason] = by_reason.get(reason, 0) + 1
+            cleared.update(referenced.get(name, ()))
+            if self.doc_store is not None and info["path"].parent == self.docs_dir:
+                self.doc_store.discard_file(name)
+
+        if cleared:
+            Document.query.filter(Document.id.in_(cleared)).update(
+                {"file_path": ""}, synchronize_session=False,
+            )
+            db.session.commit()
+
+        return {
+            "finished_at": datetime.utcnow().isoformat(timespec="seconds"),
+            "duration_seconds": round(time.monotonic() - started, 3),
+            "scanned_files": scanned,
+            "deleted_files": deleted,
+            "reclaimed_bytes": reclaimed,
+            "remaining_bytes": sum(f["size"] for f in files.values()) - reclaimed,
+            "cleared_records": len(cleared),
+            "by_reason": by_reason,
+        }
+
+    def _scan(self) -> dict[str, dict]:
+        """Map each managed filename to its path, size and mtime.
+
+        Training exports are keyed by a prefixed name so they can never be
+        mistaken for a DOCX that a Document record points at.
+        """
+        files = {}
+        for directory, prefix in ((self.docs_dir, ""), (self.exports_dir, "exports/")):
+            if directory is None or not directory.is_dir():
+                continue
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    st = entry.stat(follow_symlinks=False)
+                    files[prefix + entry.name] = {
+                        "path": Path(entry.path),
+                        "size": st.st_size,
+                        "mtime": st.st_mtime,
+                    }
+        return files
@@ -1,16 +1,30 @@
 """Flask Blueprint for GMP document generation API endpoints."""
 
+import json
 import logging
-from flask import Blueprint, request, jsonify
+from flask import (
+    Blueprint, Response, current_app, request, jsonify, stream_with_context,
+)
 
 from .document_generator import GMPDocumentGenerator
+from .flowchart_layout import FlowchartLayoutEngine
+from .flowchart_render import DEFAULT_DPI, render_png, render_svg
+from .job_queue import GenerationJobQueue
+from .retention import RetentionService
+from .training_export import EXPORT_DIR
+from .llm_scheduler import LLMQueueFull
 
 logger = logging.getLogger(__name__)
 
 gmp_bp = Blueprint("gmp", __name__, url_prefix="/api/gmp")
 
+# Upper bound on documents accepted by /generate/batch
+MAX_BATCH_SIZE = 100
+
 # Lazy initialization
 _generator = None
+_job_queue = None
+_retention = None
 
 
 def get_generator() -> GMPDocumentGenerator:
@@ -22,6 +36,37 @@ def get_generator() -> GMPDocumentGenerator:
     return _generator
 
 
+def get_job_queue() -> GenerationJobQueue:
+    """Return the process-wide job queue, resuming unfinished jobs on first use."""
+    global _job_queue
+    if _job_queue is None:
+        _job_queue = GenerationJobQueue(current_app._get_current_object(),
+                                        get_generator())
+        _job_queue.resume_pending()
+        _job_queue.start()
+    return _job_queue
+
+
+def get_retention_service() -> RetentionService:
+    """Return the process-wide retention service, starting its sweep thread on first use."""
+    global _retention
+    if _retention is None:
+        gen = get_generator()
+        _retention = RetentionService(current_app._get_current_object(),
+                                      gen.generated_docs_dir, EXPORT_DIR,
+                                      doc_store=gen.doc_store)
+        _retention.start()
+    return _retention
+
+
+def llm_busy_response(e: LLMQueueFull):
+    """503 with Retry-After for requests shed by the LLM scheduler."""
+    resp = jsonify({"success": False, "error": str(e), "retry_after": e.retry_after})
+    resp.status_code = 503
+    resp.headers["Retry-After"] = str(e.retry_after)
+    return resp
+
+
 @gmp_bp.route("/templates", methods=["GET"])
 def list_templates():
     """List all available GMP document templates."""
@@ -68,6 +113,7 @@ def generate_document():
             "filename": result["filename"],
             "download_url": result["download_url"],
             "preview_sections": result["preview_sections"],
+            "document_record_id": result.get("document_record_id"),
         })
     except FileNotFoundError as e:
         return jsonify({"success": False, "error": str(e)}), 404
@@ -78,6 +124,119 @@ def generate_document():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@gmp_bp.route("/generate/batch", methods=["POST"])
+def generate_batch():
+    """Generate many documents of one type in a single request.
+
+    Body: {"doc_type": str, "documents": [user_input, ...],
+    "common": {...} (merged under every document), "output": "manifest" | "zip"}
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"success": False, "error": "No JSON body"}), 400
+
+        doc_type = data.get("doc_type")
+        if not doc_type:
+            return jsonify({"success": False, "error": "doc_type is required"}), 400
+
+        documents = data.get("documents")
+        if not isinstance(documents, list) or not documents:
+            return jsonify({"success": False, "error": "documents must be a non-empty list"}), 400
+        if len(documents) > MAX_BATCH_SIZE:
+            return jsonify({
+                "success": False,
+                "error": f"At most {MAX_BATCH_SIZE} documents per batch",
+            }), 400
+
+        output = data.get("output", "manifest")
+        if output not in ("manifest", "zip"):
+            return jsonify({"success": False, "error": "output must be 'manifest' or 'zip'"}), 400
+
+        common = data.get("common") or {}
+        inputs = [{**common, **(doc or {})} for doc in documents]
+
+        gen = get_generator()
+        batch = gen.generate_batch(doc_type, inputs, as_zip=(output == "zip"))
+        for doc in batch["documents"]:
+            doc.pop("file_path", None)
+
+        return jsonify({"success": True, **batch})
+    except FileNotFoundError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        logger.error(f"Batch generation failed: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@gmp_bp.route("/documents/<int:document_id>/regenerate", methods=["POST"])
+def regenerate_document(document_id: int):
+    """Re-render a recorded document, rebuilding only the edited sections.
+
+    Body: same fields as /generate; omitted fields keep their recorded values.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"success": False, "error": "No JSON body"}), 400
+
+        gen = get_generator()
+        result = gen.regenerate_document(document_id, data)
+        result.pop("file_path", None)
+
+        return jsonify({"success": True, **result})
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except FileNotFoundError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        logger.error(f"Regeneration of document {document_id} failed: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@gmp_bp.route("/jobs", methods=["POST"])
+def submit_generation_job():
+    """Queue a document generation and return its job ID immediately.
+
+    Accepts the same body as /generate. Poll GET /jobs/<job_id> for
+    per-section progress and the download URL once completed.
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({"success": False, "error": "No JSON body"}), 400
+
+        doc_type = data.get("doc_type")
+        if not doc_type:
+            return jsonify({"success": False, "error": "doc_type is required"}), 400
+
+        job = get_job_queue().submit(doc_type, data)
+        return jsonify({
+            "success": True,
+            "job_id": job.id,
+            "status": job.status,
+            "status_url": f"/api/gmp/jobs/{job.id}",
+        }), 202
+    except FileNotFoundError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except Exception as e:
+        logger.error(f"Failed to queue generation job: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@gmp_bp.route("/jobs/<job_id>", methods=["GET"])
+def get_generation_job(job_id: str):
+    """Report status, per-section progress and result of a generation job."""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "Job not found"}), 404
+    return jsonify({"success": True, **job.to_dict()})
+
+
 @gmp_bp.route("/preview", methods=["POST"])
 def preview_section():
     """Generate a preview for a single document section."""
@@ -96,6 +255,8 @@ def preview_section():
         gen = get_generator()
         result = gen.preview_section(doc_type, section_id, context)
         return jsonify({"success": True, "data": result})
+    except LLMQueueFull as e:
+        return llm_busy_response(e)
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 404
     except Exception as e:
@@ -103,6 +264,88 @@ def preview_section():
         return jsonify({"success": False, "error": str(e)}), 500
 
 
+@gmp_bp.route("/preview/stream", methods=["POST"])
+def preview_section_stream():
+    """Stream a single-section preview as server-sent events.
+
+    Accepts the same body as /preview. Emits ``token`` events with
+    ``{"text": ...}`` as Ollama produces output, then a single ``done``
+    event with ``{"data": <section data>}`` (or an ``error`` event).
+    """
+    try:
+        data = request.get_json()
+        doc_type = data.get("doc_type")
+        section_id = data.get("section_id")
+        context = data.get("context", {})
+
+        if not doc_type or not section_id:
+            return jsonify({
+                "success": False,
+                "error": "doc_type and section_id are required"
+            }), 400
+
+        gen = get_generator()
+        events = gen.stream_section_preview(doc_type, section_id, context)
+    except LLMQueueFull as e:
+        return llm_busy_response(e)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 404
+    except RuntimeError as e:
+        return jsonify({"success": False, "error": str(e)}), 503
+    except Exception as e:
+        logger.error(f"Section preview stream failed: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+    def sse():
+        try:
+            for event, payload in events:
+                body = {"text": payload} if event == "token" else {"data": payload}
+                yield f"event: {event}\ndata: {json.dumps(body)}\n\n"
+        except Exception as e:
+            logger.error(f"Section preview stream failed: {e}")
+            yield f"event: error\ndata: {json.dumps({'error': str(e)})}\n\n"
+
+    return Response(
+        stream_with_context(sse()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@gmp_bp.route("/flowchart/preview", methods=["POST"])
+def preview_flowchart():
+    """Render a flowchart from its steps as SVG or PNG, without a DOCX.
+
+    Body: ``{"steps": [...], "layout": "layered"|"simple",
+    "format": "svg"|"png", "dpi": 96}``. ``steps`` uses the same shape as
+    a flowchart section; ``{"flowchart": {"steps": [...]}}`` is accepted too.
+    """
+    try:
+        data = request.get_json() or {}
+        steps = data.get("steps")
+        if steps is None:
+            steps = (data.get("flowchart") or {}).get("steps")
+        fmt = str(data.get("format", "svg")).lower()
+        dpi = int(data.get("dpi", DEFAULT_DPI))
+
+        if not isinstance(steps, list) or not steps:
+            return jsonify({"success": False, "error": "steps must be a non-empty list"}), 400
+        if fmt not in ("svg", "png"):
+            return jsonify({"success": False, "error": "format must be 'svg' or 'png'"}), 400
+        if not 24 <= dpi <= 300:
+            return jsonify({"success": False, "error": "dpi must be between 24 and 300"}), 400
+
+        flowchart = FlowchartLayoutEngine().layout(steps, data.get("layout"))
+        if fmt == "png":
+            return Response(render_png(flowchart, dpi), mimetype="image/png")
+        return Response(render_svg(flowchart, dpi), mimetype="image/svg+xml")
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        return jsonify({"success": False, "error": f"Invalid flowchart: {e}"}), 400
+    except Exception as e:
+        logger.error(f"Flowchart preview failed: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 @gmp_bp.route("/ollama/status", methods=["GET"])
 def ollama_status():
     """Check Ollama service status."""
@@ -113,6 +356,27 @@ def ollama_status():
         return jsonify({"success": False, "available": False, "error": str(e)})
 
 
+@gmp_bp.route("/retention", methods=["GET"])
+def retention_stats():
+    """Disk usage of generated files and space reclaimed by retention sweeps."""
+    try:
+        return jsonify({"success": True, **get_retention_service().stats()})
+    except Exception as e:
+        logger.error(f"Failed to read retention stats: {e}")
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
+@gmp_bp.route("/retention/run", methods=["POST"])
+def run_retention():
+    """Run a retention sweep now instead of waiting for the next interval."""
+    try:
+        report = get_retention_service().run_once()
+        return jsonify({"success": True, **report})
+    except Exception as e:
+        logger.error(f"Retention sweep failed: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
+
 # ── Paper Scraping Endpoints ──
 
 @gmp_bp.route("/papers/search", methods=["GET"])
@@ -183,6 +447,8 @@ def autofill_from_paper():
         gen = get_generator()
         result = gen.autofill_from_paper(pmcid, context)
         return jsonify({"success": True, **result})
+    except LLMQueueFull as e:
+        return llm_busy_response(e)
     except ValueError as e:
         return jsonify({"success": False, "error": str(e)}), 404
     except RuntimeError as e:
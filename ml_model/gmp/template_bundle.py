@@ -0,0 +1,175 @@
+"""Precompiled bundle of validated document templates.
+
+Validating a DocumentTemplate (with its nested section, table and step
+procedure configs) is the slow part of loading a template. Without a
+bundle, that cost lands on the first request for each template after
+every deploy, and again in every render worker. The build step validates
+all templates once and pickles the resulting models into a single bundle
+file. At process start, TemplateLoader.warm() unpickles that bundle, which
+skips validation.
+
+A bundle is used only if all of the following still hold:
+
+- BUNDLE_SCHEMA_VERSION is unchanged.
+- The template schema is unchanged. This is checked with a fingerprint of
+  template_schema.py and the Pydantic version.
+- The set of template files is unchanged, and each file's SHA-256 matches.
+
+Otherwise the loader falls back to the JSON files and rewrites the bundle.
+Pickles execute code when loaded, so the bundle path must only be writable
+by the deployment itself.
+
+Usage (build step):
+    python -m ml_model.gmp.template_bundle
+    python -m ml_model.gmp.template_bundle --templates-dir my_templates --output my.bundle
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Optional
+
+import pydantic
+
+from . import template_schema
+from .template_schema import DocumentTemplate
+
+logger = logging.getLogger(__name__)
+
+# Bump when the bundle layout changes
+BUNDLE_SCHEMA_VERSION = 1
+BUNDLE_FILENAME = ".bundle.pickle"
+
+# Overrides the default location (<templates_dir>/.bundle.pickle)
+BUNDLE_PATH_ENV = os.environ.get("GMP_TEMPLATE_BUNDLE", "")
+
+
+def bundle_path(templates_dir: Path) -> Path:
+    """Where the bundle for templates_dir is read from and written to."""
+    return Path(BUNDLE_PATH_ENV) if BUNDLE_PATH_ENV else Path(templates_dir) / BUNDLE_FILENAME
+
+
+def schema_fingerprint() -> str:
+    """Hash of the template models' source and the Pydantic version.
+
+    Hashing the module source is far cheaper than building the JSON schema,
+    and any edit to the models changes it.
+    """
+    sha = hashlib.sha256(pydantic.VERSION.encode("utf-8"))
+    sha.update(Path(template_schema.__file__).read_bytes())
+    return sha.hexdigest()
+
+
+def _file_digests(templates_dir: Path) -> dict[str, str]:
+    """SHA-256 of every template file, keyed by file stem."""
+    return {
+        path.stem: hashlib.sha256(path.read_bytes()).hexdigest()
+        for path in sorted(Path(templates_dir).glob("*.json"))
+    }
+
+
+def compile_templates(templates_dir: Path) -> dict:
+    """Validate every template file and assemble a bundle.
+
+    Raises:
+        ValueError: If any template fails to parse or validate
+    """
+    templates_dir = Path(templates_dir)
+    digests = _file_digests(templates_dir)
+    templates, errors = {}, []
+    for stem in digests:
+        try:
+            with open(templates_dir / f"{stem}.json", "r") as f:
+                templates[stem] = DocumentTemplate(**json.load(f))
+        except (json.JSONDecodeError, pydantic.ValidationError, TypeError) as e:
+            errors.append(f"{stem}: {e}")
+    if errors:
+        raise ValueError("Invalid templates:\n" + "\n".join(errors))
+
+    return {
+        "schema_version": BUNDLE_SCHEMA_VERSION,
+        "fingerprint": schema_fingerprint(),
+        "files": digests,
+        "templates": templates,
+    }
+
+
+def save_bundle(bundle: dict, path: Path):
+    """Write the bundle atomically, so readers never see a partial file."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(bundle, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.chmod(tmp, 0o644)
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_bundle(templates_dir: Path, path: Path) -> Optional[dict[str, DocumentTemplate]]:
+    """Return the bundled templates keyed by file stem, or None if stale.
+
+    A missing, unreadable or stale bundle is not an error; the caller
+    falls back to the JSON files.
+    """
+    path = Path(path)
+    if not path.is_file():
+        return None
+    try:
+        with open(path, "rb") as f:
+            bundle = pickle.load(f)
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable template bundle {path}: {e}")
+        return None
+
+    if not isinstance(bundle, dict) or bundle.get("schema_version") != BUNDLE_SCHEMA_VERSION:
+        reason = "bundle schema version changed"
+    elif bundle.get("fingerprint") != schema_fingerprint():
+        reason = "template schema changed"
+    elif bundle.get("files") != _file_digests(templates_dir):
+        reason = "template files changed"
+    else:
+        return bundle["templates"]
+    logger.info(f"Template bundle {path} is stale ({reason}); loading JSON templates")
+    return None
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    from .template_loader import TEMPLATES_DIR
+
+    parser = argparse.ArgumentParser(description="Validate templates and write the template bundle")
+    parser.add_argument("--templates-dir", help="Alternate templates directory")
+    parser.add_argument("--output", help="Bundle path (default: GMP_TEMPLATE_BUNDLE "
+                                         "or <templates-dir>/.bundle.pickle)")
+    args = parser.parse_args(argv)
+
+    templates_dir = Path(args.templates_dir) if args.templates_dir else TEMPLATES_DIR
+    output = Path(args.output) if args.output else bundle_path(templates_dir)
+
+    started = time.perf_counter()
+    try:
+        bundle = compile_templates(templates_dir)
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 1
+    save_bundle(bundle, output)
+    print(f"Bundled {len(bundle['templates'])} templates into {output} "
+          f"({output.stat().st_size / 1024:.1f} KB, {time.perf_counter() - started:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
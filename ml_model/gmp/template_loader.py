@@ -1,25 +1,54 @@
-"""Template loader for GMP document templates."""
+"""Template loader for GMP document templates.
+
+The loader keeps an in-memory index of the templates directory (id, name
+and doc_type per file, keyed by the file's size and mtime). The directory
+is re-scanned at most every ``poll_interval`` seconds, and only files whose
+size or mtime changed are parsed again, so listing templates and looking
+them up by type are dictionary reads. Editing, adding or removing a
+template file evicts its cached DocumentTemplate automatically.
+
+warm() loads every template at process start, from the precompiled bundle
+(see template_bundle) when it is still fresh.
+"""
 
 import json
 import os
 import logging
+import threading
+import time
 from pathlib import Path
 from typing import Optional
 
+from .file_lock import file_lock
+from .template_bundle import bundle_path, compile_templates, load_bundle, save_bundle
 from .template_schema import DocumentTemplate, DocumentType
 
 logger = logging.getLogger(__name__)
 
 TEMPLATES_DIR = Path(__file__).parent / "templates"
 
+# Seconds between checks of the templates directory for changed files;
+# 0 checks on every call
+DEFAULT_POLL_INTERVAL = float(os.environ.get("GMP_TEMPLATE_POLL_INTERVAL", "2"))
+
 
 class TemplateLoader:
     """Loads and validates GMP document templates from JSON files."""
 
-    def __init__(self, templates_dir: Optional[str] = None):
+    def __init__(self, templates_dir: Optional[str] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
         self.templates_dir = Path(templates_dir) if templates_dir else TEMPLATES_DIR
+        self.poll_interval = poll_interval
         self._cache: dict[str, DocumentTemplate] = {}
 
+        # file stem -> (size, mtime_ns) of the file as last indexed
+        self._stamps: dict[str, tuple[int, int]] = {}
+        # file stem -> {"id", "name", "doc_type"}; invalid files are left out
+        self._index: dict[str, dict] = {}
+        self._by_type: dict[str, list[str]] = {}
+        self._checked_at: Optional[float] = None
+        self._lock = threading.RLock()
+
     def load_template(self, template_id: str) -> DocumentTemplate:
         """Load a template by ID from the templates directory.
 
@@ -28,22 +57,27 @@ class TemplateLoader:
 
         Returns:
             Validated DocumentTemplate instance
-        """
-        if template_id in self._cache:
-            return self._cache[template_id]
-
-        filepath = self.templates_dir / f"{template_id}.json"
-        if not filepath.exists():
-            raise FileNotFoundError(
-                f"Template not found: {filepath}. "
-                f"Available: {self.list_templates()}"
-            )
 
-        with open(filepath, "r") as f:
-            raw = json.load(f)
-
-        template = DocumentTemplate(**raw)
-        self._cache[template_id] = template
+        Raises:
+            FileNotFoundError: If no template file has that ID
+        """
+        with self._lock:
+            self._refresh()
+            if template_id in self._cache:
+                return self._cache[template_id]
+
+            filepath = self.templates_dir / f"{template_id}.json"
+            if template_id not in self._stamps:
+                raise FileNotFoundError(
+                    f"Template not found: {filepath}. "
+                    f"Available: {self.list_templates()}"
+                )
+
+            with open(filepath, "r") as f:
+                raw = json.load(f)
+
+            template = DocumentTemplate(**raw)
+            self._cache[template_id] = template
         logger.info(f"Loaded template: {template.name} ({template.id})")
         return template
 
@@ -53,35 +87,121 @@ class TemplateLoader:
         Returns:
             List of dicts with id, name, doc_type for each template
         """
-        templates = []
-        if not self.templates_dir.exists():
-            return templates
-
-        for filepath in sorted(self.templates_dir.glob("*.json")):
-            try:
-                with open(filepath, "r") as f:
-                    raw = json.load(f)
-                templates.append({
-                    "id": raw.get("id", filepath.stem),
-                    "name": raw.get("name", filepath.stem),
-                    "doc_type": raw.get("doc_type", "unknown"),
-                })
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.warning(f"Skipping invalid template {filepath}: {e}")
-
-        return templates
+        with self._lock:
+            self._refresh()
+            return [dict(self._index[stem]) for stem in sorted(self._index)]
 
     def get_templates_by_type(self, doc_type: DocumentType) -> list[DocumentTemplate]:
         """Load all templates of a given document type."""
+        with self._lock:
+            self._refresh()
+            stems = list(self._by_type.get(doc_type.value, ()))
         results = []
-        for info in self.list_templates():
-            if info["doc_type"] == doc_type.value:
-                try:
-                    results.append(self.load_template(info["id"]))
-                except Exception as e:
-                    logger.warning(f"Failed to load template {info['id']}: {e}")
+        for stem in stems:
+            try:
+                results.append(self.load_template(stem))
+            except Exception as e:
+                logger.warning(f"Failed to load template {stem}: {e}")
         return results
 
+    def warm(self, rebuild: bool = True) -> int:
+        """Load every template up front, from the precompiled bundle if fresh.
+
+        Falls back to validating the JSON files when the bundle is missing
+        or stale, then (with rebuild) writes a fresh bundle for the next
+        process.
+
+        Returns:
+            Number of templates loaded
+        """
+        path = bundle_path(self.templates_dir)
+        started = time.perf_counter()
+        templates = load_bundle(self.templates_dir, path)
+        if templates is not None:
+            with self._lock:
+                self._refresh()
+                self._cache.update(
+                    (stem, t) for stem, t in templates.items() if stem in self._index
+                )
+                count = len(self._cache)
+            logger.info(f"Loaded {count} templates from bundle in "
+                        f"{(time.perf_counter() - started) * 1000:.1f} ms")
+            return count
+
+        failed = 0
+        for entry in self.list_templates():
+            try:
+                self.load_template(entry["id"])
+            except Exception as e:
+                failed += 1
+                logger.warning(f"Failed to load template {entry['id']}: {e}")
+        if rebuild and not failed:
+            self._rebuild_bundle(path)
+        return len(self._cache)
+
+    def _rebuild_bundle(self, path: Path):
+        """Write a fresh bundle unless another process is already doing so."""
+        try:
+            with file_lock(path.with_name(path.name + ".lock"), blocking=False) as lock:
+                if lock is None:
+                    return
+                # Another process may have finished a rebuild while we validated
+                if load_bundle(self.templates_dir, path) is None:
+                    save_bundle(compile_templates(self.templates_dir), path)
+                    logger.info(f"Wrote template bundle {path}")
+        except (OSError, ValueError) as e:
+            logger.warning(f"Could not write template bundle {path}: {e}")
+
     def reload(self):
-        """Clear the template cache and force reload."""
-        self._cache.clear()
+        """Clear the template cache and index, forcing a full rescan."""
+        with self._lock:
+            self._cache.clear()
+            self._stamps.clear()
+            self._index.clear()
+            self._by_type.clear()
+            self._checked_at = None
+
+    def _refresh(self):
+        """Re-index template files whose size or mtime changed.
+
+        Must be called with the lock held.
+        """
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.poll_interval:
+            return
+        self._checked_at = now
+
+        stamps = {}
+        if self.templates_dir.is_dir():
+            with os.scandir(self.templates_dir) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".json") and entry.is_file():
+                        st = entry.stat()
+                        stamps[entry.name[:-5]] = (st.st_size, st.st_mtime_ns)
+        if stamps == self._stamps:
+            return
+
+        for stem in self._stamps.keys() - stamps.keys():
+            self._cache.pop(stem, None)
+            self._index.pop(stem, None)
+        for stem, stamp in stamps.items():
+            if self._stamps.get(stem) == stamp:
+                continue
+            self._cache.pop(stem, None)
+            self._index.pop(stem, None)
+            filepath = self.templates_dir / f"{stem}.json"
+            try:
+                with open(filepath, "r") as f:
+                    raw = json.load(f)
+                self._index[stem] = {
+                    "id": raw.get("id", stem),
+                    "name": raw.get("name", stem),
+                    "doc_type": raw.get("doc_type", "unknown"),
+                }
+            except (OSError, json.JSONDecodeError, AttributeError) as e:
+                logger.warning(f"Skipping invalid template {filepath}: {e}")
+        self._stamps = stamps
+
+        self._by_type = {}
+        for stem in sorted(self._index):
+            self._by_type.setdefault(self._index[stem]["doc_type"], []).append(stem)
@@ -5,9 +5,11 @@ landscape orientation, complex header/footer tables, gray-shaded sections,
 step procedures with 4-5 column layouts, checkboxes, and flowcharts.
 """
 
+import copy
 import io
 import os
 import logging
+import threading
 from datetime import datetime
 from typing import Optional
 
@@ -16,6 +18,7 @@ from docx.shared import Pt, Inches, Twips, Emu
 from docx.shared import RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.enum.table import WD_TABLE_ALIGNMENT
+from docx.enum.style import WD_STYLE_TYPE
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
@@ -35,11 +38,89 @@ DEFAULT_FONT = "Calibri"
 BODY_SIZE = Pt(10)
 SECTION_HEADER_SIZE = Pt(11)
 FOOTER_SIZE = Pt(8)
+SMALL_SIZE = Pt(9)
+
+# Character styles registered in _setup_styles; body runs reference these
+# instead of repeating font and size on every run
+BODY_STYLE = "GMPBody"
+SMALL_STYLE = "GMPSmall"
+RUN_STYLES = {BODY_SIZE: BODY_STYLE, SMALL_SIZE: SMALL_STYLE}
+
+# Header fields that vary per document. Cached skeletons carry these
+# placeholders in the header table and each render swaps in real values.
+HEADER_PLACEHOLDERS = {
+    "doc_number": "{{doc_number}}",
+    "doc_title": "{{doc_title}}",
+    "effective_date": "{{effective_date}}",
+    "revision": "{{revision}}",
+}
+SKELETON_CACHE_SIZE = 32
+
+# Each section's blocks in the body are wrapped in a hidden bookmark named
+# after the section, so one section can later be replaced in place
+SECTION_BOOKMARK_PREFIX = "_GMP_"
+
+CHECKBOX_UNCHECKED = "\u2610"
+
+
+def render_document(template: DocumentTemplate, data: dict) -> bytes:
+    """Render a document with a fresh engine."""
+    return GMPWordEngine().generate(template, data)
+
+
+def render_document_to_file(template: DocumentTemplate, data: dict, path: str,
+                            engine: Optional["GMPWordEngine"] = None) -> int:
+    """Render a document straight to disk and return its size in bytes.
+
+    The file is written under a temporary name and moved into place once
+    complete, so readers never see a partially written document.
+    """
+    engine = engine or GMPWordEngine()
+    return _write_atomically(path, lambda f: engine.generate_to(template, data, f))
+
+
+def rerender_sections_to_file(template: DocumentTemplate, data: dict, source: str,
+                              section_ids: list[str], path: str,
+                              engine: Optional["GMPWordEngine"] = None) -> int:
+    """Replace sections of a generated DOCX and write the result to path.
+
+    path may be the same file as source.
+
+    Raises:
+        ValueError: If source lacks the bookmark for one of the sections
+    """
+    engine = engine or GMPWordEngine()
+    return _write_atomically(
+        path, lambda f: engine.rerender_sections_to(template, data, source, section_ids, f)
+    )
+
+
+def section_bookmark_name(section_id: str) -> str:
+    # Word limits bookmark names to 40 characters
+    return f"{SECTION_BOOKMARK_PREFIX}{section_id}"[:40]
+
+
+def _write_atomically(path: str, write) -> int:
+    tmp_path = f"{path}.part"
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(path)
 
 
 class GMPWordEngine:
     """Generates GMP-compliant Word documents from template + data."""
 
+    # Styled, paginated documents with header/footer, shared by all engines
+    # in the process and keyed by the template's page and header/footer layout
+    _skeletons: dict[str, Document] = {}
+    _skeleton_lock = threading.Lock()
+
     def __init__(self):
         self.doc = None
 
@@ -53,22 +134,146 @@ class GMPWordEngine:
         Returns:
             DOCX file as bytes
         """
-        self.doc = Document()
-        self._setup_styles()
-        self._setup_page(template)
-        self._build_header(template, data)
-        self._build_footer(template, data)
+        buffer = io.BytesIO()
+        self.generate_to(template, data, buffer)
+        return buffer.getvalue()
 
-        # Build each section
-        for section_def in template.sections:
+    def generate_to(self, template: DocumentTemplate, data: dict, fileobj):
+        """Generate a DOCX document and stream it into a file object.
+
+        The zip package is written part by part into fileobj (an open file,
+        socket wrapper or response stream), so the finished document is
+        never held in memory as a whole.
+
+        Args:
+            template: Document template with formatting rules and sections
+            data: Dict with section data to populate the template
+            fileobj: Writable binary file-like object
+        """
+        self.doc = self._new_document(template, data)
+        body = self.doc.element.body
+
+        # Build each section, bookmarking its blocks
+        for index, section_def in enumerate(template.sections):
+            first = self._body_end(body)
             section_data = data.get(section_def.id, {})
             self._build_section(section_def, section_data, data)
+            start, end = ox.build_bookmark(section_bookmark_name(section_def.id), index)
+            body.insert(self._body_end(body), end)
+            body.insert(first, start)
 
-        # Write to bytes
-        buffer = io.BytesIO()
-        self.doc.save(buffer)
-        buffer.seek(0)
-        return buffer.getvalue()
+        self.doc.save(fileobj)
+
+    def rerender_sections_to(self, template: DocumentTemplate, data: dict,
+                             source, section_ids: list[str], fileobj):
+        """Re-render only some sections of a previously generated DOCX.
+
+        Each listed section's bookmarked blocks are dropped and rebuilt from
+        data; the header, footer and all other sections are kept as they are.
+
+        Args:
+            template: Template the source document was generated from
+            data: Dict with section data (only the listed sections are read)
+            source: Path or file object of the existing DOCX
+            section_ids: Sections to rebuild
+            fileobj: Writable binary file-like object for the result
+
+        Raises:
+            ValueError: If a section is unknown or has no usable bookmark in
+                source (e.g. documents generated before sections were
+                tagged, or whose bookmarks were moved by editing in Word)
+        """
+        self.doc = Document(source)
+        body = self.doc.element.body
+        section_defs = {s.id: s for s in template.sections}
+
+        for section_id in section_ids:
+            section_def = section_defs.get(section_id)
+            bounds = ox.find_bookmark_range(body, section_bookmark_name(section_id))
+            if section_def is None or bounds is None:
+                raise ValueError(f"Section '{section_id}' cannot be re-rendered in place")
+            start, end = bounds
+
+            # Drop the old blocks
+            for block in self._bookmarked_blocks(body, start, end, section_id):
+                body.remove(block)
+
+            # Builders append at the end of the body; move the result into place
+            first = self._body_end(body)
+            self._build_section(section_def, data.get(section_id, {}), data)
+            for block in list(body[first:self._body_end(body)]):
+                end.addprevious(block)
+
+        self.doc.save(fileobj)
+
+    @staticmethod
+    def _bookmarked_blocks(body, start, end, section_id: str) -> list:
+        """Body-level blocks strictly between a section's bookmark start and end.
+
+        Raises:
+            ValueError: If end is not a later sibling of start in body, or the
+                range holds a section break or another bookmark boundary
+        """
+        if start.getparent() is not body or end.getparent() is not body:
+            raise ValueError(f"Bookmark for section '{section_id}' is not at body level")
+        boundaries = (qn("w:sectPr"), qn("w:bookmarkStart"), qn("w:bookmarkEnd"))
+        blocks = []
+        for block in start.itersiblings():
+            if block is end:
+                return blocks
+            if block.tag in boundaries:
+                raise ValueError(f"Bookmark for section '{section_id}' overlaps "
+                                 f"other content")
+            blocks.append(block)
+        raise ValueError(f"Bookmark for section '{section_id}' ends before it starts")
+
+    def _body_end(self, body) -> int:
+        """Index where new blocks go: before the final w:sectPr, if any."""
+        if len(body) and body[-1].tag == qn("w:sectPr"):
+            return len(body) - 1
+        return len(body)
+
+    def _new_document(self, template: DocumentTemplate, data: dict) -> Document:
+        """Copy the cached skeleton for this template and fill in its header."""
+        key = template.model_dump_json(include={
+            "orientation", "page_size", "margins", "header_config", "footer_config",
+        })
+        with self._skeleton_lock:
+            skeleton = self._skeletons.get(key)
+            if skeleton is None:
+                skeleton = self._build_skeleton(template)
+                if len(self._skeletons) >= SKELETON_CACHE_SIZE:
+                    self._skeletons.pop(next(iter(self._skeletons)))
+                self._skeletons[key] = skeleton
+
+        doc = copy.deepcopy(skeleton)
+        values = self._header_values(template, data)
+        by_placeholder = {v: values[k] for k, v in HEADER_PLACEHOLDERS.items()}
+        for t in doc.sections[0].header._element.iter(qn("w:t")):
+            if t.text in by_placeholder:
+                t.text = by_placeholder[t.text]
+                if t.text != t.text.strip():
+                    t.set(qn("xml:space"), "preserve")
+        return doc
+
+    def _build_skeleton(self, template: DocumentTemplate) -> Document:
+        """Build styles, page setup, header and footer with placeholder values."""
+        self.doc = Document()
+        self._setup_styles()
+        self._setup_page(template)
+        self._build_header(template, HEADER_PLACEHOLDERS)
+        self._build_footer(template, {})
+        return self.doc
+
+    def _header_values(self, template: DocumentTemplate, data: dict) -> dict:
+        return {
+            "doc_number": data.get("doc_number", "BR-XXX-XX"),
+            "doc_title": data.get("doc_title", template.name),
+            "effective_date": data.get(
+                "effective_date", datetime.now().strftime("%d%b%Y").upper()
+            ),
+            "revision": data.get("revision", "01"),
+        }
 
     def _setup_styles(self):
         """Configure default document styles."""
@@ -78,6 +283,13 @@ class GMPWordEngine:
         style.paragraph_format.space_before = Twips(0)
         style.paragraph_format.space_after = Twips(0)
 
+        for style_id, name, size in [(BODY_STYLE, "GMP Body", BODY_SIZE),
+                                     (SMALL_STYLE, "GMP Small", SMALL_SIZE)]:
+            char_style = self.doc.styles.add_style(name, WD_STYLE_TYPE.CHARACTER)
+            char_style.style_id = style_id
+            char_style.font.name = DEFAULT_FONT
+            char_style.font.size = size
+
     def _setup_page(self, template: DocumentTemplate):
         """Set page orientation, size, and margins."""
         section = self.doc.sections[0]
@@ -119,10 +331,11 @@ class GMPWordEngine:
         ox.set_table_borders(table, size=4, color="auto")
         ox.set_column_widths(table, col_widths)
 
-        doc_number = data.get("doc_number", "BR-XXX-XX")
-        doc_title = data.get("doc_title", template.name)
-        effective_date = data.get("effective_date", datetime.now().strftime("%d%b%Y").upper())
-        revision = data.get("revision", "01")
+        values = self._header_values(template, data)
+        doc_number = values["doc_number"]
+        doc_title = values["doc_title"]
+        effective_date = values["effective_date"]
+        revision = values["revision"]
 
         # Row 0: Logo | Title (center, bold 12pt) | Page X of Y | Doc # | Eff Date | Rev
         # Logo cell (spans 2 cols, 3 rows)
@@ -151,8 +364,7 @@ class GMPWordEngine:
         ox.set_cell_vertical_align(page_cell, "center")
         page_p = page_cell.paragraphs[0]
         page_run = page_p.add_run("Page ")
-        page_run.font.size = BODY_SIZE
-        page_run.font.name = DEFAULT_FONT
+        self._style_run(page_run)
         ox.add_page_number_field(page_p)
         of_run = page_p.add_run(" of ")
         of_run.font.size = BODY_SIZE
@@ -163,16 +375,14 @@ class GMPWordEngine:
         ox.set_cell_vertical_align(dn_label_cell, "center")
         dn_label_p = dn_label_cell.paragraphs[0]
         dn_label_run = dn_label_p.add_run("Document No:")
-        dn_label_run.font.size = BODY_SIZE
-        dn_label_run.font.name = DEFAULT_FONT
+        self._style_run(dn_label_run)
 
         # Doc number value
         dn_val_cell = table.cell(0, 5)
         ox.set_cell_vertical_align(dn_val_cell, "center")
         dn_val_p = dn_val_cell.paragraphs[0]
         dn_val_run = dn_val_p.add_run(doc_number)
-        dn_val_run.font.size = BODY_SIZE
-        dn_val_run.font.name = DEFAULT_FONT
+        self._style_run(dn_val_run)
 
         # Row 1: (logo cont) | (title cont) | Production ID | Eff Date label | Eff Date val
         for r in [1, 2]:
@@ -310,9 +520,7 @@ class GMPWordEngine:
         p = header_cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run(f"  {title}")
-        run.bold = True
-        run.font.size = SECTION_HEADER_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run, bold=True, size=SECTION_HEADER_SIZE)
 
         return table
 
@@ -330,6 +538,20 @@ class GMPWordEngine:
             w = TABLE_WIDTH // col_count
             return [w] * (col_count - 1) + [TABLE_WIDTH - w * (col_count - 1)]
 
+    def _run(self, text: str, bold: bool = False, size: Pt = BODY_SIZE):
+        """Build a body-font run element for the fast table emitter."""
+        return ox.build_run(text, bold=bold, **self._run_format(size))
+
+    def _style_run(self, run, bold: bool = False, size: Pt = BODY_SIZE):
+        """Apply body-font formatting to a python-docx Run."""
+        ox.set_run_properties(run, bold=bold, **self._run_format(size))
+
+    def _run_format(self, size: Pt) -> dict:
+        style = RUN_STYLES.get(size)
+        if style:
+            return {"style": style}
+        return {"size_half_pt": int(size.pt * 2), "font": DEFAULT_FONT}
+
     def _add_label_value_row(self, table, label: str, value: str = "",
                              label_cols: int = 1, value_cols: int = 1,
                              label_fill: str = LABEL_FILL):
@@ -345,8 +567,7 @@ class GMPWordEngine:
         p = label_cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run(label)
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run)
 
         value_cell = row.cells[label_cols]
         if value_cols > 1:
@@ -357,8 +578,7 @@ class GMPWordEngine:
         ox.set_paragraph_spacing(p, before=60, after=60)
         if value:
             run = p.add_run(value)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
         return row
 
@@ -385,8 +605,7 @@ class GMPWordEngine:
             p = role_cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(approver["role"] + ":")
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
             # Name (cols 1-2)
             name_cell = row.cells[1]
@@ -396,8 +615,7 @@ class GMPWordEngine:
             ox.set_paragraph_spacing(p, before=60, after=60)
             if approver.get("name"):
                 run = p.add_run(approver["name"])
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+                self._style_run(run)
 
             # Date label (col 3)
             date_label_cell = row.cells[3]
@@ -406,8 +624,7 @@ class GMPWordEngine:
             p = date_label_cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run("Date:")
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
             # Date value (col 4)
             date_cell = row.cells[4]
@@ -416,8 +633,7 @@ class GMPWordEngine:
             ox.set_paragraph_spacing(p, before=60, after=60)
             if approver.get("date"):
                 run = p.add_run(approver["date"])
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+                self._style_run(run)
 
         # Batch Record Issuance section
         issue_row = table.add_row()
@@ -428,9 +644,7 @@ class GMPWordEngine:
         p = issue_cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run("  Batch Record issued for processing:")
-        run.bold = True
-        run.font.size = SECTION_HEADER_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run, bold=True, size=SECTION_HEADER_SIZE)
 
         # Issuance details
         issuance_items = [
@@ -445,8 +659,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(item)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
         # Issued By Signature row
         row = table.add_row()
@@ -456,8 +669,7 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run("Issued By Signature / Date:")
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run)
 
     def _build_references_table(self, section_def: SectionDefinition,
                                 section_data: dict, all_data: dict):
@@ -477,9 +689,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(header)
-            run.bold = True
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run, bold=True)
 
         # Reference rows
         references = section_data.get("references", [])
@@ -490,16 +700,14 @@ class GMPWordEngine:
             p = doc_cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(ref.get("doc_number", ""))
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
             title_cell = row.cells[1]
             ox.set_cell_vertical_align(title_cell, "center")
             p = title_cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(ref.get("title", ""))
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
     def _build_attachments_table(self, section_def: SectionDefinition,
                                  section_data: dict, all_data: dict):
@@ -518,9 +726,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(header)
-            run.bold = True
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run, bold=True)
 
         attachments = section_data.get("attachments", [])
         for att in attachments:
@@ -532,8 +738,7 @@ class GMPWordEngine:
                 ox.set_paragraph_spacing(p, before=60, after=60)
                 val = str(att.get(key, ""))
                 run = p.add_run(val)
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+                self._style_run(run)
 
     def _build_general_instructions(self, section_def: SectionDefinition,
                                     section_data: dict, all_data: dict):
@@ -548,8 +753,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(instruction)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
     def _build_equipment_list(self, section_def: SectionDefinition,
                               section_data: dict, all_data: dict):
@@ -558,41 +762,23 @@ class GMPWordEngine:
         table = self._add_section_header("Equipment / materials list",
                                          col_count=2, col_widths=col_widths)
 
-        # Equipment sub-header
-        row = table.add_row()
-        cell = row.cells[0]
-        cell = cell.merge(row.cells[1])
-        ox.set_cell_shading(cell, LABEL_FILL)
-        p = cell.paragraphs[0]
-        ox.set_paragraph_spacing(p, before=60, after=60)
-        run = p.add_run("Equipment List:")
-        run.bold = True
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
-
-        # Equipment description header
-        row = table.add_row()
-        cell = row.cells[0]
-        cell = cell.merge(row.cells[1])
-        ox.set_cell_shading(cell, LABEL_FILL)
-        p = cell.paragraphs[0]
-        ox.set_paragraph_spacing(p, before=60, after=60)
-        run = p.add_run("Description")
-        run.bold = True
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        rows = [
+            # Equipment sub-header and description header
+            ox.build_span_row([ox.build_paragraph(
+                [self._run("Equipment List:", bold=True)], before=60, after=60,
+            )], col_widths, fill=LABEL_FILL),
+            ox.build_span_row([ox.build_paragraph(
+                [self._run("Description", bold=True)], before=60, after=60,
+            )], col_widths, fill=LABEL_FILL),
+        ]
 
         equipment = section_data.get("equipment", [])
         for equip in equipment:
-            row = table.add_row()
-            cell = row.cells[0]
-            cell = cell.merge(row.cells[1])
-            p = cell.paragraphs[0]
-            ox.set_paragraph_spacing(p, before=60, after=60)
             desc = equip if isinstance(equip, str) else equip.get("description", "")
-            run = p.add_run(desc)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            rows.append(ox.build_span_row([ox.build_paragraph(
+                [self._run(desc)], before=60, after=60,
+            )], col_widths))
+        ox.append_rows(table, rows)
 
     def _build_materials_list(self, section_def: SectionDefinition,
                               section_data: dict, all_data: dict):
@@ -602,18 +788,13 @@ class GMPWordEngine:
                                          col_widths=col_widths)
 
         # Column headers (repeated for side-by-side)
-        row = table.add_row()
         headers = ["CPF Part No.", "Material Description", "Quantity Required"] * 2
-        for i, header in enumerate(headers):
-            cell = row.cells[i]
-            ox.set_cell_shading(cell, LABEL_FILL)
-            ox.set_cell_vertical_align(cell, "center")
-            p = cell.paragraphs[0]
-            ox.set_paragraph_spacing(p, before=60, after=60)
-            run = p.add_run(header)
-            run.bold = True
-            run.font.size = Pt(9)
-            run.font.name = DEFAULT_FONT
+        rows = [ox.build_row([
+            ox.build_cell([ox.build_paragraph(
+                [self._run(header, bold=True, size=SMALL_SIZE)], before=60, after=60,
+            )], width, fill=LABEL_FILL, valign="center")
+            for header, width in zip(headers, col_widths)
+        ])]
 
         materials = section_data.get("materials", [])
         # Split into two columns
@@ -621,31 +802,24 @@ class GMPWordEngine:
         left_materials = materials[:mid]
         right_materials = materials[mid:]
 
+        keys = ["part_number", "description", "quantity"]
         for i in range(max(len(left_materials), len(right_materials))):
-            row = table.add_row()
-            # Left side
-            if i < len(left_materials):
-                mat = left_materials[i]
-                for j, key in enumerate(["part_number", "description", "quantity"]):
-                    cell = row.cells[j]
-                    ox.set_cell_vertical_align(cell, "center")
-                    p = cell.paragraphs[0]
-                    ox.set_paragraph_spacing(p, before=60, after=60)
-                    run = p.add_run(str(mat.get(key, "")))
-                    run.font.size = Pt(9)
-                    run.font.name = DEFAULT_FONT
-
-            # Right side
-            if i < len(right_materials):
-                mat = right_materials[i]
-                for j, key in enumerate(["part_number", "description", "quantity"]):
-                    cell = row.cells[j + 3]
-                    ox.set_cell_vertical_align(cell, "center")
-                    p = cell.paragraphs[0]
-                    ox.set_paragraph_spacing(p, before=60, after=60)
-                    run = p.add_run(str(mat.get(key, "")))
-                    run.font.size = Pt(9)
-                    run.font.name = DEFAULT_FONT
+            cells = []
+            for side, side_materials in enumerate([left_materials, right_materials]):
+                side_widths = col_widths[side * 3:side * 3 + 3]
+                if i < len(side_materials):
+                    mat = side_materials[i]
+                    cells.extend(
+                        ox.build_cell([ox.build_paragraph(
+                            [self._run(str(mat.get(key, "")), size=SMALL_SIZE)],
+                            before=60, after=60,
+                        )], width, valign="center")
+                        for key, width in zip(keys, side_widths)
+                    )
+                else:
+                    cells.extend(ox.build_cell([], width) for width in side_widths)
+            rows.append(ox.build_row(cells))
+        ox.append_rows(table, rows)
 
     def _build_step_procedure(self, section_def: SectionDefinition,
                               section_data: dict, all_data: dict):
@@ -665,128 +839,95 @@ class GMPWordEngine:
                                          col_widths=col_widths)
 
         # Column headers
-        row = table.add_row()
-        for i, col_def in enumerate(step_cfg.columns):
-            cell = row.cells[i]
-            ox.set_cell_shading(cell, step_cfg.label_fill)
-            ox.set_cell_vertical_align(cell, "center")
-            p = cell.paragraphs[0]
-            ox.set_paragraph_spacing(p, before=60, after=60)
-            run = p.add_run(col_def.title)
-            run.bold = True
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+        rows = [ox.build_row([
+            ox.build_cell([ox.build_paragraph(
+                [self._run(col_def.title, bold=True)], before=60, after=60,
+            )], col_def.width_dxa, fill=step_cfg.label_fill, valign="center")
+            for col_def in step_cfg.columns
+        ])]
 
         # Step rows
         steps = section_data.get("steps", [])
         for step in steps:
-            self._add_step_row(table, step, col_count)
+            rows.append(self._build_step_row(step, col_widths))
 
         # Section review
-        review_row = table.add_row()
-        cell = review_row.cells[0]
-        for i in range(1, col_count):
-            cell = cell.merge(review_row.cells[i])
-        ox.set_cell_shading(cell, LABEL_FILL)
-        p = cell.paragraphs[0]
-        ox.set_paragraph_spacing(p, before=60, after=60)
-        run = p.add_run("Section Review")
-        run.bold = True
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        rows.append(ox.build_span_row([ox.build_paragraph(
+            [self._run("Section Review", bold=True)], before=60, after=60,
+        )], col_widths, fill=LABEL_FILL))
 
         # MFG and QA review rows
         for reviewer in ["MFG Review (Initials/Date):", "QA Review (Initials/Date):"]:
-            row = table.add_row()
-            cell = row.cells[0]
-            for i in range(1, col_count):
-                cell = cell.merge(row.cells[i])
-            p = cell.paragraphs[0]
-            ox.set_paragraph_spacing(p, before=60, after=60)
-            run = p.add_run(reviewer)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            rows.append(ox.build_span_row([ox.build_paragraph(
+                [self._run(reviewer)], before=60, after=60,
+            )], col_widths))
+        ox.append_rows(table, rows)
 
-    def _add_step_row(self, table, step: dict, col_count: int):
-        """Add a single step row to a procedure table."""
-        row = table.add_row()
-
-        # Instruction column
-        instr_cell = row.cells[0]
-        ox.set_cell_vertical_align(instr_cell, "top")
-        p = instr_cell.paragraphs[0]
-        ox.set_paragraph_spacing(p, before=60, after=60)
+    def _build_step_row(self, step: dict, col_widths: list[int]):
+        """Build a single step row (w:tr) for a procedure table."""
+        col_count = len(col_widths)
 
-        # Step number + title
+        # Instruction column: step number + title
+        title_runs = []
         step_num = step.get("number", "")
         step_title = step.get("title", "")
         if step_num:
-            title_run = p.add_run(f"{step_num}  ")
-            title_run.bold = True
-            title_run.font.size = BODY_SIZE
-            title_run.font.name = DEFAULT_FONT
-
+            title_runs.append(self._run(f"{step_num}  ", bold=True))
         if step_title:
-            title_run = p.add_run(step_title)
-            title_run.bold = True
-            title_run.font.size = BODY_SIZE
-            title_run.font.name = DEFAULT_FONT
+            title_runs.append(self._run(step_title, bold=True))
+        instr_paragraphs = [ox.build_paragraph(title_runs, before=60, after=60)]
 
         # Sub-instructions
         instructions = step.get("instructions", [])
         for instr in instructions:
-            p = instr_cell.add_paragraph()
-            ox.set_paragraph_spacing(p, before=40, after=40)
-
             text = instr if isinstance(instr, str) else instr.get("text", "")
             is_bsc = False
             if isinstance(instr, dict):
                 is_bsc = instr.get("bsc", False)
 
+            runs = []
             if is_bsc:
-                bsc_run = p.add_run("[BSC] ")
-                bsc_run.bold = True
-                bsc_run.font.size = BODY_SIZE
-                bsc_run.font.name = DEFAULT_FONT
-
-            run = p.add_run(text)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+                runs.append(self._run("[BSC] ", bold=True))
+            runs.append(self._run(text))
+            instr_paragraphs.append(ox.build_paragraph(runs, before=40, after=40))
 
             # Handle verification options
             if isinstance(instr, dict) and instr.get("type") == "verification":
                 for option in instr.get("options", []):
-                    opt_p = instr_cell.add_paragraph()
-                    ox.set_paragraph_spacing(opt_p, before=20, after=20)
-                    ox.add_checkbox(opt_p, checked=False)
-                    run = opt_p.add_run(f" {option}")
-                    run.font.size = BODY_SIZE
-                    run.font.name = DEFAULT_FONT
+                    instr_paragraphs.append(ox.build_paragraph(
+                        [ox.build_run(CHECKBOX_UNCHECKED), self._run(f" {option}")],
+                        before=20, after=20,
+                    ))
+
+        cells = [ox.build_cell(instr_paragraphs, col_widths[0], valign="top")]
 
         # Variable column
         if col_count > 1:
-            var_cell = row.cells[1]
-            ox.set_cell_vertical_align(var_cell, "top")
             variables = step.get("variables", [])
-            for var in variables:
-                p = var_cell.add_paragraph() if var_cell.paragraphs[0].text else var_cell.paragraphs[0]
-                ox.set_paragraph_spacing(p, before=40, after=40)
-                var_name = var if isinstance(var, str) else var.get("name", "")
-                run = p.add_run(var_name)
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+            var_paragraphs = [
+                ox.build_paragraph(
+                    [self._run(var if isinstance(var, str) else var.get("name", ""))],
+                    before=40, after=40,
+                )
+                for var in variables
+            ]
+            cells.append(ox.build_cell(var_paragraphs, col_widths[1], valign="top"))
 
         # Result column (empty for filling in)
         if col_count > 2:
-            result_cell = row.cells[2]
-            ox.set_cell_vertical_align(result_cell, "top")
             results = step.get("results", [])
-            for res in results:
-                p = result_cell.add_paragraph() if result_cell.paragraphs[0].text else result_cell.paragraphs[0]
-                ox.set_paragraph_spacing(p, before=40, after=40)
-                run = p.add_run(res.get("unit", "") if isinstance(res, dict) else str(res))
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+            result_paragraphs = [
+                ox.build_paragraph(
+                    [self._run(res.get("unit", "") if isinstance(res, dict) else str(res))],
+                    before=40, after=40,
+                )
+                for res in results
+            ]
+            cells.append(ox.build_cell(result_paragraphs, col_widths[2], valign="top"))
+
+        # Signature columns stay empty
+        cells.extend(ox.build_cell([], width) for width in col_widths[3:])
+        return ox.build_row(cells)
 
     def _build_checklist(self, section_def: SectionDefinition,
                          section_data: dict, all_data: dict):
@@ -803,8 +944,7 @@ class GMPWordEngine:
             ox.add_checkbox(p, checked=False)
             text = item if isinstance(item, str) else item.get("text", "")
             run = p.add_run(f"  {text}")
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
             # Add N/A option if applicable
             if isinstance(item, dict) and item.get("na_option"):
@@ -831,9 +971,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(header)
-            run.bold = True
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run, bold=True)
 
         # Empty rows with N/A checkboxes
         num_rows = section_data.get("num_rows", 4)
@@ -848,8 +986,7 @@ class GMPWordEngine:
                     ox.set_paragraph_spacing(p, before=60, after=60)
                     ox.add_checkbox(p, checked=False)
                     run = p.add_run(" N/A")
-                    run.font.size = BODY_SIZE
-                    run.font.name = DEFAULT_FONT
+                    self._style_run(run)
 
     def _build_review(self, section_def: SectionDefinition,
                       section_data: dict, all_data: dict):
@@ -866,9 +1003,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run("Review Checklist")
-            run.bold = True
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run, bold=True)
 
             for item in section_data["checklist_items"]:
                 row = table.add_row()
@@ -878,8 +1013,7 @@ class GMPWordEngine:
                 ox.add_checkbox(p, checked=False)
                 text = item if isinstance(item, str) else item.get("text", "")
                 run = p.add_run(f"  {text}")
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+                self._style_run(run)
 
         # Reviewer comments
         row = table.add_row()
@@ -887,12 +1021,10 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run(f"{review_type.title()} Reviewer Comments:  ")
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run)
         ox.add_checkbox(p, checked=False)
         run2 = p.add_run("  N/A")
-        run2.font.size = BODY_SIZE
-        run2.font.name = DEFAULT_FONT
+        self._style_run(run2)
 
         # Signature line
         row = table.add_row()
@@ -901,8 +1033,7 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run(f"{review_type.title()} Review Signature/Date: ")
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run)
 
     def _build_label_accountability(self, section_def: SectionDefinition,
                                     section_data: dict, all_data: dict):
@@ -922,9 +1053,7 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(header)
-            run.bold = True
-            run.font.size = Pt(9)
-            run.font.name = DEFAULT_FONT
+            self._style_run(run, bold=True, size=SMALL_SIZE)
 
         # In-process labels row
         row = table.add_row()
@@ -932,14 +1061,11 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run("In-Process Labels")
-        run.bold = True
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run, bold=True)
         p2 = cell.add_paragraph()
         ox.set_paragraph_spacing(p2, before=40, after=40)
         run2 = p2.add_run("Deface and discard any unused in-process labels.")
-        run2.font.size = BODY_SIZE
-        run2.font.name = DEFAULT_FONT
+        self._style_run(run2)
 
         # Infusion labels row
         row = table.add_row()
@@ -947,17 +1073,14 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run("Infusion Labels")
-        run.bold = True
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run, bold=True)
         p2 = cell.add_paragraph()
         run2 = p2.add_run(
             "Do not discard remaining infusion labels. "
             "Deface unused Infusion Labels. "
             "Attach unused Infusion Labels to this record."
         )
-        run2.font.size = BODY_SIZE
-        run2.font.name = DEFAULT_FONT
+        self._style_run(run2)
 
         # Label count rows
         label_rows = [
@@ -972,16 +1095,14 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(text)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
             # Variable column - "Labels"
             var_cell = row.cells[2]
             p = var_cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run("Labels")
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
         # Accountability calculation row
         row = table.add_row()
@@ -989,8 +1110,7 @@ class GMPWordEngine:
         p = cell.paragraphs[0]
         ox.set_paragraph_spacing(p, before=60, after=60)
         run = p.add_run("Calculate: Label Accountability = Printed - Adhered - Used - Attached")
-        run.font.size = BODY_SIZE
-        run.font.name = DEFAULT_FONT
+        self._style_run(run)
 
     def _build_generic_table(self, section_def: SectionDefinition,
                              section_data: dict, all_data: dict):
@@ -1005,33 +1125,24 @@ class GMPWordEngine:
                                          col_widths=col_widths)
 
         # Column headers
-        row = table.add_row()
-        for i, col_def in enumerate(columns):
-            cell = row.cells[i]
-            ox.set_cell_shading(cell, LABEL_FILL)
-            ox.set_cell_vertical_align(cell, col_def.vertical_align)
-            p = cell.paragraphs[0]
-            ox.set_paragraph_spacing(p, before=60, after=60)
-            run = p.add_run(col_def.title)
-            run.bold = col_def.bold
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+        rows = [ox.build_row([
+            ox.build_cell([ox.build_paragraph(
+                [self._run(col_def.title, bold=col_def.bold)], before=60, after=60,
+            )], col_def.width_dxa, fill=LABEL_FILL, valign=col_def.vertical_align)
+            for col_def in columns
+        ])]
 
         # Data rows
         rows_data = section_data.get("rows", [])
         for row_data in rows_data:
-            row = table.add_row()
-            for i, col_def in enumerate(columns):
-                cell = row.cells[i]
-                ox.set_cell_vertical_align(cell, col_def.vertical_align)
-                if col_def.fill_color:
-                    ox.set_cell_shading(cell, col_def.fill_color)
-                p = cell.paragraphs[0]
-                ox.set_paragraph_spacing(p, before=60, after=60)
-                value = row_data.get(col_def.id, "")
-                run = p.add_run(str(value))
-                run.font.size = BODY_SIZE
-                run.font.name = DEFAULT_FONT
+            rows.append(ox.build_row([
+                ox.build_cell([ox.build_paragraph(
+                    [self._run(str(row_data.get(col_def.id, "")))], before=60, after=60,
+                )], col_def.width_dxa, fill=col_def.fill_color or None,
+                    valign=col_def.vertical_align)
+                for col_def in columns
+            ]))
+        ox.append_rows(table, rows)
 
     def _build_free_text(self, section_def: SectionDefinition,
                          section_data: dict, all_data: dict):
@@ -1045,14 +1156,14 @@ class GMPWordEngine:
             p = cell.paragraphs[0]
             ox.set_paragraph_spacing(p, before=60, after=60)
             run = p.add_run(text)
-            run.font.size = BODY_SIZE
-            run.font.name = DEFAULT_FONT
+            self._style_run(run)
 
     def _build_flowchart_section(self, section_def: SectionDefinition,
                                  section_data: dict, all_data: dict):
         """Build a flowchart section with OOXML drawing shapes."""
         from .flowchart import Flowchart
-        from .flowchart_layout import FlowchartLayoutEngine
+        from .flowchart_layout import FlowchartLayoutEngine, LAYOUTS
+        from .flowchart_routing import route_connectors
 
         flowchart_data = section_data.get("flowchart")
         if not flowchart_data:
@@ -1065,9 +1176,15 @@ class GMPWordEngine:
 
         if isinstance(flowchart_data, Flowchart):
             flowchart = flowchart_data
+            if any(not conn.points for conn in flowchart.connectors):
+                route_connectors(flowchart)
         else:
             layout_engine = FlowchartLayoutEngine()
-            flowchart = layout_engine.layout(flowchart_data.get("steps", []))
+            algorithm = flowchart_data.get("layout")
+            flowchart = layout_engine.layout(
+                flowchart_data.get("steps", []),
+                algorithm=algorithm if algorithm in LAYOUTS else None,
+            )
 
         # Build OOXML shapes
         shapes = []
@@ -1087,15 +1204,8 @@ class GMPWordEngine:
             shapes.append(shape)
 
         for conn in flowchart.connectors:
-            # Find source and target nodes for positioning
-            src = next((n for n in flowchart.nodes if n.id == conn.from_node), None)
-            tgt = next((n for n in flowchart.nodes if n.id == conn.to_node), None)
-            if src and tgt:
-                x1 = src.x + src.width // 2
-                y1 = src.y + src.height
-                x2 = tgt.x + tgt.width // 2
-                y2 = tgt.y
-                shapes.append(ox.build_connector_shape(x1, y1, x2, y2))
+            if conn.points:
+                shapes.append(ox.build_polyline_connector_shape(conn.points))
 
         drawing = ox.build_flowchart_drawing(
             shapes, flowchart.total_width, flowchart.total_height
@@ -0,0 +1,18 @@
+"""Shared fixtures for the GMP backend tests."""
+
+import pytest
+from flask import Flask
+
+from ml_model.gmp.database import db, init_db
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    """Flask app bound to a throwaway SQLite database."""
+    monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'test.db'}")
+    app = Flask(__name__)
+    init_db(app)
+    yield app
+    with app.app_context():
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,87 @@
+"""Content-hash keys and the DocumentStore index of rendered files."""
+
+import os
+import time
+
+import pytest
+
+from ml_model.gmp import doc_store
+from ml_model.gmp.doc_store import DocumentStore, document_key
+from ml_model.gmp.template_loader import TemplateLoader
+
+
+@pytest.fixture(scope="module")
+def template():
+    return TemplateLoader().load_template("sop")
+
+
+@pytest.fixture
+def store(tmp_path):
+    docs_dir = tmp_path / "docs"
+    docs_dir.mkdir()
+    return DocumentStore(docs_dir, str(tmp_path / "store.db"))
+
+
+DATA = {"doc_id": "A1", "doc_number": "SOP-1", "doc_title": "Thaw",
+        "purpose": {"text": "Thaw cells"}}
+
+
+def test_key_ignores_fields_that_never_reach_the_docx(template):
+    base = document_key(template, DATA)
+    assert document_key(template, {**DATA, "doc_id": "B2"}) == base
+    assert document_key(template, dict(reversed(list(DATA.items())))) == base
+
+
+def test_key_changes_with_rendered_content(template):
+    base = document_key(template, DATA)
+    assert document_key(template, {**DATA, "purpose": {"text": "Freeze"}}) != base
+    assert document_key(template, {**DATA, "doc_number": "SOP-2"}) != base
+    assert document_key(template, DATA, flowchart_layout="layered") != \
+        document_key(template, DATA, flowchart_layout="simple")
+
+
+def test_generated_doc_numbers_are_left_out(template):
+    assert document_key(template, DATA, generated_doc_number=True) == \
+        document_key(template, {**DATA, "doc_number": "BR-FFFF"}, generated_doc_number=True)
+
+
+def test_key_changes_with_template_and_format_version(template, monkeypatch):
+    base = document_key(template, DATA)
+    edited = template.model_copy(update={"name": template.name + " v2"})
+    assert document_key(edited, DATA) != base
+    monkeypatch.setattr(doc_store, "RENDER_FORMAT_VERSION", doc_store.RENDER_FORMAT_VERSION + 1)
+    assert document_key(template, DATA) != base
+
+
+def test_get_returns_stored_file_and_refreshes_its_mtime(store):
+    path = store.docs_dir / "a.docx"
+    path.write_bytes(b"docx")
+    old = time.time() - 86400
+    os.utime(path, (old, old))
+    store.put("k", path, "A1")
+
+    found = store.get("k")
+    assert found == {"filename": "a.docx", "file_path": path, "doc_id": "A1"}
+    assert path.stat().st_mtime > old + 3600
+    assert store.contains_file("a.docx")
+    assert store.stats() == {"entries": 1, "hits": 1}
+
+
+def test_missing_files_are_forgotten(store):
+    path = store.docs_dir / "gone.docx"
+    path.write_bytes(b"docx")
+    store.put("k", path, "A1")
+    path.unlink()
+
+    assert store.get("k") is None
+    assert store.stats()["entries"] == 0
+
+
+def test_discard_file_drops_every_key_for_it(store):
+    path = store.docs_dir / "shared.docx"
+    path.write_bytes(b"docx")
+    store.put("k1", path, "A1")
+    store.put("k2", path, "A1")
+    store.discard_file("shared.docx")
+    assert not store.contains_file("shared.docx")
+    assert store.get("k1") is None
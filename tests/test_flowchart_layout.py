@@ -0,0 +1,115 @@
+"""Layered flowchart layout, its cache, and orthogonal connector routing."""
+
+import time
+
+import pytest
+
+from ml_model.gmp.flowchart_layout import FlowchartLayoutEngine
+
+
+def step(step_id, label=None, kind="action", *targets):
+    return {"id": step_id, "label": label or step_id, "type": kind,
+            "next": [{"target_id": t} for t in targets]}
+
+
+def branching_steps(n: int = 6) -> list[dict]:
+    """Start, a chain of actions with decisions that skip ahead or loop back."""
+    steps = [step("start", "Start", "start", "s0")]
+    for i in range(n):
+        nxt = f"s{i + 1}" if i + 1 < n else "end"
+        if i % 3 == 2:
+            back = f"s{i - 2}"
+            steps.append({"id": f"s{i}", "label": f"Check {i}?", "type": "decision",
+                          "next": [{"target_id": nxt, "label": "Yes"},
+                                   {"target_id": back, "label": "No"}]})
+        else:
+            steps.append(step(f"s{i}", f"Step {i}", "action", nxt))
+    steps.append(step("end", "End", "end"))
+    return steps
+
+
+def boxes_overlap(a, b) -> bool:
+    return a.x < b.x + b.width and b.x < a.x + a.width and \
+        a.y < b.y + b.height and b.y < a.y + a.height
+
+
+def segment_hits_box(p, q, node) -> bool:
+    x_min, x_max = sorted((p[0], q[0]))
+    y_min, y_max = sorted((p[1], q[1]))
+    return x_min < node.x + node.width and x_max > node.x and \
+        y_min < node.y + node.height and y_max > node.y
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    FlowchartLayoutEngine.clear_cache()
+    yield
+    FlowchartLayoutEngine.clear_cache()
+
+
+@pytest.mark.parametrize("algorithm", ["layered", "simple"])
+def test_every_step_is_placed_without_overlaps(algorithm):
+    steps = branching_steps()
+    chart = FlowchartLayoutEngine(algorithm).layout(steps)
+    assert sorted(n.id for n in chart.nodes) == sorted(s["id"] for s in steps)
+    for i, a in enumerate(chart.nodes):
+        for b in chart.nodes[i + 1:]:
+            assert not boxes_overlap(a, b), (a.id, b.id)
+        assert a.x + a.width <= chart.total_width
+        assert a.y + a.height <= chart.total_height
+
+
+def test_layered_layout_flows_downwards():
+    chart = FlowchartLayoutEngine("layered").layout(branching_steps())
+    y = {n.id: n.y for n in chart.nodes}
+    assert y["start"] < y["s0"] < y["s1"] < y["s2"] < y["s3"] < y["end"]
+
+
+def test_connectors_are_orthogonal_and_avoid_other_nodes():
+    steps = branching_steps(9)
+    chart = FlowchartLayoutEngine("layered").layout(steps)
+    by_id = {n.id: n for n in chart.nodes}
+    assert len(chart.connectors) == sum(len(s["next"]) for s in steps)
+    for conn in chart.connectors:
+        points = conn.points
+        assert len(points) >= 2
+        for p, q in zip(points, points[1:]):
+            assert p[0] == q[0] or p[1] == q[1], conn
+            for node in chart.nodes:
+                if node.id in (conn.from_node, conn.to_node):
+                    continue
+                assert not segment_hits_box(p, q, node), (conn.from_node, conn.to_node, node.id)
+        assert max(x for x, _ in points) <= chart.total_width
+        assert max(y for _, y in points) <= chart.total_height
+        if by_id[conn.to_node].y < by_id[conn.from_node].y:
+            # Loop-backs run in a lane right of every node
+            rightmost = max(n.x + n.width for n in chart.nodes)
+            assert max(x for x, _ in points) > rightmost
+
+
+def test_large_charts_lay_out_quickly():
+    steps = branching_steps(300)
+    started = time.perf_counter()
+    chart = FlowchartLayoutEngine("layered").layout(steps)
+    assert len(chart.nodes) == 302
+    assert time.perf_counter() - started < 5
+
+
+def test_layouts_are_cached_and_safe_to_mutate():
+    engine = FlowchartLayoutEngine("layered")
+    first = engine.layout(branching_steps())
+    first.nodes[0].x += 12345
+    second = engine.layout(branching_steps())
+
+    assert FlowchartLayoutEngine.cache_info()["hits"] >= 1
+    assert second.nodes[0].x != first.nodes[0].x
+    relabeled = branching_steps()
+    relabeled[1]["label"] = "Different"
+    assert engine.layout(relabeled).nodes != second.nodes
+
+
+def test_unknown_algorithm_is_rejected():
+    with pytest.raises(ValueError):
+        FlowchartLayoutEngine("spiral")
+    with pytest.raises(ValueError):
+        FlowchartLayoutEngine().layout(branching_steps(), algorithm="spiral")
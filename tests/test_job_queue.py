@@ -0,0 +1,136 @@
+"""GenerationJobQueue claiming, heartbeats and recovery of abandoned jobs."""
+
+import subprocess
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from ml_model.gmp.database import db, GenerationJob
+from ml_model.gmp.job_queue import GenerationJobQueue
+from ml_model.gmp.template_loader import TemplateLoader
+
+
+class FakeGenerator:
+    """Records generate_document() calls instead of rendering."""
+
+    def __init__(self, delay: float = 0.0):
+        self.template_loader = TemplateLoader()
+        self.delay = delay
+        self.calls: list[str] = []
+        self._lock = threading.Lock()
+
+    def generate_document(self, doc_type, user_input, progress_callback=None):
+        with self._lock:
+            self.calls.append(user_input.get("title"))
+        time.sleep(self.delay)
+        return {"doc_id": "D1", "filename": "doc.docx", "download_url": "/api/download/doc.docx",
+                "preview_sections": []}
+
+
+def wait_for_status(app, job_id: str, status: str, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        with app.app_context():
+            job = db.session.get(GenerationJob, job_id)
+            current = job.status
+            db.session.remove()
+        if current == status:
+            return
+        time.sleep(0.02)
+    raise AssertionError(f"job {job_id} is {current}, expected {status}")
+
+
+def add_job(app, job_id: str, status: str, owner=None, heartbeat_at=None,
+            updated_at=None):
+    with app.app_context():
+        db.session.add(GenerationJob(
+            id=job_id, doc_type="sop", status=status, owner=owner,
+            heartbeat_at=heartbeat_at, input_json=f'{{"title": "{job_id}"}}',
+            updated_at=updated_at or datetime.utcnow(),
+        ))
+        db.session.commit()
+        db.session.remove()
+
+
+def dead_pid() -> int:
+    proc = subprocess.Popen(["true"])
+    proc.wait()
+    return proc.pid
+
+
+@pytest.fixture
+def generator():
+    return FakeGenerator()
+
+
+@pytest.fixture
+def queue(app, generator):
+    queue = GenerationJobQueue(app, generator, stale_after=5, heartbeat=0)
+    yield queue
+    queue.stop()
+    queue._executor.shutdown(wait=True)
+
+
+def test_submitted_job_runs_to_completion(app, queue, generator):
+    with app.app_context():
+        job_id = queue.submit("sop", {"title": "T"}).id
+    wait_for_status(app, job_id, "completed")
+
+    with app.app_context():
+        job = db.session.get(GenerationJob, job_id)
+        assert job.attempts == 1
+        assert job.owner == queue.owner
+        assert job.to_dict()["filename"] == "doc.docx"
+    assert generator.calls == ["T"]
+
+
+def test_claim_succeeds_only_once(app, queue):
+    add_job(app, "j1", "queued")
+    other = GenerationJobQueue(app, FakeGenerator(), heartbeat=0)
+    other.owner = "otherhost:1"
+    with app.app_context():
+        assert queue._claim("j1") is True
+        assert other._claim("j1") is False
+        job = db.session.get(GenerationJob, "j1")
+        assert (job.status, job.owner, job.attempts) == ("running", queue.owner, 1)
+        assert job.heartbeat_at is not None
+    other._executor.shutdown()
+
+
+def test_reclaims_jobs_of_dead_or_silent_owners(app, queue, generator):
+    now = datetime.utcnow()
+    long_ago = now - timedelta(minutes=5)
+    add_job(app, "dead-owner", "running", owner=f"{queue.host}:{dead_pid()}",
+            heartbeat_at=now)
+    add_job(app, "silent", "running", owner="otherhost:1", heartbeat_at=long_ago)
+    add_job(app, "alive", "running", owner="otherhost:2", heartbeat_at=now)
+    add_job(app, "old-queued", "queued", updated_at=long_ago)
+    add_job(app, "new-queued", "queued")
+
+    assert queue.reclaim() == 3
+    for job_id in ("dead-owner", "silent", "old-queued"):
+        wait_for_status(app, job_id, "completed")
+    with app.app_context():
+        assert db.session.get(GenerationJob, "alive").status == "running"
+        assert db.session.get(GenerationJob, "new-queued").status == "queued"
+    assert sorted(generator.calls) == ["dead-owner", "old-queued", "silent"]
+
+    # Startup recovery also takes queued jobs submitted moments ago
+    assert queue.resume_pending() == 1
+    wait_for_status(app, "new-queued", "completed")
+
+
+def test_heartbeat_keeps_a_long_job_owned(app, generator):
+    generator.delay = 1.0
+    queue = GenerationJobQueue(app, generator, stale_after=0.5, heartbeat=0.1)
+    queue.start()
+    try:
+        with app.app_context():
+            job_id = queue.submit("sop", {"title": "long"}).id
+        wait_for_status(app, job_id, "completed")
+    finally:
+        queue.stop()
+        queue._executor.shutdown(wait=True)
+    assert generator.calls == ["long"]
@@ -0,0 +1,63 @@
+"""LLMResponseCache keys and least-recently-used eviction."""
+
+import time
+
+from ml_model.gmp.llm_cache import LLMResponseCache, cache_key
+
+
+def payload(prompt: str, temperature: float = 0.3, **extra) -> dict:
+    return {"model": "llama3", "prompt": prompt, "stream": False,
+            "options": {"temperature": temperature, "num_predict": 256}, **extra}
+
+
+def test_key_covers_everything_that_changes_the_output():
+    base = cache_key(payload("p"))
+    assert cache_key(payload("p")) == base
+    assert cache_key(payload("p", stream=True)) == base
+    assert cache_key(payload("q")) != base
+    assert cache_key(payload("p", temperature=0.7)) != base
+    assert cache_key(payload("p", system="be brief")) != base
+    assert cache_key(payload("p", format="json")) != base
+    assert cache_key({**payload("p"), "model": "mistral"}) != base
+
+
+def test_get_returns_what_was_set(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    cache.set("k", "response")
+    assert cache.get("k") == "response"
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_evicts_least_recently_used_over_entry_budget(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("a", "1")
+    time.sleep(0.01)
+    cache.set("b", "2")
+    time.sleep(0.01)
+    cache.get("a")  # a is now more recent than b
+    time.sleep(0.01)
+    cache.set("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+    assert cache.stats()["entries"] == 2
+
+
+def test_evicts_until_under_byte_budget(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=25)
+    for key in "abc":
+        cache.set(key, key * 10)
+        time.sleep(0.01)
+
+    assert cache.get("a") is None
+    assert cache.get("b") == "b" * 10
+    assert cache.stats()["bytes"] == 20
+
+
+def test_skips_empty_and_oversized_responses(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "cache.db"), max_bytes=10)
+    cache.set("empty", "")
+    cache.set("huge", "x" * 11)
+    assert cache.stats()["entries"] == 0
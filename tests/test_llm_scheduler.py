@@ -0,0 +1,105 @@
+"""LLMScheduler priority ordering, load shedding and the shared slot cap."""
+
+import threading
+import time
+
+import pytest
+
+from ml_model.gmp.llm_scheduler import LLMQueueFull, LLMScheduler, Priority
+
+
+def wait_until(predicate, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.01)
+
+
+def start_waiter(scheduler, priority, served=None):
+    """Queue an acquire() on a thread that releases as soon as it is served."""
+    def run():
+        scheduler.acquire(priority)
+        if served is not None:
+            served.append(priority)
+        scheduler.release()
+
+    depth = scheduler.stats()["queue_depth"]
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    wait_until(lambda: scheduler.stats()["queue_depth"] == depth + 1)
+    return thread
+
+
+def test_free_slot_is_granted_without_queueing(tmp_path):
+    scheduler = LLMScheduler(max_concurrent=2, slot_dir=tmp_path)
+    scheduler.acquire()
+    scheduler.acquire(Priority.BULK)
+    stats = scheduler.stats()
+    assert stats["active"] == 2
+    assert stats["queue_depth"] == 0
+
+
+def test_waiters_are_served_in_priority_order(tmp_path):
+    scheduler = LLMScheduler(max_concurrent=1, slot_dir=tmp_path)
+    scheduler.acquire()
+    served = []
+    threads = [start_waiter(scheduler, p, served)
+               for p in (Priority.BULK, Priority.AUTOFILL, Priority.INTERACTIVE)]
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=2)
+
+    assert served == [Priority.INTERACTIVE, Priority.AUTOFILL, Priority.BULK]
+    assert scheduler.stats()["active"] == 0
+
+
+def test_rejects_when_enough_callers_are_ahead(tmp_path):
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=1, slot_dir=tmp_path)
+    scheduler.acquire()
+    thread = start_waiter(scheduler, Priority.INTERACTIVE)
+
+    with pytest.raises(LLMQueueFull) as exc:
+        scheduler.acquire(Priority.AUTOFILL)
+    assert exc.value.retry_after >= 1
+    with pytest.raises(LLMQueueFull):
+        scheduler.check_capacity(Priority.INTERACTIVE)
+    assert scheduler.stats()["rejected"]["autofill"] == 1
+
+    scheduler.release()
+    thread.join(timeout=2)
+
+
+def test_bulk_backlog_never_sheds_interactive_callers(tmp_path):
+    scheduler = LLMScheduler(max_concurrent=1, max_queue=1, slot_dir=tmp_path)
+    scheduler.acquire()
+    threads = [start_waiter(scheduler, Priority.BULK) for _ in range(3)]
+
+    scheduler.check_capacity(Priority.INTERACTIVE)
+    threads.append(start_waiter(scheduler, Priority.INTERACTIVE))
+    # Bulk work itself always queues
+    threads.append(start_waiter(scheduler, Priority.BULK))
+
+    scheduler.release()
+    for thread in threads:
+        thread.join(timeout=2)
+    assert scheduler.stats()["completed"] == 6
+
+
+def test_slot_cap_is_shared_between_schedulers(tmp_path):
+    # Stand-ins for two gunicorn workers pointed at the same slot directory
+    first = LLMScheduler(max_concurrent=1, slot_dir=tmp_path)
+    second = LLMScheduler(max_concurrent=1, slot_dir=tmp_path)
+    entered = threading.Event()
+
+    def use_second():
+        with second.slot():
+            entered.set()
+
+    with first.slot():
+        thread = threading.Thread(target=use_second, daemon=True)
+        thread.start()
+        assert not entered.wait(0.3)
+    assert entered.wait(2)
+    thread.join(timeout=2)
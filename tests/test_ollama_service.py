@@ -0,0 +1,143 @@
+"""OllamaService against a local stand-in for the Ollama HTTP API."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from ml_model.gmp.llm_cache import LLMResponseCache
+from ml_model.gmp.llm_scheduler import LLMScheduler
+from ml_model.gmp.ollama_service import OllamaService
+
+
+class FakeOllama(ThreadingHTTPServer):
+    """Answers /api/generate with a fixed status after an optional delay."""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.status = 200
+        self.delay = 0.0
+        self.prompts: list[str] = []
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        self.server.prompts.append(payload["prompt"])
+        time.sleep(self.server.delay)
+        body = json.dumps({"response": f"echo {payload['prompt']}", "done": True})
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(body.encode())
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_ollama():
+    server = FakeOllama()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def service(fake_ollama, tmp_path):
+    return OllamaService(
+        base_url=f"http://127.0.0.1:{fake_ollama.server_port}",
+        scheduler=LLMScheduler(max_concurrent=4, slot_dir=tmp_path / "slots"),
+    )
+
+
+def test_concurrent_identical_prompts_share_one_call(service, fake_ollama):
+    fake_ollama.delay = 0.3
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(service.generate("same")))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == ["echo same"] * 4
+    assert fake_ollama.prompts == ["same"]
+    assert service._inflight == {}
+
+
+def test_uncached_calls_are_not_coalesced(service, fake_ollama):
+    fake_ollama.delay = 0.2
+    threads = [threading.Thread(target=service.generate, args=("same",),
+                                kwargs={"use_cache": False})
+               for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    assert fake_ollama.prompts == ["same", "same"]
+
+
+def test_followers_see_the_leaders_error(service, fake_ollama):
+    fake_ollama.status = 500
+    fake_ollama.delay = 0.2
+    errors = []
+
+    def call():
+        try:
+            service.generate("broken")
+        except Exception as e:
+            errors.append(type(e).__name__)
+
+    threads = [threading.Thread(target=call) for _ in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert errors == ["HTTPError"] * 3
+    assert fake_ollama.prompts == ["broken"]
+
+
+def test_cache_hit_skips_the_server(service, fake_ollama, tmp_path):
+    service.cache = LLMResponseCache(str(tmp_path / "cache.db"))
+    assert service.generate("cached") == "echo cached"
+    assert service.generate("cached") == "echo cached"
+    assert fake_ollama.prompts == ["cached"]
+
+
+def test_server_errors_open_the_circuit(service, fake_ollama):
+    fake_ollama.status = 500
+    threshold = service.health.failure_threshold
+    for i in range(threshold):
+        with pytest.raises(Exception):
+            service.generate(f"fail {i}", use_cache=False)
+    assert fake_ollama.prompts == [f"fail {i}" for i in range(threshold)]
+
+    # Open circuit: fail fast without calling the server
+    with pytest.raises(RuntimeError):
+        service.generate("skipped", use_cache=False)
+    assert len(fake_ollama.prompts) == threshold
+    assert service.check_health() is False
+
+
+def test_success_is_recorded_only_for_2xx(service, fake_ollama):
+    fake_ollama.status = 500
+    with pytest.raises(Exception):
+        service.generate("first", use_cache=False)
+    assert service.health._consecutive_failures == 1
+
+    fake_ollama.status = 404
+    with pytest.raises(Exception):
+        service.generate("missing model", use_cache=False)
+    assert service.health._consecutive_failures == 1
+
+    fake_ollama.status = 200
+    assert list(service.generate_stream("streamed", use_cache=False)) == ["echo streamed"]
+    assert service.health._consecutive_failures == 0
@@ -0,0 +1,67 @@
+"""RenderPool timeouts: only a render that hangs after starting fails."""
+
+import os
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from ml_model.gmp import render_pool
+from ml_model.gmp.render_pool import RenderPool, RenderTimeout
+
+DATA = {"doc_title": "Pool test", "doc_number": "SOP-1"}
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(render_pool, "_TIMEOUT_GRACE_SECONDS", 0)
+    monkeypatch.setattr(render_pool, "_WATCHDOG_INTERVAL", 0.1)
+    pool = RenderPool(max_workers=1, timeout=1)
+    yield pool
+    pool.shutdown()
+
+
+def test_in_process_rendering(tmp_path):
+    pool = RenderPool(max_workers=0)
+    assert pool.render_to_file("sop", DATA, str(tmp_path / "a.docx")) > 0
+    with pytest.raises(FileNotFoundError):
+        pool.render("no_such_template", DATA)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="needs SIGSTOP")
+def test_queued_renders_do_not_time_out(pool):
+    pool.render("sop", DATA)  # start the worker
+    worker = next(iter(pool._executor._processes))
+    os.kill(worker, signal.SIGSTOP)
+    try:
+        future = pool.submit("sop", DATA)
+        with ThreadPoolExecutor(max_workers=1) as waiter:
+            result = waiter.submit(pool.wait, future)
+            # Well past the timeout, but the worker never picked the task up
+            time.sleep(1.5)
+            assert not result.done()
+            os.kill(worker, signal.SIGCONT)
+            assert result.result(timeout=10)[:2] == b"PK"
+    finally:
+        os.kill(worker, signal.SIGCONT)
+
+
+@pytest.mark.skipif(not hasattr(signal, "SIGSTOP"), reason="needs SIGSTOP")
+def test_hung_render_fails_alone(pool):
+    pool.render("sop", DATA)
+    worker = next(iter(pool._executor._processes))
+    os.kill(worker, signal.SIGSTOP)
+    hung = pool.submit("sop", DATA)
+    queued = [pool.submit("sop", DATA) for _ in range(2)]
+
+    # Pretend the stopped worker picked up the first render long ago
+    pool._started.put((hung.task_id, time.time() - 60))
+    with pytest.raises(RenderTimeout):
+        pool.wait(hung)
+
+    # The others were moved to a fresh pool instead of being cancelled
+    for future in queued:
+        assert pool.wait(future)[:2] == b"PK"
+    assert worker not in pool._executor._processes
+    assert pool._tasks == {}
@@ -0,0 +1,156 @@
+"""RetentionService policies, the min_age guard and the shared lock file."""
+
+import os
+import time
+from datetime import datetime, timedelta
+
+import pytest
+
+from ml_model.gmp.database import db, Account, Document
+from ml_model.gmp.doc_store import DocumentStore
+from ml_model.gmp.file_lock import file_lock
+from ml_model.gmp.retention import RetentionService
+
+DAY = 86400
+
+
+@pytest.fixture
+def docs_dir(tmp_path):
+    path = tmp_path / "generated_docs"
+    path.mkdir()
+    return path
+
+
+@pytest.fixture
+def account_id(app):
+    with app.app_context():
+        account = Account(name="Site", slug="site")
+        db.session.add(account)
+        db.session.commit()
+        return account.id
+
+
+def make_service(app, docs_dir, **overrides):
+    options = dict(max_age_days=0, orphan_max_age_hours=0, max_bytes=0,
+                   keep_latest=0, interval=0, min_age=0)
+    options.update(overrides)
+    return RetentionService(app, docs_dir, **options)
+
+
+def make_file(docs_dir, name: str, size: int = 100, age: float = 0):
+    path = docs_dir / name
+    path.write_bytes(b"x" * size)
+    stamp = time.time() - age
+    os.utime(path, (stamp, stamp))
+    return path
+
+
+def add_record(app, account_id, path, title="Thaw SOP", created_offset=0):
+    with app.app_context():
+        doc = Document(account_id=account_id, doc_type="sop", title=title,
+                       doc_number="SOP-1", filename=path.name, file_path=str(path),
+                       created_at=datetime.utcnow() + timedelta(seconds=created_offset))
+        db.session.add(doc)
+        db.session.commit()
+        return doc.id
+
+
+def file_path_of(app, doc_id):
+    with app.app_context():
+        return db.session.get(Document, doc_id).file_path
+
+
+def test_keep_latest_clears_expired_records(app, docs_dir, account_id):
+    ids = [add_record(app, account_id, make_file(docs_dir, f"rev{i}.docx"), created_offset=i)
+           for i in range(3)]
+    report = make_service(app, docs_dir, keep_latest=2).run_once()
+
+    assert report["by_reason"] == {"keep_latest": 1}
+    assert not (docs_dir / "rev0.docx").exists()
+    assert file_path_of(app, ids[0]) == ""
+    assert file_path_of(app, ids[2]) == str(docs_dir / "rev2.docx")
+
+
+def test_orphans_expire_before_referenced_files(app, docs_dir, account_id):
+    make_file(docs_dir, "orphan.docx", age=2 * 3600)
+    make_file(docs_dir, "young_orphan.docx", age=60)
+    add_record(app, account_id, make_file(docs_dir, "kept.docx", age=2 * 3600))
+
+    report = make_service(app, docs_dir, orphan_max_age_hours=1).run_once()
+    assert report["by_reason"] == {"orphan": 1}
+    assert sorted(p.name for p in docs_dir.iterdir()) == ["kept.docx", "young_orphan.docx"]
+
+
+def test_max_age_applies_to_referenced_files(app, docs_dir, account_id):
+    doc_id = add_record(app, account_id, make_file(docs_dir, "old.docx", age=10 * DAY))
+    make_file(docs_dir, "new.docx", age=DAY)
+
+    report = make_service(app, docs_dir, max_age_days=5).run_once()
+    assert report["by_reason"] == {"max_age": 1}
+    assert file_path_of(app, doc_id) == ""
+    assert report["cleared_records"] == 1
+
+
+def test_size_budget_deletes_oldest_orphans_first(app, docs_dir, account_id):
+    add_record(app, account_id, make_file(docs_dir, "referenced.docx", 100, age=3 * DAY))
+    make_file(docs_dir, "old_orphan.docx", 100, age=2 * DAY)
+    make_file(docs_dir, "new_orphan.docx", 100, age=DAY)
+
+    report = make_service(app, docs_dir, max_bytes=150).run_once()
+    assert report["by_reason"] == {"max_bytes": 2}
+    assert [p.name for p in docs_dir.iterdir()] == ["referenced.docx"]
+    assert report["remaining_bytes"] == 100
+
+
+def test_recent_files_are_never_deleted(app, docs_dir):
+    make_file(docs_dir, "in_flight.docx", age=60)
+    report = make_service(app, docs_dir, max_bytes=1, min_age=600).run_once()
+    assert report["deleted_files"] == 0
+    assert (docs_dir / "in_flight.docx").exists()
+
+
+def test_deleted_files_leave_the_dedup_store(app, docs_dir, tmp_path):
+    store = DocumentStore(docs_dir, str(tmp_path / "store.db"))
+    path = make_file(docs_dir, "shared.docx", age=2 * DAY)
+    store.put("k", path, "A1")
+
+    make_service(app, docs_dir, orphan_max_age_hours=1, doc_store=store).run_once()
+    assert not store.contains_file("shared.docx")
+
+
+def test_reused_file_ages_from_its_last_use(app, docs_dir, tmp_path):
+    store = DocumentStore(docs_dir, str(tmp_path / "store.db"))
+    path = make_file(docs_dir, "shared.docx", age=2 * DAY)
+    store.put("k", path, "A1")
+    assert store.get("k") is not None
+
+    report = make_service(app, docs_dir, orphan_max_age_hours=1, doc_store=store).run_once()
+    assert report["deleted_files"] == 0
+    assert path.exists()
+
+
+def test_totals_are_shared_through_the_lock_file(app, docs_dir):
+    make_file(docs_dir, "a.docx", 10, age=2 * DAY)
+    first = make_service(app, docs_dir, orphan_max_age_hours=1)
+    first.run_once()
+    make_file(docs_dir, "b.docx", 20, age=2 * DAY)
+    first.run_once()
+
+    # A service in another process reads the same file
+    stats = make_service(app, docs_dir).stats()
+    assert (stats["runs"], stats["deleted_files"], stats["reclaimed_bytes"]) == (2, 2, 30)
+    assert stats["last_run"]["deleted_files"] == 1
+
+
+def test_scheduled_sweep_skips_when_swept_recently(app, docs_dir):
+    service = make_service(app, docs_dir, interval=3600)
+    assert "skipped" not in service.run_once()
+    assert service.run_once(scheduled=True) == {
+        "skipped": True, "reason": "swept recently by another process",
+    }
+
+
+def test_scheduled_sweep_skips_while_another_process_sweeps(app, docs_dir):
+    service = make_service(app, docs_dir, interval=3600)
+    with file_lock(service.lock_path):
+        assert service.run_once(scheduled=True)["reason"] == "another process is sweeping"
@@ -0,0 +1,114 @@
+"""TemplateLoader's mtime-aware index and the precompiled template bundle."""
+
+import json
+import os
+import shutil
+
+import pytest
+
+from ml_model.gmp import template_bundle
+from ml_model.gmp.template_bundle import compile_templates, load_bundle, save_bundle
+from ml_model.gmp.template_loader import TEMPLATES_DIR, TemplateLoader
+
+
+@pytest.fixture
+def templates_dir(tmp_path):
+    path = tmp_path / "templates"
+    path.mkdir()
+    for name in ("sop", "deviation_form"):
+        shutil.copy(TEMPLATES_DIR / f"{name}.json", path)
+    return path
+
+
+def rewrite(path, **changes):
+    raw = json.loads(path.read_text())
+    raw.update(changes)
+    path.write_text(json.dumps(raw))
+    # Make sure the change is visible even on coarse mtime filesystems
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_index_lists_templates_by_file(templates_dir):
+    loader = TemplateLoader(templates_dir, poll_interval=0)
+    assert [t["id"] for t in loader.list_templates()] == ["deviation_form", "sop"]
+    with pytest.raises(FileNotFoundError):
+        loader.load_template("batch_record")
+
+
+def test_edited_template_is_reindexed_and_reloaded(templates_dir):
+    loader = TemplateLoader(templates_dir, poll_interval=0)
+    assert loader.load_template("sop").name != "Edited SOP"
+
+    rewrite(templates_dir / "sop.json", name="Edited SOP")
+    assert {t["id"]: t["name"] for t in loader.list_templates()}["sop"] == "Edited SOP"
+    assert loader.load_template("sop").name == "Edited SOP"
+
+
+def test_added_removed_and_invalid_files(templates_dir):
+    loader = TemplateLoader(templates_dir, poll_interval=0)
+    loader.list_templates()
+
+    (templates_dir / "deviation_form.json").unlink()
+    (templates_dir / "broken.json").write_text("{not json")
+    shutil.copy(TEMPLATES_DIR / "batch_record.json", templates_dir)
+    assert [t["id"] for t in loader.list_templates()] == ["batch_record", "sop"]
+
+
+def test_poll_interval_defers_rescans(templates_dir):
+    loader = TemplateLoader(templates_dir, poll_interval=3600)
+    loader.list_templates()
+    (templates_dir / "sop.json").unlink()
+    assert len(loader.list_templates()) == 2
+    loader.reload()
+    assert len(loader.list_templates()) == 1
+
+
+def test_bundle_round_trip(templates_dir, tmp_path):
+    path = tmp_path / "templates.bundle"
+    save_bundle(compile_templates(templates_dir), path)
+    templates = load_bundle(templates_dir, path)
+    assert sorted(templates) == ["deviation_form", "sop"]
+    assert templates["sop"] == TemplateLoader(templates_dir).load_template("sop")
+
+
+def test_bundle_goes_stale(templates_dir, tmp_path, monkeypatch):
+    path = tmp_path / "templates.bundle"
+    save_bundle(compile_templates(templates_dir), path)
+
+    rewrite(templates_dir / "sop.json", name="Edited SOP")
+    assert load_bundle(templates_dir, path) is None
+
+    save_bundle(compile_templates(templates_dir), path)
+    monkeypatch.setattr(template_bundle, "schema_fingerprint", lambda: "changed")
+    assert load_bundle(templates_dir, path) is None
+
+
+def test_unreadable_bundle_is_ignored(templates_dir, tmp_path):
+    path = tmp_path / "templates.bundle"
+    path.write_bytes(b"not a pickle")
+    assert load_bundle(templates_dir, path) is None
+
+
+def test_invalid_template_fails_the_build(templates_dir, tmp_path):
+    (templates_dir / "broken.json").write_text(json.dumps({"id": "broken"}))
+    with pytest.raises(ValueError, match="broken"):
+        compile_templates(templates_dir)
+    output = tmp_path / "out.bundle"
+    assert template_bundle.main(["--templates-dir", str(templates_dir),
+                                 "--output", str(output)]) == 1
+    assert not output.exists()
+
+
+def test_warm_writes_then_uses_the_bundle(templates_dir, monkeypatch):
+    monkeypatch.setattr(template_bundle, "BUNDLE_PATH_ENV", "")
+    path = templates_dir / template_bundle.BUNDLE_FILENAME
+    assert TemplateLoader(templates_dir).warm() == 2
+    assert path.is_file()
+
+    # The next process loads from the bundle without validating JSON
+    monkeypatch.setattr("ml_model.gmp.template_loader.DocumentTemplate",
+                        lambda **raw: pytest.fail("validated JSON despite a fresh bundle"))
+    loader = TemplateLoader(templates_dir)
+    assert loader.warm() == 2
+    assert loader.load_template("sop").id
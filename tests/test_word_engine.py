@@ -0,0 +1,90 @@
+"""Incremental re-rendering of bookmarked sections in a generated DOCX."""
+
+import pytest
+from docx import Document
+from docx.oxml.ns import qn
+
+from ml_model.gmp import ooxml_helpers as ox
+from ml_model.gmp.template_loader import TemplateLoader
+from ml_model.gmp.word_engine import (
+    render_document_to_file, rerender_sections_to_file, section_bookmark_name,
+)
+
+
+@pytest.fixture(scope="module")
+def template():
+    return TemplateLoader().load_template("sop")
+
+
+@pytest.fixture
+def source(template, tmp_path):
+    data = {"doc_title": "Thaw", "doc_number": "SOP-1",
+            "purpose": {"text": "Original purpose"},
+            "scope": {"text": "Original scope"}}
+    path = tmp_path / "source.docx"
+    render_document_to_file(template, data, str(path))
+    return path, data
+
+
+def body_text(path) -> str:
+    return "".join(Document(str(path)).element.body.itertext())
+
+
+def bookmark(body, section_id):
+    return ox.find_bookmark_range(body, section_bookmark_name(section_id))
+
+
+def edit_body(path, change):
+    doc = Document(str(path))
+    change(doc.element.body)
+    doc.save(str(path))
+
+
+def test_only_listed_sections_are_rebuilt(template, source, tmp_path):
+    path, data = source
+    data = {**data, "purpose": {"text": "New purpose"}, "scope": {"text": "Ignored scope"}}
+    target = tmp_path / "target.docx"
+    rerender_sections_to_file(template, data, str(path), ["purpose"], str(target))
+
+    text = body_text(target)
+    assert "New purpose" in text and "Original purpose" not in text
+    assert "Original scope" in text and "Ignored scope" not in text
+    before = Document(str(path)).element.body.findall(qn("w:bookmarkStart"))
+    after = Document(str(target)).element.body.findall(qn("w:bookmarkStart"))
+    assert len(after) == len(before)
+
+
+def test_unknown_section_is_rejected(template, source, tmp_path):
+    path, data = source
+    with pytest.raises(ValueError):
+        rerender_sections_to_file(template, data, str(path), ["no_such_section"],
+                                  str(tmp_path / "out.docx"))
+
+
+def test_bookmark_end_moved_into_a_paragraph_is_rejected(template, source, tmp_path):
+    path, data = source
+
+    def move_end(body):
+        start, end = bookmark(body, "purpose")
+        end.getprevious().append(end)
+    edit_body(path, move_end)
+
+    with pytest.raises(ValueError):
+        rerender_sections_to_file(template, data, str(path), ["purpose"],
+                                  str(tmp_path / "out.docx"))
+
+
+def test_overlapping_bookmarks_are_rejected(template, source, tmp_path):
+    path, data = source
+
+    def stretch_purpose_over_scope(body):
+        _, end = bookmark(body, "purpose")
+        _, scope_end = bookmark(body, "scope")
+        scope_end.addnext(end)
+    edit_body(path, stretch_purpose_over_scope)
+
+    with pytest.raises(ValueError, match="overlaps"):
+        rerender_sections_to_file(template, data, str(path), ["purpose"],
+                                  str(tmp_path / "out.docx"))
+    # Nothing was removed from the source on the way
+    assert "Original scope" in body_text(path)